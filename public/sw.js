@@ -1,13 +1,52 @@
 // Service Worker — 静态资源本地缓存（Cache-First）
 // 缓存 /assets/**、/audio/**、/lootbox/** 以及 CDN 域名下的图片/音频
-// 不缓存 /api/**、/gacha-configs/**（需实时更新）
+// 不缓存 /api/**、/gacha-configs/**（需实时更新）；/gacha-configs/releases/** 是不可变的发布目录，可以缓存
+//
+// 预缓存：按 precache-manifest.json（scripts/upload-to-oss.py 上传静态资源时生成，含 URL、内容哈希、大小）
+// 预加载 UI 音效和核心图片；安装时以及页面导航时（最多每 PRECACHE_INTERVAL 一次）同步清单，
+// 只重新下载哈希变化的文件，并删除清单中已不存在的文件
+// 资源地址前缀由注册时的 ?cdn= 参数传入（与页面使用的 CDN_BASE_URL 一致）
 
 const CACHE_NAME = 'mw-gacha-assets-v1'
+const PRECACHE_NAME = 'mw-gacha-precache-v1'
+
+// 预缓存中记录 {URL: 内容哈希} 的内部条目
+const PRECACHE_STATE_KEY = '/__precache-state__'
+const PRECACHE_INTERVAL = 10 * 60 * 1000
+
+const ASSET_BASE = new URL(self.location.href).searchParams.get('cdn') || ''
+
+let lastPrecacheSync = 0
+let precacheSyncing = null
+
+// 已预缓存的 URL（fetch 中需要同步判断，启动时和每次同步后从预缓存状态更新）
+let precachedUrls = new Set()
+
+// 清单中的相对路径 -> 页面实际请求的资源 URL
+function assetUrl(path) {
+  return new URL(`${ASSET_BASE}/${path}`, self.location.origin).href
+}
+
+// 请求 URL -> 预缓存中的 URL；同源路径（如 /MW.png）也对应到 CDN 上的同一文件
+function findPrecachedUrl(url) {
+  if (precachedUrls.has(url)) return url
+  const { origin, pathname, search } = new URL(url)
+  if (origin === self.location.origin && !search) {
+    const candidate = assetUrl(pathname.slice(1))
+    if (precachedUrls.has(candidate)) return candidate
+  }
+  return null
+}
 
 // 判断请求是否应该走缓存
 function shouldCache(url) {
   const { pathname, hostname } = new URL(url)
 
+  // 配置发布目录内容不可变（发布 ID 由内容哈希决定）
+  if (pathname.includes('/gacha-configs/releases/')) {
+    return true
+  }
+
   // 不缓存 API 和配置文件
   if (pathname.startsWith('/api/') || pathname.startsWith('/gacha-configs/')) {
     return false
@@ -31,8 +70,85 @@ function shouldCache(url) {
   return false
 }
 
-// install: 立即激活，不做预缓存
+async function readPrecacheState(cache) {
+  const response = await cache.match(PRECACHE_STATE_KEY)
+  if (!response) return {}
+  try {
+    return await response.json()
+  } catch {
+    return {}
+  }
+}
+
+// 按清单同步预缓存：哈希未变且已缓存的文件不请求
+async function syncPrecache() {
+  const response = await fetch(assetUrl('precache-manifest.json'), { cache: 'no-cache' })
+  if (!response.ok) return
+  const manifest = await response.json()
+
+  const cache = await caches.open(PRECACHE_NAME)
+  const runtimeCache = await caches.open(CACHE_NAME)
+  const state = await readPrecacheState(cache)
+  const nextState = {}
+
+  await Promise.all(manifest.entries.map(async (entry) => {
+    const url = assetUrl(entry.url)
+    if (state[url] === entry.hash && await cache.match(url)) {
+      nextState[url] = entry.hash
+      return
+    }
+    try {
+      // 资源以固定 URL + immutable 上传，no-cache 绕不过 CDN 边缘缓存：
+      // 带上内容哈希作为查询参数请求，保证拿到与清单一致的版本，缓存时仍以原 URL 为键
+      const versioned = new URL(url)
+      versioned.searchParams.set('v', entry.hash)
+      const fresh = await fetch(versioned.href, { cache: 'no-cache' })
+      if (fresh.status === 200 || fresh.type === 'opaque') {
+        await cache.put(url, fresh)
+        // 运行时缓存中的旧版本不再使用
+        await runtimeCache.delete(url)
+        nextState[url] = entry.hash
+      }
+    } catch {
+      // 单个文件失败不影响其他文件，下次同步时重试
+    }
+  }))
+
+  // 删除清单中已不存在的文件
+  for (const url of Object.keys(state)) {
+    if (!(url in nextState)) {
+      await cache.delete(url)
+    }
+  }
+  await cache.put(PRECACHE_STATE_KEY, new Response(JSON.stringify(nextState)))
+  precachedUrls = new Set(Object.keys(nextState))
+}
+
+function syncPrecacheThrottled(force = false) {
+  const now = Date.now()
+  if (precacheSyncing || (!force && now - lastPrecacheSync < PRECACHE_INTERVAL)) {
+    return precacheSyncing || Promise.resolve()
+  }
+  lastPrecacheSync = now
+  precacheSyncing = syncPrecache()
+    .catch(() => {
+      // 清单不可用时保留现有预缓存
+    })
+    .finally(() => {
+      precacheSyncing = null
+    })
+  return precacheSyncing
+}
+
+caches.open(PRECACHE_NAME)
+  .then(readPrecacheState)
+  .then((state) => {
+    precachedUrls = new Set(Object.keys(state))
+  })
+
+// install: 预加载清单中的资源后立即激活
 self.addEventListener('install', (event) => {
+  event.waitUntil(syncPrecacheThrottled(true))
   self.skipWaiting()
 })
 
@@ -42,18 +158,34 @@ self.addEventListener('activate', (event) => {
     caches.keys().then((keys) =>
       Promise.all(
         keys
-          .filter((key) => key !== CACHE_NAME)
+          .filter((key) => key !== CACHE_NAME && key !== PRECACHE_NAME)
           .map((key) => caches.delete(key))
       )
     ).then(() => self.clients.claim())
   )
 })
 
-// fetch: Cache-First 策略
+// fetch: 预缓存的资源直接返回，其余走 Cache-First 策略
 self.addEventListener('fetch', (event) => {
   // 只处理 http/https 请求（排除 chrome-extension:// 等）
   if (!event.request.url.startsWith('http')) return
   if (event.request.method !== 'GET') return
+
+  // 页面导航时在后台检查清单是否有更新
+  if (event.request.mode === 'navigate') {
+    event.waitUntil(syncPrecacheThrottled())
+  }
+
+  const precachedUrl = findPrecachedUrl(event.request.url)
+  if (precachedUrl) {
+    event.respondWith(
+      caches.open(PRECACHE_NAME)
+        .then((precache) => precache.match(precachedUrl))
+        .then((precached) => precached || fetch(event.request))
+    )
+    return
+  }
+
   if (!shouldCache(event.request.url)) return
 
   event.respondWith(
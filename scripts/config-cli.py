@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+配置文件命令行工具（无界面，不依赖 PyQt6）
+与 config-editor.py 操作同一份 version-history.json 和 site-info.json，适用于 CI / 批处理
+
+依赖安装:
+  pip install oss2 python-dotenv   # 仅 upload 需要
+
+使用方法:
+  python scripts/config-cli.py missing [--json]
+  python scripts/config-cli.py version add 1.2.9 --theme "主题" --type minor --missing -f "新功能"
+  python scripts/config-cli.py version edit 1.2.9 --commit abc1234 -f "修复问题"
+  python scripts/config-cli.py sponsor add 张三 6.66 [--date 2025-01-01]
+  python scripts/config-cli.py save [--current-version 1.2.9]
+  python scripts/config-cli.py upload [--current-version 1.2.9]
+"""
+
+import sys
+import json
+import argparse
+from datetime import datetime
+
+import config_store
+
+
+def _print_commits(commits, as_json):
+    if as_json:
+        print(json.dumps(commits, ensure_ascii=False, indent=2))
+        return
+    for commit in commits:
+        print(f"{commit['hash']} {commit['message']}")
+
+
+def _resolve_commits(hashes, use_missing, version_data):
+    """根据 --commit / --missing 解析出 [{'hash', 'message'}] 列表（时间线顺序）"""
+    if not hashes and not use_missing:
+        return None
+
+    all_commits = config_store.get_git_commits()
+    by_hash = {commit['hash']: commit for commit in all_commits}
+
+    selected = []
+    if use_missing:
+        selected.extend(config_store.find_missing_commits(version_data, all_commits))
+    seen = {commit['hash'] for commit in selected}
+    for hash_val in hashes or []:
+        if hash_val in seen:
+            continue
+        commit = by_hash.get(hash_val)
+        if commit is None:
+            raise ValueError(f'未找到提交 {hash_val}')
+        selected.append(commit)
+        seen.add(hash_val)
+
+    return [{'hash': c['hash'], 'message': c['message']} for c in selected]
+
+
+def _save(version_data, siteinfo_data):
+    results = config_store.save_documents(
+        config_store.serialize_documents(version_data, siteinfo_data)
+    )
+    for path, (written, _) in results.items():
+        print(f"{'✅ 已写入' if written else '✨ 未变化'} {path}")
+
+
+def cmd_missing(args):
+    version_data, _ = config_store.load_documents()
+    missing = config_store.find_missing_commits(version_data, config_store.get_git_commits())
+    _print_commits(missing, args.json)
+    if not args.json:
+        print(f"\n📋 缺失 {len(missing)} 个提交", file=sys.stderr)
+
+
+def cmd_version_add(args):
+    version_data, siteinfo_data = config_store.load_documents()
+    new_version = {
+        'version': args.version,
+        'date': args.date or datetime.now().strftime('%Y-%m-%d'),
+        'type': args.type or 'patch',
+        'milestone': bool(args.milestone),
+        'theme': args.theme or '',
+        'commits': _resolve_commits(args.commit, args.missing, version_data) or [],
+        'features': args.feature or [],
+    }
+    config_store.add_version(version_data, new_version)
+    _save(version_data, siteinfo_data)
+    print(f"✅ 版本 v{args.version} 已添加（{len(new_version['commits'])} 个提交）")
+
+
+def cmd_version_edit(args):
+    version_data, siteinfo_data = config_store.load_documents()
+    _, existing = config_store.find_version(version_data, args.version)
+    if existing is None:
+        raise ValueError(f'版本 {args.version} 不存在')
+
+    updated = dict(existing)
+    if args.new_version:
+        updated['version'] = args.new_version
+    if args.date:
+        updated['date'] = args.date
+    if args.type:
+        updated['type'] = args.type
+    if args.milestone is not None:
+        updated['milestone'] = args.milestone
+    if args.theme is not None:
+        updated['theme'] = args.theme
+
+    # 追加提交（已存在的 hash 不重复添加）
+    added = _resolve_commits(args.commit, args.missing, version_data)
+    if added:
+        commits = list(updated.get('commits', []))
+        existing_hashes = {c.get('hash') for c in commits}
+        commits.extend(c for c in added if c['hash'] not in existing_hashes)
+        updated['commits'] = commits
+
+    if args.feature:
+        features = [] if args.replace_features else list(updated.get('features', []))
+        updated['features'] = features + args.feature
+
+    config_store.update_version(version_data, args.version, updated)
+    _save(version_data, siteinfo_data)
+    print(f"✅ 版本 v{updated['version']} 已更新")
+
+
+def cmd_sponsor_add(args):
+    version_data, siteinfo_data = config_store.load_documents()
+    config_store.add_sponsor(siteinfo_data, {
+        'name': args.name,
+        'amount': args.amount,
+        'date': args.date or datetime.now().strftime('%Y-%m-%d'),
+    })
+    _save(version_data, siteinfo_data)
+    print(f"✅ 赞助者 {args.name} 已添加")
+
+
+def cmd_save(args):
+    version_data, siteinfo_data = config_store.load_documents()
+    config_store.stamp_documents(version_data, siteinfo_data, args.current_version)
+    _save(version_data, siteinfo_data)
+
+
+def cmd_upload(args):
+    version_data, siteinfo_data = config_store.load_documents()
+    config_store.stamp_documents(version_data, siteinfo_data, args.current_version)
+    contents = config_store.serialize_documents(version_data, siteinfo_data)
+    for oss_path in config_store.upload_documents(contents):
+        print(f"✅ → {oss_path}")
+    config_store.save_documents(contents)
+
+
+def _add_version_fields(parser):
+    parser.add_argument('--date', help='日期 (YYYY-MM-DD)，新增时默认今天')
+    parser.add_argument('--type', choices=config_store.VERSION_TYPES, help='版本类型')
+    parser.add_argument('--theme', help='主题')
+    parser.add_argument('--commit', action='append', metavar='HASH', help='附加提交（可多次）')
+    parser.add_argument('--missing', action='store_true', help='附加所有未记录的提交')
+    parser.add_argument('-f', '--feature', action='append', help='特性（可多次）')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='配置文件命令行工具（version-history.json / site-info.json）')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('missing', help='列出未记录到任何版本的提交')
+    p.add_argument('--json', action='store_true', help='以 JSON 输出')
+    p.set_defaults(func=cmd_missing)
+
+    version = sub.add_parser('version', help='版本管理').add_subparsers(dest='action', required=True)
+
+    p = version.add_parser('add', help='新增版本（插入到最前面）')
+    p.add_argument('version')
+    _add_version_fields(p)
+    p.add_argument('--milestone', action='store_true', help='标记为里程碑')
+    p.set_defaults(func=cmd_version_add)
+
+    p = version.add_parser('edit', help='编辑现有版本')
+    p.add_argument('version')
+    p.add_argument('--new-version', help='修改版本号')
+    _add_version_fields(p)
+    p.add_argument('--milestone', dest='milestone', action='store_true', default=None)
+    p.add_argument('--no-milestone', dest='milestone', action='store_false')
+    p.add_argument('--replace-features', action='store_true', help='用 -f 覆盖原有特性而不是追加')
+    p.set_defaults(func=cmd_version_edit)
+
+    sponsor = sub.add_parser('sponsor', help='赞助者管理').add_subparsers(dest='action', required=True)
+    p = sponsor.add_parser('add', help='添加赞助者')
+    p.add_argument('name')
+    p.add_argument('amount', type=float)
+    p.add_argument('--date', help='日期 (YYYY-MM-DD)，默认今天')
+    p.set_defaults(func=cmd_sponsor_add)
+
+    for name, func, help_text in [
+        ('save', cmd_save, '更新最后更新日期并保存'),
+        ('upload', cmd_upload, '上传到 OSS 并保存到本地'),
+    ]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('--current-version', help='同时设置当前版本号')
+        p.set_defaults(func=func)
+
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    try:
+        args.func(args)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,11 +12,7 @@
 
 import os
 import sys
-import json
-import subprocess
 import re
-from pathlib import Path
-from datetime import datetime
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QTextEdit, QTabWidget,
@@ -24,36 +20,14 @@ from PyQt6.QtWidgets import (
     QGroupBox, QFormLayout, QDateEdit, QComboBox, QDialog,
     QDialogButtonBox, QSpinBox, QDoubleSpinBox, QProgressDialog,
     QSplitter, QScrollArea, QFrame, QTreeWidget, QTreeWidgetItem,
-    QCheckBox, QListWidget, QListWidgetItem, QPlainTextEdit
+    QCheckBox, QListWidget, QListWidgetItem, QPlainTextEdit, QInputDialog
 )
 from PyQt6.QtCore import Qt, QDate, QTimer, QFileSystemWatcher
 from PyQt6.QtGui import QFont, QColor
-import oss2
-from dotenv import load_dotenv
 from version_edit_dialog import VersionEditDialog
-
-# 加载 .env 文件
-load_dotenv()
-
-# 配置文件路径
-PROJECT_ROOT = Path(__file__).parent.parent
-VERSION_FILE = PROJECT_ROOT / 'public' / 'gacha-configs' / 'version-history.json'
-SITEINFO_FILE = PROJECT_ROOT / 'public' / 'gacha-configs' / 'site-info.json'
-
-# OSS 配置
-ACCESS_KEY_ID = os.getenv('OSS_ACCESS_KEY_ID')
-ACCESS_KEY_SECRET = os.getenv('OSS_ACCESS_KEY_SECRET')
-ENDPOINT = os.getenv('OSS_ENDPOINT', 'oss-cn-hangzhou.aliyuncs.com')
-BUCKET_NAME = os.getenv('OSS_BUCKET_NAME')
-PATH_PREFIX = os.getenv('OSS_PATH_PREFIX', '')
-
-# OSS 上传路径
-if PATH_PREFIX:
-    OSS_VERSION_PATH = f'{PATH_PREFIX.rstrip("/")}/gacha-configs/version-history.json'
-    OSS_SITEINFO_PATH = f'{PATH_PREFIX.rstrip("/")}/gacha-configs/site-info.json'
-else:
-    OSS_VERSION_PATH = 'gacha-configs/version-history.json'
-    OSS_SITEINFO_PATH = 'gacha-configs/site-info.json'
+import config_store
+from version_search import VersionSearchIndex
+from config_store import VERSION_FILE, SITEINFO_FILE, file_digest, write_bytes_atomic
 
 
 class SponsorDialog(QDialog):
@@ -114,9 +88,18 @@ class ConfigEditor(QMainWindow):
         self.version_data = {}
         self.siteinfo_data = {}
         self.version_card_map = {}  # 存储版本号 -> 卡片widget 的映射
-        self.selected_commits = []  # 存储选中的提交
+        self.selected_commits = {}  # 存储选中的提交（hash -> commit，按插入顺序）
         self.commit_checkboxes = {}  # 存储 hash -> checkbox 的映射
         self.all_git_commits = []  # 存储所有 Git 提交
+        self.commit_stats = {}  # 存储 hash -> 改动统计（文件数/新增/删除）
+        self.commit_index = {}  # 存储 hash -> 时间线位置（0 为最新）
+        self.recorded_hashes = set()  # 存储已记录到版本中的 hash
+        self.hash_to_version = {}  # 存储 hash -> 版本数据 的映射
+        self._written_digests = {}  # 存储 路径 -> 编辑器最近写入内容的哈希（用于忽略自身写入）
+        self._loaded_keys = {}  # 存储 路径 -> 最近加载时的 (mtime, 大小)
+        self.search_index = VersionSearchIndex()  # 版本历史倒排索引
+        self.search_results = []  # 当前搜索命中的版本号
+        self.search_cursor = 0  # 回车在命中结果间循环
         self.init_ui()
         self._load_initial_data()
         self._setup_file_watcher()
@@ -212,6 +195,19 @@ class ConfigEditor(QMainWindow):
 
         left_header_layout.addStretch()
 
+        # 搜索框：输入即跳转到第一个命中的版本卡片，回车跳到下一个
+        self.version_search_input = QLineEdit()
+        self.version_search_input.setPlaceholderText('🔍 搜索特性/主题/提交')
+        self.version_search_input.setMaximumWidth(180)
+        self.version_search_input.setClearButtonEnabled(True)
+        self.version_search_input.textChanged.connect(self.on_version_search)
+        self.version_search_input.returnPressed.connect(self.jump_to_next_search_result)
+        left_header_layout.addWidget(self.version_search_input)
+
+        self.search_result_label = QLabel('')
+        self.search_result_label.setStyleSheet('color: #555; font-size: 11px;')
+        left_header_layout.addWidget(self.search_result_label)
+
         add_version_btn = QPushButton('➕ 新增版本')
         add_version_btn.setMaximumWidth(90)
         add_version_btn.setStyleSheet('background: #000; color: #fff; border: none; padding: 4px 8px; border-radius: 4px; font-weight: bold;')
@@ -285,6 +281,24 @@ class ConfigEditor(QMainWindow):
         clear_btn.clicked.connect(self.clear_selection)
         toolbar_layout.addWidget(clear_btn)
 
+        select_missing_btn = QPushButton('❌ 全选未记录')
+        select_missing_btn.setMaximumWidth(110)
+        select_missing_btn.setStyleSheet(btn_style)
+        select_missing_btn.clicked.connect(self.select_unrecorded_commits)
+        toolbar_layout.addWidget(select_missing_btn)
+
+        select_since_btn = QPushButton('⏩ 自版本起')
+        select_since_btn.setMaximumWidth(100)
+        select_since_btn.setStyleSheet(btn_style)
+        select_since_btn.clicked.connect(self.select_commits_since_version)
+        toolbar_layout.addWidget(select_since_btn)
+
+        invert_btn = QPushButton('🔁 反选')
+        invert_btn.setMaximumWidth(70)
+        invert_btn.setStyleSheet(btn_style)
+        invert_btn.clicked.connect(self.invert_selection)
+        toolbar_layout.addWidget(invert_btn)
+
         toolbar_layout.addStretch()
         toolbar.setLayout(toolbar_layout)
         right_header_layout.addWidget(toolbar)
@@ -392,7 +406,12 @@ class ConfigEditor(QMainWindow):
     def _on_file_changed(self, path):
         """文件变化回调（防抖 300ms）"""
         # Windows 上某些编辑器会删除再创建文件，需要重新添加监听
+        # 原子写入（rename 覆盖）同样会让监听失效
         QTimer.singleShot(100, lambda: self._re_watch(path))
+
+        # 磁盘内容与编辑器刚写入的一致，说明是自身保存触发的事件，无需重新加载
+        if file_digest(path) == self._written_digests.get(path):
+            return
         self._reload_debounce.start()
 
     def _re_watch(self, path):
@@ -401,23 +420,35 @@ class ConfigEditor(QMainWindow):
             self._file_watcher.addPath(path)
 
     def _auto_reload(self):
-        """文件变化后自动重新加载（静默）"""
+        """文件变化后自动重新加载（静默，只重新解析 mtime / 大小变化的文件）"""
         try:
-            self._reload_files()
+            self._reload_files(force=False)
             self.update_ui()
             if self.all_git_commits:
                 self._render_timeline()
         except Exception:
             pass
 
-    def _reload_files(self):
-        """从磁盘读取配置文件到内存（不更新 UI）"""
-        if VERSION_FILE.exists():
-            with open(VERSION_FILE, 'r', encoding='utf-8') as f:
-                self.version_data = json.load(f)
-        if SITEINFO_FILE.exists():
-            with open(SITEINFO_FILE, 'r', encoding='utf-8') as f:
-                self.siteinfo_data = json.load(f)
+    def _reload_files(self, force=True):
+        """
+        从磁盘读取配置文件到内存（不更新 UI）
+        force 为 False 时跳过 (mtime, 大小) 与上次加载相同的文件，保留内存中的数据
+        """
+        for path, attr in ((VERSION_FILE, 'version_data'), (SITEINFO_FILE, 'siteinfo_data')):
+            try:
+                document = config_store.load_document(path)
+            except FileNotFoundError:
+                continue
+            if not force and self._loaded_keys.get(path) == document.key:
+                continue
+            # 编辑器会原地修改数据，使用独立副本而不是共享的解析结果
+            setattr(self, attr, document.fresh())
+            self._loaded_keys[path] = document.key
+        self.update_search_index()
+
+    def update_search_index(self):
+        """增量更新版本检索索引（只重建内容变化的版本）"""
+        self.search_index.update(self.version_data.get('versionDetails', []))
 
     def _load_initial_data(self):
         """启动时静默加载（无弹窗）"""
@@ -470,11 +501,11 @@ class ConfigEditor(QMainWindow):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             sponsor_data = dialog.get_data()
 
-            if not sponsor_data['name']:
-                QMessageBox.warning(self, '警告', '姓名不能为空')
+            try:
+                config_store.add_sponsor(self.siteinfo_data, sponsor_data)
+            except ValueError as e:
+                QMessageBox.warning(self, '警告', str(e))
                 return
-
-            self.siteinfo_data.setdefault('siteInfo', {}).setdefault('sponsors', []).append(sponsor_data)
             self.update_sponsor_table()
             QMessageBox.information(self, '成功', '赞助者添加成功（记得保存）')
 
@@ -517,10 +548,6 @@ class ConfigEditor(QMainWindow):
 
     def collect_data(self):
         """收集界面数据"""
-        # 更新版本数据
-        self.version_data['currentVersion'] = self.current_version_input.text()
-        self.version_data['lastUpdated'] = datetime.now().strftime('%Y-%m-%d')
-
         # 更新站点信息数据
         site_info = self.siteinfo_data.setdefault('siteInfo', {})
         site_info['name'] = self.site_name_input.text()
@@ -528,22 +555,27 @@ class ConfigEditor(QMainWindow):
         site_info['description'] = self.site_desc_input.text()
         site_info['author'] = self.site_author_input.text()
         site_info['github'] = self.site_github_input.text()
-        site_info['currentVersion'] = self.current_version_input.text()
 
-        self.siteinfo_data['lastUpdated'] = datetime.now().strftime('%Y-%m-%d')
+        # 更新当前版本号和最后更新日期
+        config_store.stamp_documents(
+            self.version_data, self.siteinfo_data, self.current_version_input.text()
+        )
+
+    def _write_local_files(self, contents):
+        """原子写入本地配置文件，并记录内容哈希以忽略自身触发的文件变化事件"""
+        for path, content in contents.items():
+            _, digest = write_bytes_atomic(path, content)
+            self._written_digests[str(path)] = digest
+            self._loaded_keys[path] = config_store.stat_key(path)
 
     def save_local(self):
         """保存到本地文件"""
         try:
             self.collect_data()
 
-            # 保存 version-history.json
-            with open(VERSION_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.version_data, f, ensure_ascii=False, indent=2)
-
-            # 保存 site-info.json
-            with open(SITEINFO_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.siteinfo_data, f, ensure_ascii=False, indent=2)
+            self._write_local_files(
+                config_store.serialize_documents(self.version_data, self.siteinfo_data)
+            )
 
             QMessageBox.information(self, '成功', '✅ 配置文件已保存到本地')
 
@@ -552,49 +584,22 @@ class ConfigEditor(QMainWindow):
 
     def upload_oss(self):
         """上传到 OSS"""
-        if not all([ACCESS_KEY_ID, ACCESS_KEY_SECRET, BUCKET_NAME]):
-            QMessageBox.critical(
-                self, '错误',
-                '❌ OSS 配置不完整\n请检查 .env 文件中的配置'
-            )
+        settings = config_store.get_oss_settings()
+        try:
+            backend = config_store.open_storage(settings)
+        except ValueError as e:
+            QMessageBox.critical(self, '错误', f'❌ {e}')
             return
 
         try:
-            # 先保存到本地
             self.collect_data()
 
-            # 连接 OSS
-            auth = oss2.Auth(ACCESS_KEY_ID, ACCESS_KEY_SECRET)
-            bucket = oss2.Bucket(auth, ENDPOINT, BUCKET_NAME)
-
-            # 上传 version-history.json
-            version_content = json.dumps(self.version_data, ensure_ascii=False, indent=2)
-            bucket.put_object(
-                OSS_VERSION_PATH,
-                version_content.encode('utf-8'),
-                headers={
-                    'Content-Type': 'application/json; charset=utf-8',
-                    'Cache-Control': 'public, max-age=0, must-revalidate',
-                }
-            )
-
-            # 上传 site-info.json
-            siteinfo_content = json.dumps(self.siteinfo_data, ensure_ascii=False, indent=2)
-            bucket.put_object(
-                OSS_SITEINFO_PATH,
-                siteinfo_content.encode('utf-8'),
-                headers={
-                    'Content-Type': 'application/json; charset=utf-8',
-                    'Cache-Control': 'public, max-age=0, must-revalidate',
-                }
-            )
+            # 只序列化一次，上传和本地保存使用同一份内容
+            contents = config_store.serialize_documents(self.version_data, self.siteinfo_data)
+            config_store.upload_documents(contents, settings, backend)
 
             # 同时保存到本地
-            with open(VERSION_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.version_data, f, ensure_ascii=False, indent=2)
-
-            with open(SITEINFO_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.siteinfo_data, f, ensure_ascii=False, indent=2)
+            self._write_local_files(contents)
 
             QMessageBox.information(
                 self, '成功',
@@ -617,6 +622,12 @@ class ConfigEditor(QMainWindow):
             QApplication.processEvents()
             self.all_git_commits = self.get_git_commits()
 
+            progress.setLabelText('正在统计提交改动...')
+            QApplication.processEvents()
+            self.commit_stats = config_store.get_commit_stats(
+                [commit['hash'] for commit in self.all_git_commits]
+            )
+
             progress.setLabelText('正在渲染时间线...')
             QApplication.processEvents()
             self._render_timeline()
@@ -641,6 +652,11 @@ class ConfigEditor(QMainWindow):
                     hash_to_version[hash_val] = version
 
         recorded_hashes = set(hash_to_version.keys())
+        self.hash_to_version = hash_to_version
+        self.recorded_hashes = recorded_hashes
+        self.commit_index = {
+            commit['hash']: i for i, commit in enumerate(self.all_git_commits)
+        }
 
         # 渲染左侧版本卡片
         for version in version_details:
@@ -702,14 +718,89 @@ class ConfigEditor(QMainWindow):
     def on_commit_selected(self, commit, state):
         """处理提交选中/取消"""
         if state == Qt.CheckState.Checked.value:
-            if commit not in self.selected_commits:
-                self.selected_commits.append(commit)
+            self.selected_commits.setdefault(commit['hash'], commit)
         else:
-            if commit in self.selected_commits:
-                self.selected_commits.remove(commit)
+            self.selected_commits.pop(commit['hash'], None)
 
         self.update_selected_count()
 
+    def get_ordered_selected_commits(self):
+        """按时间线顺序（最新在前）返回选中的提交"""
+        last = len(self.commit_index)
+        return sorted(
+            self.selected_commits.values(),
+            key=lambda commit: self.commit_index.get(commit['hash'], last)
+        )
+
+    def set_selection(self, hashes):
+        """批量设置选中集合，只更新状态发生变化的复选框"""
+        new_selected = {}
+        for hash_val in hashes:
+            checkbox = self.commit_checkboxes.get(hash_val)
+            if checkbox is not None:
+                new_selected[hash_val] = self.all_git_commits[self.commit_index[hash_val]]
+
+        changed = (self.selected_commits.keys() - new_selected.keys()) | \
+                  (new_selected.keys() - self.selected_commits.keys())
+        for hash_val in changed:
+            checkbox = self.commit_checkboxes[hash_val]
+            checkbox.blockSignals(True)
+            checkbox.setChecked(hash_val in new_selected)
+            checkbox.blockSignals(False)
+
+        self.selected_commits = new_selected
+        self.update_selected_count()
+
+    def select_unrecorded_commits(self):
+        """选中所有未记录到版本中的提交"""
+        if not self.all_git_commits:
+            QMessageBox.warning(self, '提示', '请先刷新时间线以加载 Git 提交历史')
+            return
+        self.set_selection(
+            commit['hash'] for commit in self.all_git_commits
+            if commit['hash'] not in self.recorded_hashes
+        )
+
+    def select_commits_since_version(self):
+        """选中某个版本之后的所有提交（不含该版本自身的提交）"""
+        if not self.all_git_commits:
+            QMessageBox.warning(self, '提示', '请先刷新时间线以加载 Git 提交历史')
+            return
+
+        versions = [
+            v.get('version', '') for v in self.version_data.get('versionDetails', [])
+            if v.get('version')
+        ]
+        if not versions:
+            QMessageBox.warning(self, '提示', '暂无版本记录')
+            return
+
+        version_number, ok = QInputDialog.getItem(
+            self, '选择起始版本', '选中该版本之后的所有提交:', versions, 0, False
+        )
+        if not ok:
+            return
+
+        # 该版本在时间线上最新的一个提交作为边界
+        positions = [
+            self.commit_index[hash_val]
+            for hash_val, version in self.hash_to_version.items()
+            if version.get('version') == version_number and hash_val in self.commit_index
+        ]
+        if not positions:
+            QMessageBox.warning(self, '提示', f'版本 v{version_number} 没有可定位的提交')
+            return
+
+        boundary = min(positions)
+        self.set_selection(commit['hash'] for commit in self.all_git_commits[:boundary])
+
+    def invert_selection(self):
+        """反选时间线上的所有提交"""
+        self.set_selection(
+            commit['hash'] for commit in self.all_git_commits
+            if commit['hash'] not in self.selected_commits
+        )
+
     def update_selected_count(self):
         """更新选中数量显示"""
         count = len(self.selected_commits)
@@ -724,7 +815,7 @@ class ConfigEditor(QMainWindow):
         # 格式化提交信息
         text = '\n'.join([
             f"{commit['hash']} {commit['message']}"
-            for commit in self.selected_commits
+            for commit in self.get_ordered_selected_commits()
         ])
 
         # 复制到剪贴板
@@ -779,7 +870,7 @@ class ConfigEditor(QMainWindow):
 
             commits_text = '\n'.join([
                 f"- {commit['hash']}: {commit['message']}"
-                for commit in self.selected_commits
+                for commit in self.get_ordered_selected_commits()
             ])
 
             prompt = f"""请将以下 {len(self.selected_commits)} 个提交信息，汇总起来，生成 public\\gacha-configs\\version-history.json 里面 v{version} 版本的 features 信息。
@@ -823,14 +914,8 @@ class ConfigEditor(QMainWindow):
         dialog.accept()
 
     def clear_selection(self):
-        """清空选择"""
-        self.selected_commits.clear()
-
-        # 取消所有复选框
-        for checkbox in self.commit_checkboxes.values():
-            checkbox.setChecked(False)
-
-        self.update_selected_count()
+        """清空选择（只取消已勾选的复选框）"""
+        self.set_selection(())
 
     def add_version(self):
         """新增版本"""
@@ -843,22 +928,15 @@ class ConfigEditor(QMainWindow):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             new_version = dialog.get_version_data()
 
-            # 验证版本号
-            if not new_version['version']:
-                QMessageBox.warning(self, '错误', '版本号不能为空')
+            # 验证并添加到版本列表头部（最新版本在前）
+            try:
+                config_store.add_version(self.version_data, new_version)
+            except ValueError as e:
+                QMessageBox.warning(self, '错误', str(e))
                 return
 
-            # 检查版本号是否已存在
-            version_details = self.version_data.setdefault('versionDetails', [])
-            for existing in version_details:
-                if existing['version'] == new_version['version']:
-                    QMessageBox.warning(self, '错误', f'版本 {new_version["version"]} 已存在')
-                    return
-
-            # 添加到版本列表头部（最新版本在前）
-            version_details.insert(0, new_version)
-
             # 刷新界面
+            self.update_search_index()
             self.refresh_timeline()
 
             QMessageBox.information(self, '成功', f'✅ 版本 v{new_version["version"]} 已添加')
@@ -878,20 +956,17 @@ class ConfigEditor(QMainWindow):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             updated_version = dialog.get_version_data()
 
-            # 验证版本号
-            if not updated_version['version']:
-                QMessageBox.warning(self, '错误', '版本号不能为空')
+            # 验证并在 versionDetails 中找到并更新
+            try:
+                config_store.update_version(
+                    self.version_data, existing_version['version'], updated_version
+                )
+            except ValueError as e:
+                QMessageBox.warning(self, '错误', str(e))
                 return
 
-            # 在 versionDetails 中找到并更新
-            version_details = self.version_data.get('versionDetails', [])
-            for i, v in enumerate(version_details):
-                if v['version'] == existing_version['version']:
-                    # 更新版本信息
-                    version_details[i] = updated_version
-                    break
-
             # 刷新界面
+            self.update_search_index()
             self.refresh_timeline()
 
             QMessageBox.information(self, '成功', f'✅ 版本 v{updated_version["version"]} 已更新')
@@ -968,6 +1043,17 @@ class ConfigEditor(QMainWindow):
             commits_label = QLabel(f"<b style='color: #333;'>Commits ({len(commits)}):</b>")
             layout.addWidget(commits_label)
 
+            # 改动统计（来自批量 git log --numstat 缓存）
+            stats = config_store.summarize_version_stats(version, self.commit_stats)
+            if stats['commits']:
+                stats_label = QLabel(
+                    f"  📊 {stats['files']} 个文件 · "
+                    f"<span style='color: #10b981;'>+{stats['insertions']}</span> / "
+                    f"<span style='color: #ef4444;'>-{stats['deletions']}</span>"
+                )
+                stats_label.setStyleSheet('font-size: 12px; color: #333;')
+                layout.addWidget(stats_label)
+
             for commit in commits:
                 hash_val = commit.get('hash', '')
                 message = commit.get('message', '')
@@ -1064,7 +1150,10 @@ class ConfigEditor(QMainWindow):
         """处理版本号链接点击事件"""
         # 提取版本号（link 格式为 "#1.2.6"）
         version_number = link.lstrip('#')
+        self.scroll_to_version_card(version_number)
 
+    def scroll_to_version_card(self, version_number):
+        """滚动到版本卡片并高亮闪烁"""
         # 查找对应的版本卡片
         target_card = self.version_card_map.get(version_number)
 
@@ -1086,40 +1175,35 @@ class ConfigEditor(QMainWindow):
             # 0.5秒后恢复原样式
             QTimer.singleShot(500, lambda: target_card.setStyleSheet(original_style))
 
+    def on_version_search(self, text):
+        """搜索框输入变化：查询索引并跳转到第一个命中的版本卡片"""
+        self.search_results = self.search_index.search(text)
+        self.search_cursor = 0
+
+        if not text.strip():
+            self.search_result_label.setText('')
+            return
+        if not self.search_results:
+            self.search_result_label.setText('无结果')
+            return
+
+        self.search_result_label.setText(f'1/{len(self.search_results)}')
+        if not self.version_card_map:
+            self.search_result_label.setText(f'{len(self.search_results)} 项（请先刷新时间线）')
+            return
+        self.scroll_to_version_card(self.search_results[0])
+
+    def jump_to_next_search_result(self):
+        """回车：跳转到下一个命中的版本卡片"""
+        if not self.search_results:
+            return
+        self.search_cursor = (self.search_cursor + 1) % len(self.search_results)
+        self.search_result_label.setText(f'{self.search_cursor + 1}/{len(self.search_results)}')
+        self.scroll_to_version_card(self.search_results[self.search_cursor])
+
     def get_git_commits(self):
         """获取所有 Git 提交历史"""
-        try:
-            # 运行 git log 获取所有提交（格式：hash|message）
-            result = subprocess.run(
-                ['git', 'log', '--all', '--pretty=format:%h|%s'],
-                cwd=PROJECT_ROOT,
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                timeout=30
-            )
-
-            if result.returncode != 0:
-                raise Exception(f'Git 命令失败:\n{result.stderr}')
-
-            # 解析提交记录
-            commits = []
-            for line in result.stdout.strip().split('\n'):
-                if '|' in line:
-                    hash_val, message = line.split('|', 1)
-                    commits.append({
-                        'hash': hash_val.strip(),
-                        'message': message.strip()
-                    })
-
-            return commits
-
-        except FileNotFoundError:
-            raise Exception('未找到 Git 命令，请确保已安装 Git')
-        except subprocess.TimeoutExpired:
-            raise Exception('Git 命令执行超时')
-        except Exception as e:
-            raise Exception(f'获取 Git 历史失败:\n{e}')
+        return config_store.get_git_commits()
 
 
 
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+活动索引生成（由各活动配置的 metadata 生成，不再手工编辑 index.json）
+在 public/gacha-configs/ 下生成：
+  - index.json                全部活动（兼容旧客户端和脚本）
+  - index-recent.json         最近 RECENT_COUNT 个活动 + 摘要（活动总数、各分片的活动数），首屏只需要这一个文件
+  - index-type-<类型>.json    按 gacha_type 分片（chip / cargo / drone / flagship）
+  - index-year-<年份>.json    按 formattedDate 的年份分片，历史年份的分片内容不再变化
+
+索引条目为 {id, gacha_type} + 活动 metadata + 机密货物类各货物 metadata 中的 *_image（侧边栏图标用）
+按日期从新到旧排列，同月按 TYPE_SLUGS 的顺序；内容没有变化的文件不重写，不再需要的分片会被删除
+
+使用方法:
+  python scripts/config_index.py
+"""
+
+import re
+
+from config_store import PROJECT_ROOT, dump_json_bytes, is_stats_file, load_config, write_bytes_atomic
+
+CONFIG_DIR = PROJECT_ROOT / 'public' / 'gacha-configs'
+FULL_INDEX = 'index.json'
+RECENT_INDEX = 'index-recent.json'
+SHARD_PATTERN = 'index-*.json'
+RECENT_COUNT = 12
+
+# gacha_type -> 分片名，顺序即同月活动的排列顺序
+TYPE_SLUGS = {
+    '旗舰宝箱类': 'flagship',
+    '机密货物类': 'cargo',
+    '无人机补给类': 'drone',
+    '筹码类': 'chip',
+}
+UNKNOWN = 'unknown'
+
+
+def activity_date(entry):
+    """formattedDate（如 2026年1月） -> (年, 月)，无法识别时返回 None"""
+    match = re.match(r'(\d+)年(\d+)月', entry.get('formattedDate') or '')
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def activity_entry(config, path):
+    """活动配置 -> 索引条目"""
+    entry = {
+        'id': config.get('id') or path.stem,
+        'gacha_type': config.get('gacha_type', ''),
+    }
+    entry.update(config.get('metadata') or {})
+    for cargo in config.get('cargos') or []:
+        for key, value in (cargo.get('metadata') or {}).items():
+            if key.endswith('_image'):
+                entry.setdefault(key, value)
+    return entry
+
+
+def _sort_key(entry):
+    date = activity_date(entry) or (0, 0)
+    type_order = list(TYPE_SLUGS).index(entry['gacha_type']) if entry['gacha_type'] in TYPE_SLUGS else len(TYPE_SLUGS)
+    return (-date[0], -date[1], type_order, entry['id'])
+
+
+def load_activities(config_dir=CONFIG_DIR):
+    """读取所有活动配置，返回按日期从新到旧排列的索引条目"""
+    entries = [
+        activity_entry(load_config(path), path)
+        for path in sorted(config_dir.glob('*/*.json'))
+        if not is_stats_file(path)
+    ]
+    ids = [entry['id'] for entry in entries]
+    duplicates = sorted({activity_id for activity_id in ids if ids.count(activity_id) > 1})
+    if duplicates:
+        raise ValueError(f"活动 ID 重复: {', '.join(duplicates)}")
+    return sorted(entries, key=_sort_key)
+
+
+def build_indexes(activities):
+    """索引条目 -> {文件名: 文档}"""
+    by_type, by_year = {}, {}
+    for entry in activities:
+        by_type.setdefault(TYPE_SLUGS.get(entry['gacha_type'], UNKNOWN), []).append(entry)
+        date = activity_date(entry)
+        by_year.setdefault(str(date[0]) if date else UNKNOWN, []).append(entry)
+
+    documents = {FULL_INDEX: {'activities': activities}}
+    for slug, entries in by_type.items():
+        documents[f'index-type-{slug}.json'] = {'activities': entries}
+    for year, entries in by_year.items():
+        documents[f'index-year-{year}.json'] = {'activities': entries}
+
+    documents[RECENT_INDEX] = {
+        'activities': activities[:RECENT_COUNT],
+        'total': len(activities),
+        'types': {slug: len(entries) for slug, entries in by_type.items()},
+        'years': {year: len(entries) for year, entries in sorted(by_year.items(), reverse=True)},
+    }
+    return documents
+
+
+def refresh_indexes(config_dir=CONFIG_DIR):
+    """
+    重新生成所有索引文件
+    返回 {'written': [新写入的文件], 'removed': [删除的旧分片], 'unchanged': 未变化的数量}
+    """
+    documents = build_indexes(load_activities(config_dir))
+    report = {'written': [], 'removed': [], 'unchanged': 0}
+    for name, data in documents.items():
+        path = config_dir / name
+        written, _ = write_bytes_atomic(path, dump_json_bytes(data) + b'\n')
+        if written:
+            report['written'].append(path)
+        else:
+            report['unchanged'] += 1
+
+    for path in sorted(config_dir.glob(SHARD_PATTERN)):
+        if path.name not in documents:
+            path.unlink()
+            report['removed'].append(path)
+    return report
+
+
+def main():
+    report = refresh_indexes()
+    for path in report['written']:
+        print(f"✅ {path.name}")
+    for path in report['removed']:
+        print(f"🗑️  {path.name}")
+    print(f"\n📇 写入 {len(report['written'])} 个 | 删除 {len(report['removed'])} 个 | "
+          f"未变化 {report['unchanged']} 个")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+配置文件版本化发布（upload-to-oss.py 和 config_store.upload_documents 共用）
+
+存储布局（<配置前缀> 即 <OSS_PATH_PREFIX>/gacha-configs/）:
+  <配置前缀>releases/<发布ID>/...             一次发布的完整配置集，不可变（max-age=1 年, immutable）
+  <配置前缀>releases/<发布ID>/manifest.json   {相对路径: 内容哈希}
+  <配置前缀>current.json                      发布指针 {'release', 'base', ...}（max-age=0），最后写入
+
+  - 发布 ID 由所有文件的内容哈希计算，内容相同的配置集得到同一个 ID（重复发布无操作）
+  - 与上一个发布内容相同的文件在服务端复制，不重新传输
+  - 只有整个配置集都写入成功后才切换指针；客户端（cdnService.js）先读指针，
+    同一会话内的配置都从同一个发布目录读取，不会看到新旧混合的文件
+  - 过渡期（MIRROR_LEGACY_PATHS）：切换指针前把内容变化的文件复制到原路径 <配置前缀><相对路径>（max-age=0），
+    不读指针的旧版页面（包括 Service Worker 缓存的旧版本）和其他直接读取原路径的脚本仍能拿到最新配置；
+    所有客户端都更新到读指针的版本后再关闭
+
+增量补丁（RFC 6902 JSON Patch，见 json_patch.py）:
+  <配置前缀>patches/<旧哈希>-<新哈希>.json     旧版本 -> 新版本的补丁，按内容命名，不可变
+  <配置前缀>releases/<发布ID>/patches.json    {相对路径: {'d': 当前哈希, 'from': [有补丁可用的旧哈希...]}}
+
+  - 哈希取内容 sha256 的前 16 位；清单中的每个文件都有条目（没有补丁时 from 为空），
+    客户端据此缓存当前版本，之后缓存了 from 中某个版本时只下载补丁
+  - 只为本次上传（内容变化）的文件生成补丁，未变化的文件沿用上一个发布的条目
+  - 每个文件最多保留最近 PATCH_HISTORY 个旧版本的补丁；补丁超过全量的 PATCH_MAX_RATIO 时不生成
+  - 旧版本内容取自本地 .cache/config-versions/，缺失时从上一个发布目录下载（只能得到紧邻的上一版）
+  - 切换指针后删除新索引不再引用的补丁
+"""
+
+import json
+import hashlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from config_store import (
+    JSON_UPLOAD_HEADERS,
+    PROJECT_ROOT,
+    SITEINFO_FILE,
+    VERSION_FILE,
+    content_digest,
+    write_bytes_atomic,
+)
+from json_patch import apply_patch, make_patch
+
+RELEASES_DIR = 'releases'
+POINTER_FILE = 'current.json'
+MANIFEST_FILE = 'manifest.json'
+
+# 发布目录下的文件永不改变，可以被 CDN 和浏览器长期缓存；指针沿用配置文件的 max-age=0
+RELEASE_HEADERS = {
+    'Content-Type': 'application/json; charset=utf-8',
+    'Cache-Control': 'public, max-age=31536000, immutable',
+}
+POINTER_HEADERS = JSON_UPLOAD_HEADERS
+
+# 由配置编辑器单独发布的文档：本地没有时沿用上一个发布（首次版本化发布时沿用原路径上的文件）
+CARRY_OVER_FILES = (VERSION_FILE.name, SITEINFO_FILE.name)
+
+# 每个目标同时进行的服务端复制数
+COPY_WORKERS = 8
+
+# 过渡期：发布后同步更新原路径上的配置文件（见模块说明）
+MIRROR_LEGACY_PATHS = True
+
+PATCHES_DIR = 'patches'
+PATCH_INDEX_FILE = 'patches.json'
+PATCH_HISTORY = 5
+PATCH_MAX_RATIO = 0.5
+VERSION_CACHE_DIR = PROJECT_ROOT / '.cache' / 'config-versions'
+
+# (旧哈希, 新哈希) -> 补丁字节（不值得生成时为 None），多个目标发布同一配置集时共用
+_patch_memo = {}
+
+
+def release_id(manifest):
+    """配置集 {相对路径: 内容哈希} -> 发布 ID"""
+    content = json.dumps(sorted(manifest.items()), separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def _get_json(backend, key):
+    content = backend.get(key)
+    if content is None:
+        return None
+    try:
+        return json.loads(content)
+    except ValueError:
+        return None
+
+
+def read_pointer(backend, config_prefix):
+    """当前发布指针，尚未版本化发布过时返回 None"""
+    return _get_json(backend, config_prefix + POINTER_FILE)
+
+
+def read_manifest(backend, config_prefix, release):
+    """某个发布的 {相对路径: 内容哈希}，不存在时返回空字典"""
+    return _get_json(backend, f'{config_prefix}{RELEASES_DIR}/{release}/{MANIFEST_FILE}') or {}
+
+
+def read_patch_index(backend, config_prefix, release):
+    """某个发布的补丁索引，不存在时返回空字典"""
+    return _get_json(backend, f'{config_prefix}{RELEASES_DIR}/{release}/{PATCH_INDEX_FILE}') or {}
+
+
+def short_digest(digest):
+    return digest[:16]
+
+
+def patch_key(config_prefix, old, new):
+    return f'{config_prefix}{PATCHES_DIR}/{old}-{new}.json'
+
+
+def remember_version(content):
+    """把发布的内容存入本地版本缓存，供以后的发布生成补丁"""
+    write_bytes_atomic(VERSION_CACHE_DIR / f'{short_digest(content_digest(content))}.json', content)
+
+
+def _cached_version(digest):
+    try:
+        return (VERSION_CACHE_DIR / f'{digest}.json').read_bytes()
+    except OSError:
+        return None
+
+
+def diff_versions(old_content, new_content, max_ratio=PATCH_MAX_RATIO):
+    """
+    生成 old -> new 的补丁字节，应用后与新内容不一致或体积超过全量的 max_ratio 时返回 None
+    """
+    try:
+        old, new = json.loads(old_content), json.loads(new_content)
+    except ValueError:
+        return None
+    patch = make_patch(old, new)
+    try:
+        if apply_patch(old, patch) != new:
+            return None
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+    content = json.dumps(patch, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if len(content) > len(new_content) * max_ratio:
+        return None
+    return content
+
+
+class ReleasePlan:
+    """
+    一个目标上的发布计划
+    upload: 需要上传内容的相对路径；copies: {相对路径: 源对象 key}，在服务端复制（与上一个发布相同的文件）
+    """
+
+    def __init__(self, config_prefix, manifest, previous=None, copies=None, previous_manifest=None):
+        self.config_prefix = config_prefix
+        self.manifest = dict(manifest)
+        self.release = release_id(self.manifest)
+        self.base = f'{RELEASES_DIR}/{self.release}/'
+        self.previous = previous
+        self.previous_manifest = dict(previous_manifest or {})
+        self.patch_index = {}
+        self.patches = {}
+        self.current = previous == self.release
+        self.copies = {} if self.current else dict(copies or {})
+        self.upload = [] if self.current else sorted(rel for rel in self.manifest if rel not in self.copies)
+
+    def key(self, rel_path):
+        """相对路径在本次发布目录下的对象 key"""
+        return self.config_prefix + self.base + rel_path
+
+
+def plan_release(backend, config_prefix, manifest):
+    """
+    读取目标上的当前指针和清单，生成发布计划
+    manifest 为本地配置集 {相对路径: 内容哈希}；CARRY_OVER_FILES 中本地缺失的文件从目标上沿用
+    """
+    pointer = read_pointer(backend, config_prefix) or {}
+    previous = pointer.get('release')
+    previous_manifest = read_manifest(backend, config_prefix, previous) if previous else {}
+    previous_base = f'{config_prefix}{RELEASES_DIR}/{previous}/'
+
+    manifest = dict(manifest)
+    copies = {}
+    for rel_path in CARRY_OVER_FILES:
+        if rel_path in manifest:
+            continue
+        if rel_path in previous_manifest:
+            manifest[rel_path] = previous_manifest[rel_path]
+            copies[rel_path] = previous_base + rel_path
+        elif not previous:
+            content = backend.get(config_prefix + rel_path)
+            if content is not None:
+                manifest[rel_path] = content_digest(content)
+                copies[rel_path] = config_prefix + rel_path
+
+    for rel_path, digest in manifest.items():
+        if rel_path not in copies and previous_manifest.get(rel_path) == digest:
+            copies[rel_path] = previous_base + rel_path
+    return ReleasePlan(config_prefix, manifest, previous, copies, previous_manifest)
+
+
+def plan_patches(backend, plan, load_content, history=PATCH_HISTORY):
+    """
+    生成本次发布的补丁索引（plan.patch_index）和需要上传的补丁（plan.patches: {key: 字节}）
+    load_content(相对路径) 返回本次上传文件的内容
+    """
+    previous_index = read_patch_index(backend, plan.config_prefix, plan.previous) if plan.previous else {}
+    previous_base = f'{plan.config_prefix}{RELEASES_DIR}/{plan.previous}/'
+    index, patches = {}, {}
+
+    for rel_path, digest in plan.manifest.items():
+        new = short_digest(digest)
+        previous_entry = previous_index.get(rel_path) or {}
+        if rel_path in plan.copies:
+            index[rel_path] = previous_entry if previous_entry.get('d') == new else {'d': new, 'from': []}
+            continue
+
+        candidates = []
+        if rel_path in plan.previous_manifest:
+            candidates.append(short_digest(plan.previous_manifest[rel_path]))
+        candidates += previous_entry.get('from', [])
+        candidates = [old for old in dict.fromkeys(candidates) if old != new][:history]
+
+        new_content = None
+        available = []
+        for old in candidates:
+            if (old, new) not in _patch_memo:
+                old_content = _cached_version(old)
+                if old_content is None and old == candidates[0] and rel_path in plan.previous_manifest:
+                    old_content = backend.get(previous_base + rel_path)
+                if old_content is None:
+                    continue
+                if new_content is None:
+                    new_content = load_content(rel_path)
+                _patch_memo[(old, new)] = diff_versions(old_content, new_content)
+            if _patch_memo[(old, new)] is not None:
+                available.append(old)
+                patches[patch_key(plan.config_prefix, old, new)] = _patch_memo[(old, new)]
+        index[rel_path] = {'d': new, 'from': available}
+
+    plan.patch_index = index
+    plan.patches = patches
+    return plan
+
+
+def prune_patches(backend, plan):
+    """删除当前补丁索引不再引用的补丁，返回删除数量"""
+    keep = {
+        patch_key(plan.config_prefix, old, entry['d'])
+        for entry in plan.patch_index.values()
+        for old in entry['from']
+    }
+    stale = [info['key'] for info in backend.list(f'{plan.config_prefix}{PATCHES_DIR}/') if info['key'] not in keep]
+    for key in stale:
+        backend.delete(key)
+    return len(stale)
+
+
+def finish_release(backend, plan, load_content=None, workers=COPY_WORKERS):
+    """
+    上传内容完成后调用：服务端复制未变化的文件，上传增量补丁，写入清单，同步原路径，最后切换指针
+    load_content 为 None 时不生成补丁
+    任何一步失败都会抛出异常，此时指针仍指向上一个发布；清理旧补丁失败不影响发布
+    """
+    if plan.current:
+        return
+    if load_content is not None:
+        plan_patches(backend, plan, load_content)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(
+            lambda item: backend.copy(item[1], plan.key(item[0]), headers=RELEASE_HEADERS),
+            plan.copies.items(),
+        ))
+        list(pool.map(
+            lambda item: backend.put(item[0], item[1], headers=RELEASE_HEADERS),
+            plan.patches.items(),
+        ))
+    patch_index = json.dumps(plan.patch_index, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    backend.put(plan.key(PATCH_INDEX_FILE), patch_index.encode('utf-8'), headers=RELEASE_HEADERS)
+
+    manifest = json.dumps(plan.manifest, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+    backend.put(plan.key(MANIFEST_FILE), manifest, headers=RELEASE_HEADERS)
+
+    # 在切换指针前同步原路径：失败时和其他步骤一样不切换指针，重新发布会再次同步
+    if MIRROR_LEGACY_PATHS:
+        mirror_legacy_paths(backend, plan, workers)
+
+    pointer = {
+        'release': plan.release,
+        'base': plan.base,
+        'previous': plan.previous,
+        'files': len(plan.manifest),
+        'publishedAt': datetime.now().isoformat(timespec='seconds'),
+    }
+    backend.put(plan.config_prefix + POINTER_FILE, json.dumps(pointer, ensure_ascii=False, indent=2).encode('utf-8'),
+                headers=POINTER_HEADERS)
+
+    try:
+        prune_patches(backend, plan)
+    except Exception as e:
+        print(f"⚠️  清理旧补丁失败: {e}")
+
+
+def mirror_legacy_paths(backend, plan, workers=COPY_WORKERS):
+    """把本次发布中内容变化的文件复制到原路径（未版本化时客户端读取的位置），返回复制的数量"""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(
+            lambda rel_path: backend.copy(plan.key(rel_path), plan.config_prefix + rel_path,
+                                          headers=JSON_UPLOAD_HEADERS),
+            plan.upload,
+        ))
+    return len(plan.upload)
+
+
+def publish_release(backend, config_prefix, manifest, contents):
+    """
+    单目标的完整发布：contents 为 {相对路径: 字节}，需要覆盖计划中所有要上传的文件
+    返回发布计划
+    """
+    plan = plan_release(backend, config_prefix, manifest)
+    for rel_path in plan.upload:
+        backend.put_content(plan.key(rel_path), contents[rel_path], headers=RELEASE_HEADERS)
+    finish_release(backend, plan, load_content=contents.__getitem__)
+    for rel_path in plan.upload:
+        remember_version(contents[rel_path])
+    return plan
+
+
+def publish_update(backend, config_prefix, contents):
+    """
+    在当前发布的基础上替换部分文件并发布新版本（如编辑器只修改 version-history / site-info）
+    contents 为 {相对路径: 字节}；尚未版本化发布过时返回 None，由调用方按原路径上传
+    """
+    pointer = read_pointer(backend, config_prefix)
+    if not pointer or not pointer.get('release'):
+        return None
+    manifest = read_manifest(backend, config_prefix, pointer['release'])
+    if not manifest:
+        raise ValueError(f"无法读取发布 {pointer['release']} 的清单，请用 upload-to-oss.py 重新发布全部配置")
+    manifest.update({rel_path: content_digest(content) for rel_path, content in contents.items()})
+    return publish_release(backend, config_prefix, manifest, contents)
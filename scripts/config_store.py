@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+配置文件存储与数据操作（不依赖 Qt）
+负责 version-history.json 和 site-info.json 的读取、修改、原子写入与上传
+GUI（config-editor.py）和命令行（config-cli.py）共用
+
+JSON 配置读取统一走 load_document / load_config：
+  - 按 (路径, mtime, 大小) 缓存原始字节和解析结果，文件未变化时只需一次 stat
+  - 安装了 orjson 时用它解析（pip install orjson，可选）
+"""
+
+import os
+import json
+import hashlib
+import subprocess
+import tempfile
+from pathlib import Path
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 配置文件路径
+PROJECT_ROOT = Path(__file__).parent.parent
+VERSION_FILE = PROJECT_ROOT / 'public' / 'gacha-configs' / 'version-history.json'
+SITEINFO_FILE = PROJECT_ROOT / 'public' / 'gacha-configs' / 'site-info.json'
+
+VERSION_TYPES = ('patch', 'minor', 'major')
+
+# 活动统计文件后缀（gacha_stats.py 生成，与配置放在同一目录，扫描配置时需要跳过）
+STATS_SUFFIX = '.stats.json'
+
+JSON_UPLOAD_HEADERS = {
+    'Content-Type': 'application/json; charset=utf-8',
+    'Cache-Control': 'public, max-age=0, must-revalidate',
+}
+
+
+def dump_json_bytes(data):
+    """按编辑器统一格式序列化为 UTF-8 字节"""
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def content_digest(content):
+    """计算内容哈希（用于判断文件是否变化）"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_digest(path):
+    """计算磁盘文件的内容哈希，文件不存在时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            return content_digest(f.read())
+    except OSError:
+        return None
+
+
+def _target_mode(path):
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_bytes_atomic(path, content):
+    """
+    原子写入：先写同目录临时文件，再 rename 覆盖目标文件
+    内容与磁盘一致时跳过写入
+
+    返回 (是否写入, 内容哈希)
+    """
+    path = Path(path)
+    digest = content_digest(content)
+    if file_digest(path) == digest:
+        return False, digest
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp 创建的文件权限为 0600，改为原文件权限（新文件按 umask）
+        os.chmod(tmp_path, _target_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return True, digest
+
+
+def write_json_atomic(path, data):
+    """序列化并原子写入 JSON，返回 (是否写入, 内容哈希)"""
+    return write_bytes_atomic(path, dump_json_bytes(data))
+
+
+def is_stats_file(path):
+    return Path(path).name.endswith(STATS_SUFFIX)
+
+
+# ========== 配置读取（带缓存） ==========
+
+def parse_json(content):
+    """解析 JSON 字节（有 orjson 时使用 orjson），格式错误时抛出 ValueError"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class ConfigDocument:
+    """磁盘上一个 JSON 文件某一时刻的内容：原始字节 + 按需解析的数据"""
+
+    __slots__ = ('path', 'key', 'content', '_data')
+
+    def __init__(self, path, key, content):
+        self.path = path
+        self.key = key
+        self.content = content
+        self._data = None
+
+    @property
+    def data(self):
+        """解析结果（多个调用方共享，不要修改）"""
+        if self._data is None:
+            self._data = parse_json(self.content)
+        return self._data
+
+    def fresh(self):
+        """可修改的副本（从缓存的字节重新解析，不读磁盘）"""
+        return parse_json(self.content)
+
+
+# 路径字符串 -> ConfigDocument
+_documents = {}
+
+
+def stat_key(path):
+    """文件的 (mtime_ns, 大小)，用于判断内容是否可能变化"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_document(path):
+    """
+    读取 JSON 文件（字节和解析结果一起缓存）
+    mtime 和大小都没变时直接返回缓存，不读文件；文件不存在时抛出 FileNotFoundError
+    """
+    path = Path(path)
+    key = stat_key(path)
+    document = _documents.get(str(path))
+    if document is None or document.key != key:
+        document = ConfigDocument(path, key, path.read_bytes())
+        _documents[str(path)] = document
+    return document
+
+
+def load_config(path):
+    """读取 JSON 配置的解析结果（共享，只读）"""
+    return load_document(path).data
+
+
+def forget_documents(path=None):
+    """清除读取缓存（path 为 None 时全部清除）"""
+    if path is None:
+        _documents.clear()
+    else:
+        _documents.pop(str(Path(path)), None)
+
+
+def load_json(path):
+    """读取 JSON 文件的可修改副本，文件不存在时返回空字典"""
+    try:
+        return load_document(path).fresh()
+    except FileNotFoundError:
+        return {}
+
+
+def load_documents():
+    """读取 (version_data, siteinfo_data)"""
+    return load_json(VERSION_FILE), load_json(SITEINFO_FILE)
+
+
+def get_oss_settings():
+    """从环境变量（.env）读取 OSS 配置、存储后端（见 storage_backend.py）和上传路径"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    prefix = os.getenv('OSS_PATH_PREFIX', '')
+    base = f'{prefix.rstrip("/")}/gacha-configs/' if prefix else 'gacha-configs/'
+    return {
+        'access_key_id': os.getenv('OSS_ACCESS_KEY_ID'),
+        'access_key_secret': os.getenv('OSS_ACCESS_KEY_SECRET'),
+        'endpoint': os.getenv('OSS_ENDPOINT', 'oss-cn-hangzhou.aliyuncs.com'),
+        'bucket_name': os.getenv('OSS_BUCKET_NAME'),
+        'backend': os.getenv('STORAGE_BACKEND', 'oss'),
+        'latency_ms': os.getenv('STORAGE_LATENCY_MS', 0),
+        'bandwidth_kbps': os.getenv('STORAGE_BANDWIDTH_KBPS', 0),
+        'config_prefix': base,
+        'version_path': base + 'version-history.json',
+        'siteinfo_path': base + 'site-info.json',
+    }
+
+
+# ========== Git ==========
+
+def get_git_commits():
+    """获取所有 Git 提交历史（最新在前）"""
+    try:
+        # 运行 git log 获取所有提交（格式：hash|message）
+        result = subprocess.run(
+            ['git', 'log', '--all', '--pretty=format:%h|%s'],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            timeout=30
+        )
+
+        if result.returncode != 0:
+            raise Exception(f'Git 命令失败:\n{result.stderr}')
+
+        # 解析提交记录
+        commits = []
+        for line in result.stdout.strip().split('\n'):
+            if '|' in line:
+                hash_val, message = line.split('|', 1)
+                commits.append({
+                    'hash': hash_val.strip(),
+                    'message': message.strip()
+                })
+
+        return commits
+
+    except FileNotFoundError:
+        raise Exception('未找到 Git 命令，请确保已安装 Git')
+    except subprocess.TimeoutExpired:
+        raise Exception('Git 命令执行超时')
+    except Exception as e:
+        raise Exception(f'获取 Git 历史失败:\n{e}')
+
+
+# 提交统计缓存：hash（短 hash 和完整 hash 均可）-> {'files', 'insertions', 'deletions'}
+_commit_stats_cache = {}
+
+
+def get_commit_stats(hashes=None):
+    """
+    获取提交的改动统计（文件数 / 新增行 / 删除行），结果按 hash 缓存
+    hashes 为 None 时一次 git log --all --numstat 取回所有提交；
+    否则只对尚未缓存的提交运行 git log --numstat（hash 须来自 get_git_commits，即仓库中存在的提交）
+    """
+    if hashes is None:
+        args = ['--all']
+        stdin = None
+    else:
+        missing = list(dict.fromkeys(h for h in hashes if h not in _commit_stats_cache))
+        if not missing:
+            return {h: _commit_stats_cache[h] for h in hashes}
+        args = ['--no-walk', '--stdin']
+        stdin = '\n'.join(missing) + '\n'
+
+    try:
+        result = subprocess.run(
+            ['git', 'log', *args, '--numstat', '--pretty=format:\x1e%h\x1f%H'],
+            cwd=PROJECT_ROOT,
+            input=stdin,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=120
+        )
+    except FileNotFoundError:
+        raise Exception('未找到 Git 命令，请确保已安装 Git')
+    except subprocess.TimeoutExpired:
+        raise Exception('Git 命令执行超时')
+
+    if result.returncode != 0:
+        raise Exception(f'Git 命令失败:\n{result.stderr}')
+
+    for block in result.stdout.split('\x1e'):
+        if not block.strip():
+            continue
+        header, _, body = block.partition('\n')
+        short_hash, _, full_hash = header.strip().partition('\x1f')
+        stats = {'files': 0, 'insertions': 0, 'deletions': 0}
+        for line in body.splitlines():
+            parts = line.split('\t', 2)
+            if len(parts) != 3:
+                continue
+            added, deleted, _ = parts
+            stats['files'] += 1
+            # 二进制文件显示为 "-"
+            if added.isdigit():
+                stats['insertions'] += int(added)
+            if deleted.isdigit():
+                stats['deletions'] += int(deleted)
+        _commit_stats_cache[short_hash] = stats
+        _commit_stats_cache[full_hash] = stats
+
+    if hashes is None:
+        return dict(_commit_stats_cache)
+    return {h: _commit_stats_cache[h] for h in hashes if h in _commit_stats_cache}
+
+
+def summarize_version_stats(version, commit_stats):
+    """按 versionDetails[].commits 汇总版本的改动统计"""
+    total = {'commits': 0, 'files': 0, 'insertions': 0, 'deletions': 0}
+    for commit in version.get('commits', []):
+        stats = commit_stats.get(commit.get('hash', '').strip())
+        if not stats:
+            continue
+        total['commits'] += 1
+        total['files'] += stats['files']
+        total['insertions'] += stats['insertions']
+        total['deletions'] += stats['deletions']
+    return total
+
+
+def get_recorded_hashes(version_data):
+    """返回已记录到 versionDetails 中的提交 hash 集合"""
+    return {
+        commit.get('hash', '').strip()
+        for version in version_data.get('versionDetails', [])
+        for commit in version.get('commits', [])
+        if commit.get('hash', '').strip()
+    }
+
+
+def find_missing_commits(version_data, commits):
+    """返回未记录到任何版本中的提交（保持时间线顺序）"""
+    recorded = get_recorded_hashes(version_data)
+    return [commit for commit in commits if commit['hash'] not in recorded]
+
+
+# ========== 版本 / 赞助者 ==========
+
+def find_version(version_data, version_number):
+    """按版本号查找版本，返回 (索引, 版本数据)，找不到返回 (-1, None)"""
+    for i, version in enumerate(version_data.get('versionDetails', [])):
+        if version.get('version') == version_number:
+            return i, version
+    return -1, None
+
+
+def validate_version(version):
+    """校验版本数据，不合法时抛出 ValueError"""
+    if not version.get('version'):
+        raise ValueError('版本号不能为空')
+    if version.get('type', 'patch') not in VERSION_TYPES:
+        raise ValueError(f'版本类型必须是 {"/".join(VERSION_TYPES)} 之一')
+    date_str = version.get('date', '')
+    if date_str:
+        datetime.strptime(date_str, '%Y-%m-%d')
+
+
+def add_version(version_data, new_version):
+    """添加版本到列表头部（最新版本在前），版本号重复时抛出 ValueError"""
+    validate_version(new_version)
+    version_details = version_data.setdefault('versionDetails', [])
+    if find_version(version_data, new_version['version'])[1] is not None:
+        raise ValueError(f'版本 {new_version["version"]} 已存在')
+    version_details.insert(0, new_version)
+    return new_version
+
+
+def update_version(version_data, version_number, updated_version):
+    """替换指定版本号的版本数据，找不到时抛出 ValueError"""
+    validate_version(updated_version)
+    index, _ = find_version(version_data, version_number)
+    if index < 0:
+        raise ValueError(f'版本 {version_number} 不存在')
+    if updated_version['version'] != version_number and \
+            find_version(version_data, updated_version['version'])[1] is not None:
+        raise ValueError(f'版本 {updated_version["version"]} 已存在')
+    version_data['versionDetails'][index] = updated_version
+    return updated_version
+
+
+def add_sponsor(siteinfo_data, sponsor):
+    """追加赞助者，姓名为空时抛出 ValueError"""
+    if not sponsor.get('name'):
+        raise ValueError('姓名不能为空')
+    siteinfo_data.setdefault('siteInfo', {}).setdefault('sponsors', []).append(sponsor)
+    return sponsor
+
+
+def stamp_documents(version_data, siteinfo_data, current_version=None):
+    """更新当前版本号和最后更新日期（保存前调用）"""
+    today = datetime.now().strftime('%Y-%m-%d')
+    if current_version is not None:
+        version_data['currentVersion'] = current_version
+        siteinfo_data.setdefault('siteInfo', {})['currentVersion'] = current_version
+    version_data['lastUpdated'] = today
+    siteinfo_data['lastUpdated'] = today
+
+
+# ========== 保存 / 上传 ==========
+
+def serialize_documents(version_data, siteinfo_data):
+    """序列化两份文档，返回 {本地路径: 字节内容}"""
+    return {
+        VERSION_FILE: dump_json_bytes(version_data),
+        SITEINFO_FILE: dump_json_bytes(siteinfo_data),
+    }
+
+
+def save_documents(contents):
+    """原子写入序列化后的文档，返回 {路径字符串: (是否写入, 内容哈希)}"""
+    return {str(path): write_bytes_atomic(path, content) for path, content in contents.items()}
+
+
+def open_storage(settings=None):
+    """按配置创建存储后端（OSS 时才导入 oss2），OSS 配置不完整时抛出 ValueError"""
+    from storage_backend import open_backend
+
+    settings = settings or get_oss_settings()
+    return open_backend(
+        settings.get('backend', 'oss'),
+        access_key_id=settings['access_key_id'],
+        access_key_secret=settings['access_key_secret'],
+        endpoint=settings['endpoint'],
+        bucket_name=settings['bucket_name'],
+        latency_ms=settings.get('latency_ms', 0),
+        bandwidth_kbps=settings.get('bandwidth_kbps', 0),
+    )
+
+
+def upload_documents(contents, settings=None, backend=None):
+    """
+    上传序列化后的文档到存储后端（默认按 .env 配置创建）
+    已经版本化发布过配置时（见 config_release.py），在当前发布的基础上发布新版本；否则按原路径覆盖上传
+    返回写入的对象 key
+    """
+    from config_release import POINTER_FILE, publish_update
+
+    settings = settings or get_oss_settings()
+    backend = backend or open_storage(settings)
+
+    config_prefix = settings['config_prefix']
+    rel_paths = {path: path.relative_to(VERSION_FILE.parent).as_posix() for path in contents}
+    plan = publish_update(backend, config_prefix, {rel_paths[path]: content for path, content in contents.items()})
+    if plan is not None:
+        return [] if plan.current else [plan.key(rel_path) for rel_path in plan.upload] + [config_prefix + POINTER_FILE]
+
+    oss_paths = {
+        VERSION_FILE: settings['version_path'],
+        SITEINFO_FILE: settings['siteinfo_path'],
+    }
+    for path, content in contents.items():
+        backend.put(oss_paths[path], content, headers=JSON_UPLOAD_HEADERS)
+    return [oss_paths[path] for path in contents]
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+多进程批量模拟（所有活动 × 场景）
+把 (活动, 奖池, 场景) 任务按玩家切成固定大小的分片分给进程池：
+  - 随机数：每个任务的种子由根种子和任务名（活动/奖池/场景）派生，再为每个分片 spawn 独立子流，
+    分片划分与进程数无关，因此结果与 --workers 无关、逐位一致，也与同批次的其他任务无关
+  - 结果：大数组（每个玩家的集齐抽数 / 抽中次数矩阵）由子进程直接写入共享内存，
+    只回传物品命中计数等小对象，不经过 pickle
+  - --stream：不保存每个玩家的结果，每个分片只回传固定大小的可合并摘要
+    （gacha_summary），内存与玩家数无关，适合 1e8+ 玩家；分位数附带误差区间
+
+场景:
+  completion   每个玩家抽到集齐默认目标（gacha_sim.simulate_completion）
+  pulls:N      每个玩家固定抽 N 次（gacha_sim.simulate_pulls）
+
+依赖安装:
+  pip install numpy
+
+使用方法:
+  python scripts/gacha_batch.py --all --seed 42
+  python scripts/gacha_batch.py ag98 be100 --scenario completion --scenario pulls:100 --workers 4
+  python scripts/gacha_batch.py --all --seed 42 --output stats.json
+  python scripts/gacha_batch.py ag98 --players 100000000 --stream --seed 42
+  python scripts/gacha_batch.py --all --seed 42 --cache      # 结果写入 / 读取磁盘缓存（gacha_cache）
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing as mp
+from functools import lru_cache
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from gacha_sim import (
+    GachaPool, DEFAULT_MAX_PULLS, load_index,
+    simulate_completion, simulate_pulls,
+)
+from gacha_summary import CompletionSummary, PullSummary
+from gacha_cache import SimulationCache, cache_key
+from gacha_catalog import get_catalog
+
+DEFAULT_PLAYERS = 100_000
+DEFAULT_SHARD_PLAYERS = 25_000
+DEFAULT_SCENARIOS = ('completion',)
+
+
+def parse_scenario(spec):
+    """解析场景字符串，返回 (类型, 参数)"""
+    if spec == 'completion':
+        return 'completion', None
+    kind, _, value = spec.partition(':')
+    if kind == 'pulls' and value.isdigit() and int(value) > 0:
+        return 'pulls', int(value)
+    raise ValueError(f'无法识别的场景: {spec}（可选 completion / pulls:N）')
+
+
+def build_jobs(activity_ids, scenarios, catalog=None):
+    """展开 (活动, 奖池, 场景) 任务列表；概率总和为 0 等无法模拟的奖池跳过并返回原因"""
+    catalog = catalog or get_catalog()
+    jobs = []
+    skipped = []
+    for activity_id in activity_ids:
+        if activity_id not in catalog:
+            skipped.append((activity_id, f'未找到活动配置: {activity_id}'))
+            continue
+        config_hash = catalog.activity(activity_id)['configHash']
+        for pool_key in catalog.pool_keys_of(activity_id):
+            try:
+                pool = catalog.pool(activity_id, pool_key)
+            except ValueError as e:
+                skipped.append((f'{activity_id}/{pool_key}', str(e)))
+                continue
+            for spec in scenarios:
+                kind, value = parse_scenario(spec)
+                jobs.append({
+                    'activity': activity_id,
+                    'pool': pool_key,
+                    'scenario': spec,
+                    'kind': kind,
+                    'pulls': value,
+                    'items': pool.size,
+                    'configHash': config_hash,
+                })
+    return jobs, skipped
+
+
+@lru_cache(maxsize=None)
+def _worker_pool(activity_id, pool_key):
+    """子进程内缓存奖池（同一奖池的多个分片只加载一次配置）"""
+    return GachaPool.from_activity(activity_id, pool_key)
+
+
+def _result_layout(job, n_players):
+    """任务结果数组的 (shape, dtype)"""
+    if job['kind'] == 'completion':
+        return (n_players,), np.int64
+    return (n_players, job['items']), np.int32
+
+
+def _run_shard(task):
+    """
+    在子进程中模拟一个分片：结果写入共享内存中对应的行并返回物品命中计数，
+    流式模式（没有共享内存）下返回该分片的摘要
+    """
+    job, start, count, seed_seq, shm_name, shape, dtype, max_pulls = task
+    began = time.perf_counter()
+    pool = _worker_pool(job['activity'], job['pool'])
+    rng = np.random.default_rng(seed_seq)
+
+    if shm_name is None:
+        if job['kind'] == 'completion':
+            partial = CompletionSummary(pool.size).add(simulate_completion(pool, count, max_pulls, seed=rng))
+        else:
+            partial = PullSummary(pool.size).add(simulate_pulls(pool, count, job['pulls'], seed=rng))
+        return job['index'], partial, partial.total_pulls, time.perf_counter() - began
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        if job['kind'] == 'completion':
+            result = simulate_completion(pool, count, max_pulls, seed=rng)
+            out[start:start + count] = result['pulls']
+            item_hits = result['item_hits']
+            total_pulls = result['total_pulls']
+        else:
+            counts = simulate_pulls(pool, count, job['pulls'], seed=rng)
+            out[start:start + count] = counts
+            item_hits = counts.sum(axis=0, dtype=np.int64)
+            total_pulls = count * job['pulls']
+        del out
+    finally:
+        shm.close()
+    return job['index'], item_hits, total_pulls, time.perf_counter() - began
+
+
+def _summarize(job, array, item_hits, total_pulls, pool_labels):
+    """从结果数组计算摘要（在共享内存视图上直接计算，不复制）"""
+    summary = {
+        'activity': job['activity'],
+        'pool': job['pool'],
+        'scenario': job['scenario'],
+        'players': int(array.shape[0]),
+        'totalPulls': int(total_pulls),
+        'digest': hashlib.sha256(array.tobytes()).hexdigest()[:16],
+    }
+    if job['kind'] == 'completion':
+        done = array[array >= 0]
+        summary['completed'] = int(done.size)
+        if done.size:
+            p50, p90, p99 = np.percentile(done, [50, 90, 99])
+            summary.update({
+                'mean': float(done.mean()), 'p50': float(p50), 'p90': float(p90),
+                'p99': float(p99), 'max': int(done.max()),
+            })
+    else:
+        mean = array.mean(axis=0)
+        summary['pullsPerPlayer'] = job['pulls']
+        summary['meanObtained'] = {label: float(m) for label, m in zip(pool_labels, mean)}
+    summary['itemHits'] = {label: int(h) for label, h in zip(pool_labels, item_hits)}
+    return summary
+
+
+def _summarize_stream(job, merged, pool_labels):
+    """从合并后的流式摘要生成与 _summarize 相同结构的结果（分位数附带误差区间）"""
+    report = merged.report()
+    summary = {
+        'activity': job['activity'],
+        'pool': job['pool'],
+        'scenario': job['scenario'],
+        'players': merged.players,
+        'totalPulls': merged.total_pulls,
+    }
+    if job['kind'] == 'completion':
+        state = merged.histogram.counts.tobytes() + merged.item_hits.tobytes()
+        summary['completed'] = merged.completed
+        if merged.completed:
+            summary.update({key: report[key] for key in report if re.fullmatch(r'p\d+(Bounds)?', key) or key in ('mean', 'std')})
+            summary['relativeError'] = report['relativeError']
+    else:
+        state = merged.item_hits.tobytes() + merged.item_squares.tobytes()
+        summary['pullsPerPlayer'] = job['pulls']
+        summary['meanObtained'] = dict(zip(pool_labels, report['mean']))
+    summary['digest'] = hashlib.sha256(state).hexdigest()[:16]
+    summary['itemHits'] = {label: int(h) for label, h in zip(pool_labels, merged.item_hits)}
+    return summary
+
+
+def _job_seed(root, job):
+    """由根种子和任务名派生任务种子（与任务在批次中的位置无关）"""
+    name = f"{job['activity']}/{job['pool']}/{job['scenario']}".encode('utf-8')
+    spawn_key = tuple(int.from_bytes(hashlib.sha256(name).digest()[i:i + 4], 'little') for i in (0, 4))
+    return np.random.SeedSequence(root.entropy, spawn_key=spawn_key)
+
+
+def run_batch(jobs, n_players=DEFAULT_PLAYERS, seed=None, workers=None,
+              shard_players=DEFAULT_SHARD_PLAYERS, max_pulls=DEFAULT_MAX_PULLS, progress=None,
+              stream=False):
+    """
+    并行执行任务，返回 (摘要列表, 根种子熵, 统计信息)
+    workers=1 时在当前进程中顺序执行（分片和种子完全相同）
+    stream=True 时不分配共享内存，分片摘要在主进程中合并
+    """
+    root = np.random.SeedSequence(seed)
+    job_seeds = [_job_seed(root, job) for job in jobs]
+    n_shards = -(-n_players // shard_players)
+
+    buffers = []
+    tasks = []
+    try:
+        for index, (job, job_seed) in enumerate(zip(jobs, job_seeds)):
+            job = dict(job, index=index)
+            if stream:
+                shm, shape, dtype = None, None, None
+            else:
+                shape, dtype = _result_layout(job, n_players)
+                nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+                shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            buffers.append((job, shm, shape, dtype))
+            for shard, shard_seed in enumerate(job_seed.spawn(n_shards)):
+                start = shard * shard_players
+                count = min(shard_players, n_players - start)
+                tasks.append((job, start, count, shard_seed, shm and shm.name, shape, dtype, max_pulls))
+
+        item_hits = [np.zeros(job['items'], dtype=np.int64) for job in jobs]
+        merged = [None] * len(jobs)
+        total_pulls = [0] * len(jobs)
+        shards_left = [n_shards] * len(jobs)
+        cpu_time = 0.0
+        summaries = [None] * len(jobs)
+        began = time.perf_counter()
+
+        def collect(index, partial, pulls, elapsed):
+            nonlocal cpu_time
+            if stream:
+                # 摘要只做整数累加，合并顺序不影响结果
+                merged[index] = partial if merged[index] is None else merged[index].merge(partial)
+            else:
+                item_hits[index] += partial
+            total_pulls[index] += pulls
+            cpu_time += elapsed
+            shards_left[index] -= 1
+            if shards_left[index]:
+                return
+            job, shm, shape, dtype = buffers[index]
+            labels = _pool_labels(job['activity'], job['pool'])
+            if stream:
+                summaries[index] = _summarize_stream(job, merged[index], labels)
+                merged[index] = None
+            else:
+                array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                summaries[index] = _summarize(job, array, item_hits[index], total_pulls[index], labels)
+                del array
+            if progress:
+                progress(summaries[index])
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or not tasks:
+            for task in tasks:
+                collect(*_run_shard(task))
+        else:
+            # spawn 与 Windows 行为一致，子进程不继承父进程状态
+            with mp.get_context('spawn').Pool(workers) as process_pool:
+                for result in process_pool.imap_unordered(_run_shard, tasks):
+                    collect(*result)
+
+        wall_time = time.perf_counter() - began
+    finally:
+        for _, shm, _, _ in buffers:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    stats = {
+        'workers': workers,
+        'shards': len(tasks),
+        'totalPulls': int(sum(total_pulls)),
+        'wallTime': wall_time,
+        'cpuTime': cpu_time,
+    }
+    return summaries, root.entropy, stats
+
+
+def job_cache_key(job, n_players, seed, shard_players, max_pulls, stream):
+    """任务结果的缓存键（包含所有影响结果的参数）"""
+    params = {
+        'pool': job['pool'], 'scenario': job['scenario'], 'players': n_players, 'seed': seed,
+        'shardPlayers': shard_players, 'maxPulls': max_pulls, 'stream': bool(stream),
+    }
+    return cache_key(job['configHash'], params)
+
+
+def run_batch_cached(jobs, cache, n_players=DEFAULT_PLAYERS, seed=None, workers=None,
+                     shard_players=DEFAULT_SHARD_PLAYERS, max_pulls=DEFAULT_MAX_PULLS,
+                     progress=None, stream=False):
+    """
+    先查缓存，只模拟未命中的任务并写回缓存；需要固定 seed（随机种子的结果不可复用）
+    返回值与 run_batch 相同，统计信息中额外包含命中数
+    """
+    if seed is None:
+        raise ValueError('使用缓存时必须指定 seed')
+
+    summaries = [None] * len(jobs)
+    keys = [job_cache_key(job, n_players, seed, shard_players, max_pulls, stream) for job in jobs]
+    misses = []
+    for index, key in enumerate(keys):
+        summaries[index] = cache.get(key)
+        if summaries[index] is None:
+            misses.append(index)
+        elif progress:
+            progress(summaries[index])
+
+    computed, entropy, stats = run_batch(
+        [jobs[i] for i in misses], n_players, seed, workers, shard_players, max_pulls, progress, stream,
+    )
+    for index, summary in zip(misses, computed):
+        summaries[index] = summary
+        cache.put(keys[index], jobs[index]['activity'], jobs[index]['configHash'], summary)
+
+    stats['cacheHits'] = len(jobs) - len(misses)
+    return summaries, entropy, stats
+
+
+def _pool_labels(activity_id, pool_key):
+    pool = _worker_pool(activity_id, pool_key)
+    return [pool.item_label(slot) for slot in range(pool.size)]
+
+
+def _print_summary(summary):
+    label = f"{summary['activity']}/{summary['pool']} [{summary['scenario']}]"
+    if 'mean' in summary:
+        detail = (f"期望 {summary['mean']:8.1f} | P50 {summary['p50']:6.0f} | "
+                  f"P90 {summary['p90']:6.0f} | P99 {summary['p99']:6.0f}")
+        if 'p99Bounds' in summary:
+            low, high = summary['p99Bounds']
+            detail += f" [{low}, {high}]"
+        if summary['completed'] < summary['players']:
+            detail += f" | 集齐 {summary['completed'] / summary['players']:.1%}"
+    elif 'meanObtained' in summary:
+        top = sorted(summary['meanObtained'].items(), key=lambda kv: -kv[1])[:3]
+        detail = ' | '.join(f'{name} {mean:.2f}' for name, mean in top)
+    else:
+        detail = '无玩家集齐'
+    print(f"   {label:<36} {detail} | {summary['digest']}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多进程批量抽奖模拟（结果与进程数无关）')
+    parser.add_argument('activities', nargs='*', help='活动 ID（与 --all 二选一）')
+    parser.add_argument('--all', action='store_true', help='模拟 index.json 中的所有活动')
+    parser.add_argument('--scenario', action='append', help='场景：completion / pulls:N（可多次，默认 completion）')
+    parser.add_argument('--players', type=int, default=DEFAULT_PLAYERS, help=f'每个任务的玩家数（默认 {DEFAULT_PLAYERS}）')
+    parser.add_argument('--max-pulls', type=int, default=DEFAULT_MAX_PULLS, help='集齐场景每个玩家最多抽数')
+    parser.add_argument('--shard-players', type=int, default=DEFAULT_SHARD_PLAYERS, help='每个分片的玩家数')
+    parser.add_argument('--workers', type=int, help='进程数（默认 CPU 核数，1 为单进程）')
+    parser.add_argument('--seed', type=int, help='根随机种子（不指定时随机生成并输出）')
+    parser.add_argument('--stream', action='store_true', help='流式摘要模式（不保存每个玩家的结果，内存固定）')
+    parser.add_argument('--cache', action='store_true', help='读写磁盘缓存（需要 --seed）')
+    parser.add_argument('--output', help='摘要输出为 JSON 文件')
+    args = parser.parse_args()
+
+    if args.all == bool(args.activities):
+        parser.error('需要指定活动 ID 或 --all（二选一）')
+    if args.cache and args.seed is None:
+        parser.error('--cache 需要指定 --seed')
+
+    activity_ids = [a['id'] for a in load_index().get('activities', [])] if args.all else args.activities
+    try:
+        jobs, skipped = build_jobs(activity_ids, args.scenario or DEFAULT_SCENARIOS)
+    except ValueError as e:
+        parser.error(str(e))
+    for name, reason in skipped:
+        print(f"   ⚠️  跳过 {name}: {reason}")
+
+    print(f"🚀 {len(jobs)} 个任务 × {args.players:,} 玩家")
+    options = dict(progress=_print_summary, stream=args.stream)
+    if args.cache:
+        with SimulationCache() as cache:
+            summaries, entropy, stats = run_batch_cached(
+                jobs, cache, args.players, args.seed, args.workers, args.shard_players,
+                args.max_pulls, **options,
+            )
+        print(f"\n📦 缓存命中 {stats['cacheHits']}/{len(jobs)}")
+    else:
+        summaries, entropy, stats = run_batch(
+            jobs, args.players, args.seed, args.workers, args.shard_players, args.max_pulls, **options,
+        )
+
+    print(f"\n🌱 根种子: {entropy}")
+    if stats['shards']:
+        rate = stats['totalPulls'] / stats['wallTime'] if stats['wallTime'] > 0 else float('inf')
+        print(f"⚡ {stats['workers']} 进程 / {stats['shards']} 分片 | {stats['totalPulls']:,} 抽 / "
+              f"{stats['wallTime']:.2f}s = {rate / 1e6:.1f}M 抽/秒 | 并行效率 "
+              f"{stats['cpuTime'] / stats['wallTime'] / stats['workers']:.0%}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'seed': entropy, 'players': args.players, 'results': summaries},
+                      f, ensure_ascii=False, indent=2)
+        print(f"💾 已写入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
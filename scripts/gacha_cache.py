@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+模拟结果的磁盘缓存（按内容寻址，LRU 淘汰）
+缓存键 = sha256(引擎版本 + 规范化后的活动配置哈希 + 奖池 / 场景 / 模拟参数)
+  - 配置内容不变，结果一直命中；修改某个活动的配置只影响该活动的缓存（写入时清理旧哈希的条目）
+  - 存储为单个 SQLite 文件（WAL 模式），多个进程可同时读写
+  - 总大小超过上限时按最近访问时间淘汰
+
+使用方法:
+  python scripts/gacha_cache.py stats
+  python scripts/gacha_cache.py invalidate ag98
+  python scripts/gacha_cache.py clear
+"""
+
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+
+from gacha_sim import PROJECT_ROOT, ENGINE_VERSION
+
+DEFAULT_CACHE_PATH = PROJECT_ROOT / '.cache' / 'gacha-sim.sqlite'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# 淘汰时降到上限的比例，避免每次写入都触发淘汰
+EVICT_TARGET = 0.9
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    activity TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE INDEX IF NOT EXISTS entries_activity ON entries (activity, config_hash);
+'''
+
+
+def config_digest(config):
+    """规范化（键排序、紧凑分隔符）后的配置内容哈希，与文件格式 / 缩进无关"""
+    normalized = json.dumps(config, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def cache_key(config_hash, params):
+    """由配置哈希、模拟参数和引擎版本计算缓存键"""
+    payload = json.dumps(
+        {'engine': ENGINE_VERSION, 'config': config_hash, 'params': params},
+        ensure_ascii=False, sort_keys=True, separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SimulationCache:
+    """模拟结果缓存，值为可 JSON 序列化的对象"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 多进程并发：WAL 允许读写并行，写锁冲突时最多等待 timeout 秒
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, key):
+        """读取缓存，未命中返回 None；命中时刷新访问时间"""
+        row = self.conn.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        self.conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key))
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def put(self, key, activity, config_hash, value):
+        """写入缓存，并清理同一活动旧配置哈希的条目"""
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        with self._transaction():
+            self.conn.execute(
+                'DELETE FROM entries WHERE activity = ? AND config_hash != ?', (activity, config_hash)
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, activity, config_hash, blob, len(blob), now, now),
+            )
+        self.evict()
+
+    def invalidate(self, activity):
+        """删除某个活动的所有缓存，返回删除条数"""
+        with self._transaction():
+            return self.conn.execute('DELETE FROM entries WHERE activity = ?', (activity,)).rowcount
+
+    def clear(self):
+        with self._transaction():
+            self.conn.execute('DELETE FROM entries')
+        self.conn.execute('VACUUM')
+
+    def evict(self):
+        """总大小超过上限时，从最久未访问的条目开始删除，返回删除条数"""
+        with self._transaction():
+            total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            target = self.max_bytes * EVICT_TARGET
+            doomed = []
+            for key, size in self.conn.execute('SELECT key, size FROM entries ORDER BY accessed'):
+                if total <= target:
+                    break
+                doomed.append((key,))
+                total -= size
+            self.conn.executemany('DELETE FROM entries WHERE key = ?', doomed)
+            return len(doomed)
+
+    def stats(self):
+        count, size = self.conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        activities = self.conn.execute('SELECT COUNT(DISTINCT activity) FROM entries').fetchone()[0]
+        return {'entries': count, 'bytes': size, 'activities': activities, 'maxBytes': self.max_bytes}
+
+    def _transaction(self):
+        return _Transaction(self.conn)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE 事务：一开始就拿写锁，避免并发写入时读后写升级失败"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='模拟结果缓存管理')
+    parser.add_argument('--path', default=str(DEFAULT_CACHE_PATH), help='缓存文件路径')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='显示缓存统计')
+    sub.add_parser('clear', help='清空缓存')
+    p = sub.add_parser('invalidate', help='删除某个活动的缓存')
+    p.add_argument('activity')
+    args = parser.parse_args()
+
+    with SimulationCache(args.path) as cache:
+        if args.command == 'stats':
+            stats = cache.stats()
+            print(f"📦 {stats['entries']} 条 / {stats['activities']} 个活动 | "
+                  f"{stats['bytes'] / 1024:.1f} KB / 上限 {stats['maxBytes'] / 1024 / 1024:.0f} MB")
+        elif args.command == 'clear':
+            cache.clear()
+            print('🗑️  缓存已清空')
+        else:
+            print(f"🗑️  已删除 {cache.invalidate(args.activity)} 条 {args.activity} 的缓存")
+
+
+if __name__ == '__main__':
+    main()
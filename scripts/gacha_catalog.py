@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+活动配置的列式内存目录（一次加载全部配置，供模拟 / 校验 / 上传脚本共同查询）
+所有活动的所有奖池物品拼成一张表，按列存储：
+  - probability / limit        NumPy 数组
+  - rarity / type / 奖池标识    分类编码（整数编码 + 取值表）
+  - id / name / nameEn / image 在所有活动间驻留（StringTable），列中只存整数编码
+奖池是物品表上的连续区间 [start, end)，活动是奖池表上的连续区间
+
+依赖安装:
+  pip install numpy
+
+使用方法:
+  python scripts/gacha_catalog.py              # 汇总（含与字典形式的内存对比）
+  python scripts/gacha_catalog.py validate     # 校验所有配置，发现错误时退出码为 1
+"""
+
+import sys
+import argparse
+
+import numpy as np
+
+from gacha_sim import GACHA_CONFIG_DIR, GACHA_TYPE_DIRS, RARITIES, GachaPool, list_pools
+from gacha_cache import config_digest
+from config_store import is_stats_file, load_config, load_json
+
+MISSING = -1
+# 概率总和与 100 的允许偏差（配置里常见 100.01 这类舍入误差）
+PROBABILITY_TOLERANCE = 0.05
+
+
+class StringTable:
+    """字符串驻留表：相同字符串只保存一份，外部只保存整数编码"""
+
+    def __init__(self, values=()):
+        self.values = []
+        self._codes = {}
+        for value in values:
+            self.intern(value)
+
+    def intern(self, value):
+        """返回字符串的编码（None 编码为 MISSING）"""
+        if value is None:
+            return MISSING
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+    def code(self, value):
+        """查询已有字符串的编码，不存在时返回 MISSING"""
+        return self._codes.get(value, MISSING)
+
+    def take(self, codes):
+        return [self.values[c] if c >= 0 else None for c in codes]
+
+    def __getitem__(self, code):
+        return self.values[code] if code >= 0 else None
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self.values) + sys.getsizeof(self._codes) + sum(sys.getsizeof(v) for v in self.values)
+
+
+class _CatalogBuilder:
+    """逐个活动追加，最后一次性转成数组"""
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.rarities = StringTable(RARITIES)
+        self.types = StringTable()
+        self.pool_keys = StringTable()
+        self.gacha_types = StringTable()
+        self.activities = []
+        self.pools = []
+        self.columns = {name: [] for name in (
+            'pool', 'slot', 'item_id', 'name', 'name_en', 'image', 'type', 'rarity', 'probability', 'limit'
+        )}
+        self.errors = []
+
+    def add(self, activity_id, path, config, index_entry):
+        metadata = config.get('metadata') or {}
+        index_entry = index_entry or {}
+        groups = config.get('cargos') or config.get('lootboxes') or []
+        group_metadata = {group.get('type'): group.get('metadata') for group in groups}
+        first_pool = len(self.pools)
+
+        for pool_key, items in list_pools(config):
+            start = len(self.columns['pool'])
+            for slot, item in enumerate(items):
+                self._add_item(len(self.pools), slot, item)
+            self.pools.append((len(self.activities), self.pool_keys.intern(pool_key), start,
+                               len(self.columns['pool']), group_metadata.get(pool_key)))
+
+        self.activities.append({
+            'id': sys.intern(activity_id),
+            'gacha_type': self.gacha_types.intern(config.get('gacha_type') or index_entry.get('gacha_type')),
+            'name': self.strings.intern(metadata.get('name') or index_entry.get('name')),
+            'name_en': self.strings.intern(metadata.get('nameEn') or index_entry.get('nameEn')),
+            'date': self.strings.intern(metadata.get('formattedDate') or index_entry.get('formattedDate')),
+            'path': path,
+            'indexed': bool(index_entry),
+            'config_hash': config_digest(config),
+            'pools': (first_pool, len(self.pools)),
+        })
+
+    def _add_item(self, pool_index, slot, item):
+        columns = self.columns
+        columns['pool'].append(pool_index)
+        columns['slot'].append(slot)
+        columns['item_id'].append(self.strings.intern(item.get('id', '')))
+        columns['name'].append(self.strings.intern(item.get('name', '')))
+        columns['name_en'].append(self.strings.intern(item.get('nameEn')))
+        columns['image'].append(self.strings.intern(item.get('image')))
+        columns['type'].append(self.types.intern(item.get('type')))
+        columns['rarity'].append(self.rarities.intern(item.get('rarity', 'common')))
+        try:
+            columns['probability'].append(float(item.get('probability', 0)))
+        except (TypeError, ValueError):
+            columns['probability'].append(np.nan)
+        try:
+            columns['limit'].append(int(item.get('limit', 0)))
+        except (TypeError, ValueError):
+            columns['limit'].append(MISSING)
+
+    def build(self):
+        return Catalog(self)
+
+
+class Catalog:
+    """列式配置目录，通过 load_catalog() 创建"""
+
+    def __init__(self, builder):
+        self.strings = builder.strings
+        self.rarities = builder.rarities
+        self.types = builder.types
+        self.pool_keys = builder.pool_keys
+        self.gacha_types = builder.gacha_types
+        self.errors = builder.errors
+        columns = builder.columns
+
+        # 物品表
+        self.item_pool = np.array(columns['pool'], dtype=np.int32)
+        self.item_slot = np.array(columns['slot'], dtype=np.int32)
+        self.item_id = np.array(columns['item_id'], dtype=np.int32)
+        self.item_name = np.array(columns['name'], dtype=np.int32)
+        self.item_name_en = np.array(columns['name_en'], dtype=np.int32)
+        self.item_image = np.array(columns['image'], dtype=np.int32)
+        self.item_type = np.array(columns['type'], dtype=np.int16)
+        self.item_rarity = np.array(columns['rarity'], dtype=np.int8)
+        self.probability = np.array(columns['probability'], dtype=np.float64)
+        self.limit = np.array(columns['limit'], dtype=np.int32)
+
+        # 奖池表
+        self.pool_activity = np.array([p[0] for p in builder.pools], dtype=np.int32)
+        self.pool_key = np.array([p[1] for p in builder.pools], dtype=np.int16)
+        self.pool_start = np.array([p[2] for p in builder.pools], dtype=np.int64)
+        self.pool_end = np.array([p[3] for p in builder.pools], dtype=np.int64)
+        self.pool_metadata = [p[4] for p in builder.pools]
+
+        # 活动表
+        self.activity_ids = [a['id'] for a in builder.activities]
+        self._activity_index = {activity_id: i for i, activity_id in enumerate(self.activity_ids)}
+        self.activity_gacha_type = np.array([a['gacha_type'] for a in builder.activities], dtype=np.int16)
+        self.activity_name = np.array([a['name'] for a in builder.activities], dtype=np.int32)
+        self.activity_name_en = np.array([a['name_en'] for a in builder.activities], dtype=np.int32)
+        self.activity_date = np.array([a['date'] for a in builder.activities], dtype=np.int32)
+        self.activity_pools = np.array([a['pools'] for a in builder.activities], dtype=np.int32).reshape(-1, 2)
+        self.activity_indexed = np.array([a['indexed'] for a in builder.activities], dtype=bool)
+        self.activity_paths = [a['path'] for a in builder.activities]
+        self.config_hashes = [a['config_hash'] for a in builder.activities]
+
+    def __len__(self):
+        return self.probability.size
+
+    def __contains__(self, activity_id):
+        return activity_id in self._activity_index
+
+    # ---------- 活动 / 奖池 ----------
+
+    def _activity(self, activity_id):
+        try:
+            return self._activity_index[activity_id]
+        except KeyError:
+            raise FileNotFoundError(f'未找到活动配置: {activity_id}') from None
+
+    def activity(self, activity_id):
+        """活动摘要：id / gacha_type / 配置类型 / 名称 / 日期 / 路径 / 配置哈希"""
+        i = self._activity(activity_id)
+        gacha_type = self.gacha_types[self.activity_gacha_type[i]]
+        path = self.activity_paths[i]
+        return {
+            'id': activity_id,
+            'gacha_type': gacha_type,
+            'type': GACHA_TYPE_DIRS.get(gacha_type, path.parent.name),
+            'name': self.strings[self.activity_name[i]],
+            'nameEn': self.strings[self.activity_name_en[i]],
+            'formattedDate': self.strings[self.activity_date[i]],
+            'path': path,
+            'configHash': self.config_hashes[i],
+        }
+
+    def _pool_range(self, activity_id):
+        first, last = self.activity_pools[self._activity(activity_id)]
+        return range(int(first), int(last))
+
+    def pool_keys_of(self, activity_id):
+        return [self.pool_keys[self.pool_key[p]] for p in self._pool_range(activity_id)]
+
+    def _pool_index(self, activity_id, pool_key=None):
+        pools = self._pool_range(activity_id)
+        if not pools:
+            raise ValueError(f'活动 {activity_id} 没有奖池')
+        if pool_key is None:
+            return pools[0]
+        code = self.pool_keys.code(pool_key)
+        for p in pools:
+            if self.pool_key[p] == code:
+                return p
+        raise ValueError(f'活动 {activity_id} 没有奖池 {pool_key}（可选: {", ".join(self.pool_keys_of(activity_id))}）')
+
+    def pool_rows(self, activity_id, pool_key=None):
+        """奖池在物品表中的行区间"""
+        p = self._pool_index(activity_id, pool_key)
+        return slice(int(self.pool_start[p]), int(self.pool_end[p]))
+
+    def pool_metadata_of(self, activity_id, pool_key):
+        return self.pool_metadata[self._pool_index(activity_id, pool_key)]
+
+    def pool(self, activity_id, pool_key=None):
+        """构造 GachaPool（与 GachaPool.from_activity 结果相同）"""
+        p = self._pool_index(activity_id, pool_key)
+        rows = slice(int(self.pool_start[p]), int(self.pool_end[p]))
+        return GachaPool.from_columns(
+            names=self.strings.take(self.item_name[rows]),
+            ids=self.strings.take(self.item_id[rows]),
+            rarities=self.rarities.take(self.item_rarity[rows]),
+            probability=self.probability[rows],
+            limit=self.limit[rows],
+            key=self.pool_keys[self.pool_key[p]],
+            activity_id=activity_id,
+        )
+
+    def iter_pools(self):
+        """按活动顺序遍历所有 (活动 ID, 奖池标识)"""
+        for p in range(self.pool_key.size):
+            yield self.activity_ids[self.pool_activity[p]], self.pool_keys[self.pool_key[p]]
+
+    # ---------- 物品 ----------
+
+    def find_item(self, item_id):
+        """某个物品 id 在所有活动中出现的行号"""
+        code = self.strings.code(item_id)
+        if code == MISSING:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.item_id == code)
+
+    def row(self, i):
+        """把一行还原成字典（含所属活动和奖池）"""
+        p = self.item_pool[i]
+        return {
+            'activity': self.activity_ids[self.pool_activity[p]],
+            'pool': self.pool_keys[self.pool_key[p]],
+            'slot': int(self.item_slot[i]),
+            'id': self.strings[self.item_id[i]],
+            'name': self.strings[self.item_name[i]],
+            'nameEn': self.strings[self.item_name_en[i]],
+            'type': self.types[self.item_type[i]],
+            'rarity': self.rarities[self.item_rarity[i]],
+            'probability': float(self.probability[i]),
+            'limit': int(self.limit[i]),
+        }
+
+    @property
+    def nbytes(self):
+        """近似内存占用（数组 + 驻留字符串 + 奖池元数据）"""
+        arrays = sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+        tables = sum(t.nbytes for t in (self.strings, self.rarities, self.types, self.pool_keys, self.gacha_types))
+        return arrays + tables + _deep_sizeof(self.pool_metadata) + _deep_sizeof(self.config_hashes)
+
+
+def _deep_sizeof(value, seen=None):
+    """递归估算 Python 对象占用的内存（共享对象只算一次）"""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_deep_sizeof(v, seen) for v in value)
+    return size
+
+
+def _config_files(config_dir):
+    for type_dir in sorted(set(GACHA_TYPE_DIRS.values())):
+        for path in sorted((config_dir / type_dir).glob('*.json')):
+            if not is_stats_file(path):
+                yield path
+
+
+def load_catalog(config_dir=GACHA_CONFIG_DIR):
+    """读取 index.json 和所有活动配置，构建目录（每个文件只解析一次）"""
+    builder = _CatalogBuilder()
+    try:
+        index = {a.get('id'): a for a in load_config(config_dir / 'index.json').get('activities', [])}
+    except (OSError, ValueError) as e:
+        builder.errors.append((config_dir / 'index.json', str(e)))
+        index = {}
+
+    for path in _config_files(config_dir):
+        try:
+            config = load_config(path)
+        except (OSError, ValueError) as e:
+            builder.errors.append((path, str(e)))
+            continue
+        activity_id = config.get('id') or path.stem
+        builder.add(activity_id, path, config, index.get(activity_id))
+
+    catalog = builder.build()
+    catalog.index_ids = list(index)
+    return catalog
+
+
+_catalog = None
+
+
+def get_catalog():
+    """进程内共享的目录（首次调用时加载）"""
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog()
+    return _catalog
+
+
+# ========== 校验 ==========
+
+def validate(catalog):
+    """
+    校验所有配置，返回 [(级别, 活动/文件, 说明)]，级别为 'error' 或 'warning'
+      error:   JSON 无法解析、概率或上限非法、稀有度未知、奖池为空
+      warning: 概率总和偏离 100、索引与配置文件不一致
+    """
+    problems = [('error', path.name, message) for path, message in catalog.errors]
+
+    indexed = set(catalog.index_ids)
+    for activity_id in catalog.index_ids:
+        if activity_id not in catalog:
+            problems.append(('warning', activity_id, 'index.json 中的活动没有配置文件'))
+    for i, activity_id in enumerate(catalog.activity_ids):
+        if activity_id not in indexed:
+            problems.append(('warning', activity_id, '配置文件不在 index.json 中'))
+        if catalog.activity_paths[i].stem != activity_id:
+            problems.append(('warning', activity_id, f'文件名 {catalog.activity_paths[i].name} 与 id 不一致'))
+
+    known_rarities = len(RARITIES)
+    for activity_id, pool_key in catalog.iter_pools():
+        label = f'{activity_id}/{pool_key}'
+        rows = catalog.pool_rows(activity_id, pool_key)
+        probability = catalog.probability[rows]
+        if probability.size == 0:
+            problems.append(('error', label, '奖池没有物品'))
+            continue
+        for slot in np.flatnonzero(~(probability >= 0)):
+            problems.append(('error', label, f'第 {slot + 1} 个物品概率非法'))
+        for slot in np.flatnonzero(catalog.limit[rows] < 0):
+            problems.append(('error', label, f'第 {slot + 1} 个物品上限非法'))
+        for slot in np.flatnonzero(catalog.item_rarity[rows] >= known_rarities):
+            rarity = catalog.rarities[catalog.item_rarity[rows][slot]]
+            problems.append(('error', label, f'第 {slot + 1} 个物品稀有度未知: {rarity}'))
+        total = float(np.nansum(probability))
+        if abs(total - 100) > PROBABILITY_TOLERANCE:
+            problems.append(('warning', label, f'概率总和为 {total:g}'))
+    return problems
+
+
+# ========== 命令行 ==========
+
+def _dict_form_bytes(catalog):
+    """同样的数据以 json.load 得到的字典形式保存时的内存"""
+    return sum(_deep_sizeof(load_json(path)) for path in catalog.activity_paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='活动配置列式目录')
+    parser.add_argument('command', nargs='?', choices=('summary', 'validate'), default='summary')
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    if args.command == 'validate':
+        problems = validate(catalog)
+        for level, label, message in problems:
+            print(f"{'❌' if level == 'error' else '⚠️ '} {label}: {message}")
+        errors = sum(1 for level, _, _ in problems if level == 'error')
+        print(f"\n{'❌' if errors else '✅'} {errors} 个错误 | {len(problems) - errors} 个警告")
+        sys.exit(1 if errors else 0)
+
+    columnar, dicts = catalog.nbytes, _dict_form_bytes(catalog)
+    print(f"📚 {len(catalog.activity_ids)} 个活动 | {catalog.pool_key.size} 个奖池 | {len(catalog)} 个物品")
+    print(f"🔤 {len(catalog.strings)} 个不同字符串 | {len(catalog.types)} 种类型 | "
+          f"{len(set(catalog.item_id.tolist()))} 个不同物品 id")
+    print(f"💾 列式 {columnar / 1024:.1f} KB | 字典形式 {dicts / 1024:.1f} KB ({columnar / dicts:.0%})")
+    for path, message in catalog.errors:
+        print(f"❌ {path.name}: {message}")
+
+
+if __name__ == '__main__':
+    main()
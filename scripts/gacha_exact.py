@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+集齐抽数精确求解
+求集齐目标物品所需抽数的期望、方差和完整分布（不做抽样）
+
+两种精确方法（solve_completion 自动选择）：
+  - 独立命中（默认目标均为非 common 且奖池有无上限的 common 物品时）：
+    目标物品不会收到补给概率，每一抽命中目标 i 的概率恒为 p_i（达到上限后的命中被转给 common），
+    集齐时间即多项分布计数全部达到 limit 的时刻。对目标子集做容斥：
+      P(T > t) = Σ_S (-1)^(|S|+1) Σ_m c_{S,m} (t)_m (1 - p_S)^(t-m)
+    子集多项式 c_S 由去掉最低位的子集递推（共享子状态只算一次），期望和方差有闭式解
+  - 吸收马尔可夫链（通用）：状态为各有上限物品的已获得数量，
+    期望 / 方差按总获得数从高到低逐层动态规划，分布在状态概率向量上逐抽推进
+
+依赖安装:
+  pip install numpy
+
+使用方法:
+  python scripts/gacha_exact.py ag98
+  python scripts/gacha_exact.py be100 --pool rm
+  python scripts/gacha_exact.py --all
+"""
+
+import time
+import argparse
+
+import numpy as np
+
+from gacha_sim import GachaPool, load_activity, list_pools
+from gacha_catalog import get_catalog
+
+DEFAULT_TAIL_EPS = 1e-10
+DEFAULT_MAX_PULLS = 2_000_000
+MAX_STATES = 2_000_000
+MAX_SUBSET_TARGETS = 16
+# 容斥项小于该值后视为 0（远小于双精度累加误差）
+NEGLIGIBLE = 1e-20
+
+# 相同奖池结构（概率/上限/稀有度/目标/方法）的求解结果复用
+_solution_cache = {}
+
+
+def resolve_targets(pool, targets=None):
+    """校验集齐目标，默认所有有上限的非 common 物品"""
+    targets = pool.default_targets() if targets is None else np.asarray(targets, dtype=np.int64)
+    if targets.size == 0:
+        raise ValueError('没有集齐目标')
+    if np.any(pool.limit[targets] <= 0):
+        raise ValueError('集齐目标必须是有上限的物品')
+    if np.any(pool.probability[targets] <= 0):
+        raise ValueError('存在概率为 0 的目标，无法集齐')
+    return targets
+
+
+def hits_are_independent(pool, targets):
+    """
+    目标命中是否与状态无关：目标都不是 common（不接收补给），
+    且存在无上限的 common 物品（补给总有去处，不会触发归一化）
+    """
+    no_common_target = not np.any(pool.rarity_code[targets] == 0)
+    has_unlimited_common = np.any((pool.rarity_code == 0) & (pool.limit == 0))
+    return bool(no_common_target and has_unlimited_common)
+
+
+class CompletionChain:
+    """集齐过程的状态空间与转移概率"""
+
+    def __init__(self, pool, targets=None):
+        targets = resolve_targets(pool, targets)
+
+        # 目标命中不独立（目标含 common，或没有无上限的 common 接收补给）时，
+        # 每一抽的概率取决于所有有上限物品的状态
+        self.independent = hits_are_independent(pool, targets)
+        tracked = np.sort(targets) if self.independent else pool.limited
+
+        self.pool = pool
+        self.targets = targets
+        self.tracked = tracked
+        self.limits = pool.limit[tracked]
+        radices = self.limits + 1
+        self.size = int(np.prod(radices))
+        if self.size > MAX_STATES:
+            raise ValueError(f'状态数 {self.size} 超出上限 {MAX_STATES}')
+
+        # 混合进制编码：state = Σ count_k * stride_k
+        self.strides = np.ones(tracked.size, dtype=np.int64)
+        for k in range(tracked.size - 2, -1, -1):
+            self.strides[k] = self.strides[k + 1] * radices[k + 1]
+        self.counts = np.stack(np.unravel_index(np.arange(self.size), radices), axis=1)
+        self.level = self.counts.sum(axis=1)
+
+        is_target = np.isin(tracked, targets)
+        self.absorbing = np.all(self.counts[:, is_target] >= self.limits[is_target], axis=1)
+
+        self.move = self._transition_probs()
+        self.next = np.where(
+            self.counts < self.limits, np.arange(self.size)[:, None] + self.strides, -1
+        )
+        self.move[self.absorbing] = 0.0
+        self.move[self.next < 0] = 0.0
+        self.leave = self.move.sum(axis=1)
+
+    def _transition_probs(self):
+        """每个状态下抽中各个被跟踪物品的概率，形状 (状态数, 跟踪物品数)"""
+        pool = self.pool
+        prob = pool.probability[self.tracked] / pool.total
+        available = self.counts < self.limits
+        move = available * prob
+
+        if self.independent:
+            return move
+
+        # 此时 tracked 覆盖所有有上限物品：计算被补给的概率和可抽 common 数
+        is_common = pool.rarity_code[self.tracked] == 0
+        exhausted = ~available
+        unavailable = exhausted @ pool.probability[self.tracked]
+        unlimited_common = int(np.sum((pool.rarity_code == 0) & (pool.limit == 0)))
+        common_count = unlimited_common + (available & is_common).sum(axis=1)
+
+        has_common = common_count > 0
+        bonus = np.where(has_common, unavailable / np.maximum(common_count, 1), 0.0)
+        move = move + (available & is_common) * (bonus[:, None] / pool.total)
+
+        # 没有可抽 common 物品时按可抽物品的原始概率归一化
+        if not has_common.all():
+            rows = ~has_common
+            # 全部物品都已达上限的状态无法继续抽取（只会是吸收态），不需要归一化
+            remaining = pool.total - unavailable[rows]
+            scale = np.where(remaining > 0, pool.total / np.where(remaining > 0, remaining, 1.0), 0.0)
+            move[rows] = available[rows] * prob * scale[:, None]
+        return move
+
+    def moments(self):
+        """逐层动态规划计算每个状态到集齐的期望抽数和二阶矩，返回初始状态的 (期望, 方差)"""
+        mean = np.zeros(self.size)
+        second = np.zeros(self.size)
+        for level in range(int(self.level.max()), -1, -1):
+            states = np.flatnonzero((self.level == level) & ~self.absorbing)
+            if not states.size:
+                continue
+            leave = self.leave[states]
+            if np.any(leave <= 0):
+                raise ValueError('存在无法推进的状态，期望抽数为无穷大')
+            weights = self.move[states] / leave[:, None]
+            nxt = np.maximum(self.next[states], 0)
+            next_mean = (weights * mean[nxt]).sum(axis=1)
+            next_second = (weights * second[nxt]).sum(axis=1)
+            # 停留抽数 G ~ 几何分布(leave)：E[G] = 1/p，E[G²] = (2-p)/p²
+            mean[states] = 1.0 / leave + next_mean
+            second[states] = (2.0 - leave) / leave ** 2 + 2.0 * next_mean / leave + next_second
+        return mean[0], second[0] - mean[0] ** 2
+
+    def distribution(self, tail_eps=DEFAULT_TAIL_EPS, max_pulls=DEFAULT_MAX_PULLS):
+        """
+        逐抽推进状态概率，返回 (pmf, 截断的剩余概率)
+        pmf[t] = 恰好在第 t 抽集齐的概率
+        """
+        valid = self.next >= 0
+        valid &= self.move > 0
+        src = np.nonzero(valid)[0]
+        dst = self.next[valid]
+        prob = self.move[valid]
+        stay = 1.0 - self.leave
+        stay[self.absorbing] = 0.0
+        absorbing = np.flatnonzero(self.absorbing)
+
+        current = np.zeros(self.size)
+        current[0] = 1.0
+        pmf = [0.0]
+        remaining = 1.0
+        for _ in range(max_pulls):
+            flow = np.bincount(dst, weights=prob * current[src], minlength=self.size)
+            current = stay * current + flow
+            done = current[absorbing].sum()
+            current[absorbing] = 0.0
+            pmf.append(done)
+            remaining -= done
+            if remaining < tail_eps:
+                break
+        return np.array(pmf), max(remaining, 0.0)
+
+
+class SubsetExpansion:
+    """目标命中相互独立时的容斥展开（每个非空目标子集一项）"""
+
+    def __init__(self, pool, targets=None):
+        targets = resolve_targets(pool, targets)
+        if targets.size > MAX_SUBSET_TARGETS:
+            raise ValueError(f'目标数 {targets.size} 超出容斥上限 {MAX_SUBSET_TARGETS}')
+
+        p = pool.probability[targets] / pool.total
+        limits = pool.limit[targets]
+        size = 1 << targets.size
+
+        # 子集递推：S = (S 去掉最低位) ∪ {i}，多项式 c_S = c_(S\{i}) * Σ_{j<l_i} p_i^j / j!
+        item_polys = []
+        for p_i, l_i in zip(p, limits):
+            j = np.arange(l_i)
+            item_polys.append(p_i ** j / np.cumprod(np.maximum(j, 1)))
+        polys = [np.ones(1)]
+        p_sum = np.zeros(size)
+        sign = np.zeros(size)
+        sign[0] = -1.0
+        for mask in range(1, size):
+            low = mask & -mask
+            i = low.bit_length() - 1
+            rest = mask ^ low
+            polys.append(np.convolve(polys[rest], item_polys[i]))
+            p_sum[mask] = p_sum[rest] + p[i]
+            sign[mask] = -sign[rest]
+
+        self.targets = targets
+        self.p = p
+        self.limits = limits
+        self.polys = polys
+        self.p_sum = p_sum
+        self.sign = sign  # |S| 为奇数时 +1
+        self.size = size
+
+    def moments(self):
+        """
+        闭式期望与方差：F_m = Σ_t (t)_m b^(t-m) = m! / p^(m+1)，b = 1 - p
+          E[T]  = Σ_t P(T > t)
+          E[T²] = Σ_t (2t + 1) P(T > t)，其中 Σ_t t (t)_m b^(t-m) = b F_(m+1) + m F_m
+        """
+        mean = 0.0
+        second = 0.0
+        for mask in range(1, self.size):
+            p_s = self.p_sum[mask]
+            b = 1.0 - p_s
+            coef = self.polys[mask]
+            m = np.arange(coef.size + 1)
+            factorial = np.cumprod(np.maximum(m, 1)).astype(np.float64)
+            f = factorial / p_s ** (m + 1)
+            tail = (coef * f[:-1]).sum()
+            t_tail = (coef * (b * f[1:] + m[:-1] * f[:-1])).sum()
+            mean += self.sign[mask] * tail
+            second += self.sign[mask] * (2.0 * t_tail + tail)
+        return mean, second - mean ** 2
+
+    def _log_terms(self, mask, t, log_factorial):
+        """子集 S 在各 t 上的 P(∀i∈S: N_i(t) < l_i)"""
+        coef = self.polys[mask]
+        log_b = np.log1p(-self.p_sum[mask])
+        total = np.zeros(t.size)
+        for m, c in enumerate(coef):
+            if c <= 0:
+                continue
+            valid = t >= m
+            tv = t[valid]
+            log_term = np.log(c) + log_factorial[tv] - log_factorial[tv - m] + (tv - m) * log_b
+            total[valid] += np.exp(log_term)
+        return total
+
+    def distribution(self, tail_eps=DEFAULT_TAIL_EPS, max_pulls=DEFAULT_MAX_PULLS):
+        """返回 (pmf, 截断的剩余概率)，pmf[t] = 恰好在第 t 抽集齐的概率"""
+        log_factorial = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, max_pulls + 2)))))
+
+        # 每个子集的项单调递减：在几何网格上找到它可以忽略的位置
+        grid = np.unique(np.geomspace(1, max_pulls, 96).astype(np.int64))
+        singles = [1 << i for i in range(self.p.size)]
+        union_bound = sum(self._log_terms(mask, grid, log_factorial) for mask in singles)
+        reach = np.flatnonzero(union_bound < tail_eps)
+        horizon = int(grid[reach[0]]) if reach.size else max_pulls
+
+        survival = np.zeros(horizon + 1)
+        for mask in range(1, self.size):
+            small = np.flatnonzero(self._log_terms(mask, grid, log_factorial) < NEGLIGIBLE)
+            end = min(horizon, int(grid[small[0]]) if small.size else horizon)
+            t = np.arange(end + 1)
+            survival[:end + 1] += self.sign[mask] * self._log_terms(mask, t, log_factorial)
+
+        survival = np.clip(survival, 0.0, 1.0)
+        # 生存函数必然单调不增，消除累加误差带来的微小抖动
+        survival = np.minimum.accumulate(survival)
+        pmf = np.empty(horizon + 1)
+        pmf[0] = 1.0 - survival[0]
+        pmf[1:] = survival[:-1] - survival[1:]
+        return pmf, float(survival[-1])
+
+
+def _cache_key(pool, targets, tail_eps, max_pulls, method):
+    return (
+        pool.probability.tobytes(), pool.limit.tobytes(), pool.rarity_code.tobytes(),
+        None if targets is None else np.asarray(targets).tobytes(), tail_eps, max_pulls, method,
+    )
+
+
+def _copy_solution(solution):
+    return dict(solution, pmf=solution['pmf'].copy(), cdf=solution['cdf'].copy())
+
+
+def solve_completion(pool, targets=None, tail_eps=DEFAULT_TAIL_EPS,
+                     max_pulls=DEFAULT_MAX_PULLS, method='auto'):
+    """
+    精确求解集齐 targets（默认所有有上限的非 common 物品）所需抽数
+    method: 'auto' | 'subset'（容斥，要求目标命中独立）| 'chain'（马尔可夫链）
+
+    返回 dict: mean, variance, std, pmf, cdf, truncated, method, states
+    （pmf / cdf 每次返回副本，调用方修改不会影响缓存）
+    """
+    key = _cache_key(pool, targets, tail_eps, max_pulls, method)
+    if key in _solution_cache:
+        return _copy_solution(_solution_cache[key])
+
+    resolved = resolve_targets(pool, targets)
+    if method == 'auto':
+        independent = hits_are_independent(pool, resolved) and resolved.size <= MAX_SUBSET_TARGETS
+        method = 'subset' if independent else 'chain'
+    elif method == 'subset' and not hits_are_independent(pool, resolved):
+        raise ValueError('目标命中与状态相关，不能使用容斥方法')
+
+    if method == 'subset':
+        solver = SubsetExpansion(pool, resolved)
+        states = solver.size - 1
+    else:
+        solver = CompletionChain(pool, resolved)
+        states = solver.size
+
+    mean, variance = solver.moments()
+    pmf, truncated = solver.distribution(tail_eps, max_pulls)
+    solution = {
+        'mean': float(mean),
+        'variance': float(variance),
+        'std': float(np.sqrt(max(variance, 0.0))),
+        'pmf': pmf,
+        'cdf': np.cumsum(pmf),
+        'truncated': truncated,
+        'method': method,
+        'states': states,
+    }
+    _solution_cache[key] = solution
+    return _copy_solution(solution)
+
+
+def percentile(solution, q):
+    """分布的分位数（q 取 0~100），返回最小的满足 P(T<=t) >= q% 的抽数"""
+    index = int(np.searchsorted(solution['cdf'], q / 100.0, side='left'))
+    return min(index, solution['cdf'].size - 1)
+
+
+# ========== 命令行 ==========
+
+def _print_solution(label, solution, elapsed):
+    p50, p90, p99 = (percentile(solution, q) for q in (50, 90, 99))
+    print(
+        f"   {label:<24} 期望 {solution['mean']:9.1f} | 标准差 {solution['std']:8.1f} | "
+        f"P50 {p50:6d} | P90 {p90:6d} | P99 {p99:6d} | "
+        f"{solution['method']:<6} {solution['states']:6d} 项 | {elapsed * 1000:6.0f} ms"
+    )
+
+
+def _solve_and_print(label, load_pool, method):
+    try:
+        pool = load_pool()
+        start = time.perf_counter()
+        solution = solve_completion(pool, method=method)
+        _print_solution(label, solution, time.perf_counter() - start)
+    except ValueError as e:
+        print(f"   {label:<24} ⚠️  {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='集齐抽数精确求解（容斥 / 马尔可夫链）')
+    parser.add_argument('activity', nargs='?', help='活动 ID，例如 ag98')
+    parser.add_argument('--pool', help='奖池（cargo: gameplay/rm，flagship: container/flagship）')
+    parser.add_argument('--all', action='store_true', help='求解 index.json 中的所有活动')
+    parser.add_argument('--method', choices=('auto', 'subset', 'chain'), default='auto', help='求解方法')
+    args = parser.parse_args()
+
+    if not args.all and not args.activity:
+        parser.error('需要指定活动 ID 或 --all')
+
+    start = time.perf_counter()
+    if args.all:
+        catalog = get_catalog()
+        for activity_id, pool_key in catalog.iter_pools():
+            if not args.pool or pool_key == args.pool:
+                _solve_and_print(f'{activity_id}/{pool_key}',
+                                 lambda: catalog.pool(activity_id, pool_key), args.method)
+    else:
+        try:
+            config = load_activity(args.activity)
+        except FileNotFoundError as e:
+            parser.exit(1, f"❌ {e}\n")
+        pool_keys = [args.pool] if args.pool else [key for key, _ in list_pools(config)]
+        for pool_key in pool_keys:
+            _solve_and_print(f'{args.activity}/{pool_key}',
+                             lambda: GachaPool.from_config(config, pool_key), args.method)
+
+    print(f"\n⏱️  总耗时 {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
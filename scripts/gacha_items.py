@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+跨活动物品倒排索引
+把每个物品 id（以及 nameEn）映射到它出现过的所有位置：活动 / 抽卡类型 / 日期 / 奖池 / 概率 / 上限
+  - 索引保存在 .cache/item-index.json，记录每个配置文件的 mtime 和大小
+  - 更新时只重新解析新增或变化的配置文件，删除的配置对应的记录一并移除
+  - 查询只读取索引文件（不导入 NumPy），默认先做一次增量更新（只 stat 配置文件）
+
+使用方法:
+  python scripts/gacha_items.py R91CharlesDeGaulle
+  python scripts/gacha_items.py "Charles de Gaulle" --json
+  python scripts/gacha_items.py --rebuild
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+
+from config_store import PROJECT_ROOT, is_stats_file, load_config, load_json, write_bytes_atomic
+
+CONFIG_DIR = PROJECT_ROOT / 'public' / 'gacha-configs'
+INDEX_PATH = PROJECT_ROOT / '.cache' / 'item-index.json'
+INDEX_FORMAT = 1
+
+# 每条出现记录的字段（索引文件中按数组保存以减小体积）
+FIELDS = ('activity', 'gachaType', 'formattedDate', 'pool', 'name', 'rarity', 'probability', 'limit')
+
+
+def _config_files():
+    """{相对路径: 文件}，不含 index.json 和统计文件"""
+    return {
+        path.relative_to(CONFIG_DIR).as_posix(): path
+        for path in CONFIG_DIR.glob('*/*.json')
+        if not is_stats_file(path)
+    }
+
+
+def _activity_records(config, index_entry):
+    """解析一个活动配置，返回 (活动 ID, [(id, nameEn, 记录)])"""
+    from gacha_sim import list_pools
+
+    metadata = config.get('metadata') or {}
+    activity_id = config.get('id', '')
+    gacha_type = config.get('gacha_type') or index_entry.get('gacha_type', '')
+    date = metadata.get('formattedDate') or index_entry.get('formattedDate', '')
+    entries = []
+    for pool_key, items in list_pools(config):
+        for item in items:
+            record = [activity_id, gacha_type, date, pool_key, item.get('name', ''),
+                      item.get('rarity', 'common'), item.get('probability', 0), item.get('limit', 0)]
+            entries.append((item.get('id', ''), item.get('nameEn') or '', record))
+    return activity_id, entries
+
+
+def _date_key(record):
+    """按 formattedDate（如 2026年1月）排序，无法识别的排在最后"""
+    match = re.match(r'(\d+)年(\d+)月', record[2] or '')
+    return (int(match.group(1)), int(match.group(2))) if match else (10 ** 6, 0)
+
+
+class ItemIndex:
+    """物品倒排索引（数据为 load / update 得到的字典）"""
+
+    def __init__(self, data=None):
+        data = data if data and data.get('format') == INDEX_FORMAT else {}
+        # 相对路径 -> {'mtime', 'size', 'activity', 'entries': [[id, nameEn, 记录]]}
+        self.files = data.get('files', {})
+        self._rebuild_maps()
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        try:
+            return cls(load_json(path))
+        except ValueError:
+            return cls()
+
+    def save(self, path=INDEX_PATH):
+        data = {'format': INDEX_FORMAT, 'files': self.files}
+        content = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return write_bytes_atomic(path, content)[0]
+
+    def _rebuild_maps(self):
+        self.by_id = {}
+        self.by_name = {}
+        for info in self.files.values():
+            for item_id, name_en, record in info['entries']:
+                self.by_id.setdefault(item_id, []).append(record)
+                if name_en:
+                    self.by_name.setdefault(name_en.casefold(), set()).add(item_id)
+
+    def update(self, force=False):
+        """
+        按 mtime / 大小增量更新，返回 {'updated': [...], 'removed': [...], 'failed': [(文件, 原因)]}
+        """
+        report = {'updated': [], 'removed': [], 'failed': []}
+        files = _config_files()
+        for rel_path in list(self.files):
+            if rel_path not in files:
+                del self.files[rel_path]
+                report['removed'].append(rel_path)
+
+        index = None
+        for rel_path, path in sorted(files.items()):
+            stat = path.stat()
+            known = self.files.get(rel_path)
+            if not force and known and known['mtime'] == stat.st_mtime_ns and known['size'] == stat.st_size:
+                continue
+            if index is None:
+                index = {a.get('id'): a for a in load_config(CONFIG_DIR / 'index.json').get('activities', [])}
+            try:
+                config = load_config(path)
+            except (OSError, ValueError) as e:
+                report['failed'].append((rel_path, str(e)))
+                self.files.pop(rel_path, None)
+                continue
+            activity_id, entries = _activity_records(config, index.get(config.get('id'), {}))
+            self.files[rel_path] = {
+                'mtime': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'activity': activity_id,
+                'entries': [list(entry) for entry in entries],
+            }
+            report['updated'].append(rel_path)
+
+        if report['updated'] or report['removed'] or report['failed']:
+            self._rebuild_maps()
+        return report
+
+    def lookup(self, term):
+        """
+        按 id 精确匹配，其次按 nameEn（不区分大小写）完整匹配，
+        都没有时匹配 nameEn 中包含 term 的物品（如 "Charles de Gaulle" -> "FS Charles de Gaulle (R91)"）
+        返回 (匹配到的 id 列表, 按日期排序的记录字典列表)
+        """
+        needle = term.casefold()
+        if term in self.by_id:
+            ids = [term]
+        elif needle in self.by_name:
+            ids = sorted(self.by_name[needle])
+        else:
+            ids = sorted({item_id for name, name_ids in self.by_name.items() if needle in name for item_id in name_ids})
+        records = [record for item_id in ids for record in self.by_id[item_id]]
+        records.sort(key=_date_key)
+        return ids, [dict(zip(FIELDS, record)) for record in records]
+
+    def suggest(self, term, limit=10):
+        """id / nameEn 中包含 term 的候选（不区分大小写）"""
+        needle = term.casefold()
+        found = {item_id for item_id in self.by_id if needle in item_id.casefold()}
+        for name, ids in self.by_name.items():
+            if needle in name:
+                found.update(ids)
+        return sorted(found)[:limit]
+
+
+def load_index(update=True, force=False):
+    """读取索引，update 为 True 时先增量更新（有变化时写回磁盘）"""
+    item_index = ItemIndex() if force else ItemIndex.load()
+    report = None
+    if update:
+        report = item_index.update(force=force)
+        if report['updated'] or report['removed'] or report['failed'] or not INDEX_PATH.exists():
+            item_index.save()
+    return item_index, report
+
+
+def _print_records(ids, records):
+    print(f"🔎 {', '.join(ids)}: 出现 {len(records)} 次")
+    for r in records:
+        print(f"   {r['formattedDate'] or '-':<10} {r['activity']:<8} {r['gachaType']:<7} {r['pool']:<10} "
+              f"{r['rarity']:<10} {r['probability']:>8}%  上限 {r['limit']:<3} {r['name']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='跨活动物品倒排索引')
+    parser.add_argument('term', nargs='?', help='物品 id 或 nameEn')
+    parser.add_argument('--rebuild', action='store_true', help='忽略已有索引，全部重新解析')
+    parser.add_argument('--no-update', action='store_true', help='查询前不检查配置文件变化')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出查询结果')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    item_index, report = load_index(update=not args.no_update, force=args.rebuild)
+    for rel_path, reason in (report or {}).get('failed', []):
+        print(f"❌ {rel_path}: {reason}", file=sys.stderr)
+    if report and (report['updated'] or report['removed']):
+        print(f"🔄 更新 {len(report['updated'])} 个 | 移除 {len(report['removed'])} 个配置", file=sys.stderr)
+
+    if not args.term:
+        print(f"📚 {len(item_index.files)} 个配置 | {len(item_index.by_id)} 个物品 id | "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+        return
+
+    ids, records = item_index.lookup(args.term)
+    if args.json:
+        print(json.dumps({'ids': ids, 'occurrences': records}, ensure_ascii=False, indent=2))
+    elif records:
+        _print_records(ids, records)
+    else:
+        suggestions = item_index.suggest(args.term)
+        print(f"❌ 未找到 {args.term}" + (f"，相近的 id: {', '.join(suggestions)}" if suggestions else ''))
+    if not records:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+保底（guaranteeCounters）批量模拟
+与 gachaService.js 的 drawMultiple 规则一致，计数器以数组形式保存所有玩家：
+  - 传说计数 >= legendary - 1 时强制在可抽的传说物品中按原始概率抽取；
+    没有可抽传说物品时正常抽取（不再检查史诗保底）
+  - 否则史诗计数 >= epic - 1 时强制在可抽的史诗 / 传说物品中抽取，没有时正常抽取
+  - 抽后按结果稀有度更新：传说清零两个计数，史诗清零史诗计数、传说计数 +1，其余两个计数都 +1
+正常抽取复用 gacha_sim.draw_step（drawSingle 的补给规则），强制抽取对候选物品做掩码后按行抽样
+
+依赖安装:
+  pip install numpy
+
+使用方法:
+  python scripts/gacha_pity.py ag98 --pulls 100
+  python scripts/gacha_pity.py ag98 --pulls 100 --epic 5 10 20 --legendary 30 50 80
+"""
+
+import argparse
+
+import numpy as np
+
+from gacha_sim import GachaPool, RARITIES, DEFAULT_PLAYERS, draw_step, _make_rng
+
+EPIC = RARITIES.index('epic')
+LEGENDARY = RARITIES.index('legendary')
+
+# drawMultiple 注释中的默认保底配置
+DEFAULT_GUARANTEE = {'epic': 10, 'legendary': 50}
+DEFAULT_PULLS = 100
+
+
+def _forced_draw(pool, obtained, candidates, rng):
+    """
+    在候选物品中按原始概率抽取（不补给），不可抽（达到上限）的候选被掩掉
+    返回 (物品位置, 是否有可抽候选)；候选概率全为 0 时与 drawMultiple 一样取第一个可抽候选
+    """
+    n = obtained.shape[0]
+    available = np.broadcast_to(candidates, (n, pool.size)).copy()
+    available[:, pool.limited] &= obtained < pool.limited_limit
+    has_candidate = available.any(axis=1)
+
+    weights = np.where(available, pool.probability, 0.0)
+    cdf = np.cumsum(weights, axis=1)
+    r = rng.random(n) * cdf[:, -1]
+    slots = (cdf <= r[:, None]).sum(axis=1)
+    zero_total = cdf[:, -1] <= 0
+    slots[zero_total] = np.argmax(available[zero_total], axis=1)
+    return np.minimum(slots, pool.size - 1), has_candidate
+
+
+def _record(pool, obtained, rows, slots):
+    cols = pool.slot_to_col[slots]
+    limited = cols >= 0
+    obtained[rows[limited], cols[limited]] += 1
+
+
+def pity_step(pool, obtained, epic_counter, legendary_counter, guarantee, rng):
+    """
+    为每个玩家按 drawMultiple 规则抽一次，obtained / 计数器原地更新
+    返回 (物品位置, 是否为强制抽取)
+    """
+    n = obtained.shape[0]
+    slots = np.empty(n, dtype=np.int64)
+    forced = np.zeros(n, dtype=bool)
+    normal = np.ones(n, dtype=bool)
+
+    epic_threshold = guarantee.get('epic') or 0
+    legendary_threshold = guarantee.get('legendary') or 0
+    want_legendary = np.zeros(n, dtype=bool)
+    if legendary_threshold:
+        want_legendary = legendary_counter >= legendary_threshold - 1
+    want_epic = np.zeros(n, dtype=bool)
+    if epic_threshold:
+        want_epic = ~want_legendary & (epic_counter >= epic_threshold - 1)
+
+    for want, candidates in (
+        (want_legendary, pool.rarity_code == LEGENDARY),
+        (want_epic, pool.rarity_code >= EPIC),
+    ):
+        rows = np.flatnonzero(want)
+        if not rows.size:
+            continue
+        picked, ok = _forced_draw(pool, obtained[rows], candidates, rng)
+        rows_ok = rows[ok]
+        slots[rows_ok] = picked[ok]
+        forced[rows_ok] = True
+        normal[rows_ok] = False
+
+    # 强制抽取的物品计入已获得数量；正常抽取由 draw_step 在子矩阵上计入后写回
+    rows = np.flatnonzero(forced)
+    if rows.size:
+        _record(pool, obtained, rows, slots[rows])
+    rows = np.flatnonzero(normal)
+    if rows.size:
+        sub = obtained[rows]
+        slots[rows] = draw_step(pool, sub, rng)
+        obtained[rows] = sub
+
+    rarity = pool.rarity_code[slots]
+    is_legendary = rarity == LEGENDARY
+    is_epic = rarity == EPIC
+    epic_counter[:] = np.where(is_legendary | is_epic, 0, epic_counter + 1)
+    legendary_counter[:] = np.where(is_legendary, 0, legendary_counter + 1)
+    return slots, forced
+
+
+def simulate_pity(pool, n_players=DEFAULT_PLAYERS, n_pulls=DEFAULT_PULLS, guarantee=None,
+                  seed=None, epic_counter=0, legendary_counter=0):
+    """
+    每个玩家按 drawMultiple 规则连抽 n_pulls 次
+
+    返回 dict:
+      counts           (玩家数, 物品数) 抽中次数
+      forced           每个玩家的强制抽取次数
+      first_legendary  首次抽中传说的抽数（未抽中为 -1）
+      epic_counter / legendary_counter  结束时的保底计数
+    """
+    guarantee = DEFAULT_GUARANTEE if guarantee is None else guarantee
+    rng = _make_rng(seed)
+    obtained = np.zeros((n_players, pool.limited.size), dtype=np.int32)
+    epic = np.full(n_players, epic_counter, dtype=np.int64)
+    legendary = np.full(n_players, legendary_counter, dtype=np.int64)
+    counts = np.zeros((n_players, pool.size), dtype=np.int32)
+    forced_total = np.zeros(n_players, dtype=np.int32)
+    first_legendary = np.full(n_players, -1, dtype=np.int64)
+    players = np.arange(n_players)
+
+    for step in range(n_pulls):
+        slots, forced = pity_step(pool, obtained, epic, legendary, guarantee, rng)
+        counts[players, slots] += 1
+        forced_total += forced
+        first = (first_legendary < 0) & (pool.rarity_code[slots] == LEGENDARY)
+        first_legendary[first] = step + 1
+
+    return {
+        'counts': counts,
+        'forced': forced_total,
+        'first_legendary': first_legendary,
+        'epic_counter': epic,
+        'legendary_counter': legendary,
+    }
+
+
+def summarize_pity(pool, result, n_pulls):
+    """按稀有度汇总每位玩家的平均获得数和保底触发情况"""
+    counts = result['counts']
+    summary = {}
+    for code, rarity in enumerate(RARITIES):
+        cols = pool.rarity_code == code
+        if cols.any():
+            summary[rarity] = float(counts[:, cols].sum(axis=1).mean())
+    first = result['first_legendary']
+    got = first[first > 0]
+    summary['forced_rate'] = float(result['forced'].mean() / n_pulls) if n_pulls else 0.0
+    summary['legendary_chance'] = float(got.size / first.size) if first.size else 0.0
+    summary['first_legendary'] = float(got.mean()) if got.size else None
+    return summary
+
+
+def sweep_pity(pool, epic_values, legendary_values, n_players=DEFAULT_PLAYERS,
+               n_pulls=DEFAULT_PULLS, seed=None):
+    """
+    批量扫描保底阈值（0 表示关闭），每组阈值使用相同的种子（公共随机数，差异更稳定）
+    返回 [(epic, legendary, 汇总)]
+    """
+    seed = np.random.SeedSequence(seed).generate_state(1)[0] if not isinstance(seed, int) else seed
+    rows = []
+    for epic in epic_values:
+        for legendary in legendary_values:
+            guarantee = {'epic': epic, 'legendary': legendary}
+            result = simulate_pity(pool, n_players, n_pulls, guarantee, seed=seed)
+            rows.append((epic, legendary, summarize_pity(pool, result, n_pulls)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='保底机制批量模拟（drawMultiple 规则）')
+    parser.add_argument('activity', help='活动 ID，例如 ag98')
+    parser.add_argument('--pool', help='奖池（cargo: gameplay/rm，flagship: container/flagship）')
+    parser.add_argument('--players', type=int, default=20_000, help='模拟玩家数（默认 20000）')
+    parser.add_argument('--pulls', type=int, default=DEFAULT_PULLS, help=f'每个玩家抽数（默认 {DEFAULT_PULLS}）')
+    parser.add_argument('--epic', type=int, nargs='+', default=[DEFAULT_GUARANTEE['epic']],
+                        help='史诗保底阈值（可多个，0 为关闭）')
+    parser.add_argument('--legendary', type=int, nargs='+', default=[DEFAULT_GUARANTEE['legendary']],
+                        help='传说保底阈值（可多个，0 为关闭）')
+    parser.add_argument('--seed', type=int, help='随机种子')
+    args = parser.parse_args()
+
+    try:
+        pool = GachaPool.from_activity(args.activity, args.pool)
+    except (FileNotFoundError, ValueError) as e:
+        parser.exit(1, f"❌ {e}\n")
+
+    print(f"🎰 {pool.activity_id} / {pool.key}: {pool.size} 个物品 | "
+          f"{args.players:,} 玩家 × {args.pulls} 抽")
+    rarities = [r for code, r in enumerate(RARITIES) if np.any(pool.rarity_code == code)]
+    print(f"   {'史诗':>5} {'传说':>5} | " + ' '.join(f'{r:>9}' for r in rarities)
+          + ' | 强制占比 | 出传说率 | 首个传说')
+    for epic, legendary, summary in sweep_pity(pool, args.epic, args.legendary,
+                                               args.players, args.pulls, args.seed):
+        first = summary['first_legendary']
+        print(f"   {epic:>5} {legendary:>5} | "
+              + ' '.join(f'{summary[r]:9.3f}' for r in rarities)
+              + f" | {summary['forced_rate']:8.2%} | {summary['legendary_chance']:8.2%} | "
+              + (f'{first:8.1f}' if first is not None else '       -'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+抽奖模拟引擎（NumPy 向量化）
+读取 public/gacha-configs 下的活动配置，同时模拟大量玩家的抽奖过程
+
+抽取规则与 src/services/gachaService.js 的 drawSingle 一致：
+  - 达到 limit 的物品不可再抽
+  - 不可抽物品的概率平均补给可抽的 common 物品
+等价的 O(1) 采样方式：先按原始概率抽一个物品，若已达上限，
+再在可抽的 common 物品中均匀选一个（两者分布完全相同）
+已获得数量按物品位置（而不是 id）计数，与各抽奖组件一致（部分物品 id 为空或重复）
+
+依赖安装:
+  pip install numpy
+
+使用方法:
+  python scripts/gacha_sim.py ag98
+  python scripts/gacha_sim.py be100 --pool rm --players 200000 --seed 42
+  python scripts/gacha_sim.py la100 --pool flagship --pulls 100
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from config_store import load_config
+
+PROJECT_ROOT = Path(__file__).parent.parent
+GACHA_CONFIG_DIR = PROJECT_ROOT / 'public' / 'gacha-configs'
+
+# 抽卡类型 -> 配置目录（与 src/services/cdnService.js 的 GACHA_TYPE_MAP 一致）
+GACHA_TYPE_DIRS = {
+    '筹码类': 'chip',
+    '机密货物类': 'cargo',
+    '无人机补给类': 'cargo',
+    '旗舰宝箱类': 'flagship',
+}
+
+RARITIES = ('common', 'rare', 'epic', 'legendary')
+
+# 抽取语义或随机数使用方式变化时递增（结果缓存按此失效）
+ENGINE_VERSION = 1
+
+# 默认模拟参数
+DEFAULT_PLAYERS = 100_000
+DEFAULT_MAX_PULLS = 20_000
+DEFAULT_CHUNK_SIZE = 200_000
+
+
+# ========== 配置读取 ==========
+
+def load_index():
+    """读取活动索引 index.json（共享的解析结果，不要修改）"""
+    return load_config(GACHA_CONFIG_DIR / 'index.json')
+
+
+def find_config_path(activity_id):
+    """按活动 ID 查找配置文件路径"""
+    for activity in load_index().get('activities', []):
+        if activity.get('id') == activity_id:
+            type_dir = GACHA_TYPE_DIRS.get(activity.get('gacha_type'), 'chip')
+            path = GACHA_CONFIG_DIR / type_dir / f'{activity_id}.json'
+            if path.exists():
+                return path
+    # 索引里没有时按目录查找
+    for type_dir in sorted(set(GACHA_TYPE_DIRS.values())):
+        path = GACHA_CONFIG_DIR / type_dir / f'{activity_id}.json'
+        if path.exists():
+            return path
+    raise FileNotFoundError(f'未找到活动配置: {activity_id}')
+
+
+def load_activity(activity_id):
+    """读取单个活动配置（共享的解析结果，不要修改）"""
+    return load_config(find_config_path(activity_id))
+
+
+def list_pools(config):
+    """
+    列出配置中的奖池，返回 [(奖池标识, items)]
+    筹码类只有一个奖池 'default'；机密货物类按 cargos[].type；旗舰宝箱类按 lootboxes[].type
+    """
+    if 'items' in config:
+        return [('default', config['items'])]
+    pools = []
+    for group in config.get('cargos') or config.get('lootboxes') or []:
+        pools.append((group.get('type', str(len(pools))), group.get('items', [])))
+    return pools
+
+
+def get_pool_items(config, pool=None):
+    """取出指定奖池的 (奖池标识, items)，未指定时取第一个"""
+    pools = list_pools(config)
+    if not pools:
+        raise ValueError(f'活动 {config.get("id", "")} 没有奖池')
+    if pool is None:
+        return pools[0]
+    for key, items in pools:
+        if key == pool:
+            return key, items
+    raise ValueError(f'活动 {config.get("id", "")} 没有奖池 {pool}（可选: {", ".join(k for k, _ in pools)}）')
+
+
+# ========== 奖池 ==========
+
+class GachaPool:
+    """奖池的数组表示（概率 / 上限 / 稀有度），供各模拟引擎共用"""
+
+    def __init__(self, items, key='default', activity_id=''):
+        self._build(
+            key, activity_id,
+            names=[item.get('name', '') for item in items],
+            ids=[item.get('id', '') for item in items],
+            rarities=[item.get('rarity', 'common') for item in items],
+            probability=[float(item.get('probability', 0)) for item in items],
+            limit=[int(item.get('limit', 0)) for item in items],
+        )
+
+    @classmethod
+    def from_columns(cls, names, ids, rarities, probability, limit, key='default', activity_id=''):
+        """由列数据构造（gacha_catalog 使用，不经过 items 字典）"""
+        pool = cls.__new__(cls)
+        pool._build(key, activity_id, names, ids, rarities, probability, limit)
+        return pool
+
+    def _build(self, key, activity_id, names, ids, rarities, probability, limit):
+        self.activity_id = activity_id
+        self.key = key
+        self.names = list(names)
+        self.ids = list(ids)
+        self.rarities = list(rarities)
+        self.probability = np.array(probability, dtype=np.float64)
+        self.limit = np.array(limit, dtype=np.int64)
+        self.rarity_code = np.array(
+            [RARITIES.index(r) if r in RARITIES else 0 for r in self.rarities], dtype=np.int8
+        )
+
+        self.size = len(self.names)
+        self.total = float(self.probability.sum())
+        if self.size == 0 or self.total <= 0:
+            raise ValueError(f'奖池 {activity_id}/{key} 概率总和为 0，无法模拟')
+        self.cdf = np.cumsum(self.probability)
+
+        # 有上限的物品：位置 -> 列号（-1 表示无上限）
+        self.limited = np.flatnonzero(self.limit > 0)
+        self.slot_to_col = np.full(self.size, -1, dtype=np.int64)
+        self.slot_to_col[self.limited] = np.arange(self.limited.size)
+        self.limited_limit = self.limit[self.limited]
+
+        # common 物品（接收被补给的概率）
+        self.common = np.flatnonzero(self.rarity_code == 0)
+        self.common_col = self.slot_to_col[self.common]
+
+    @classmethod
+    def from_config(cls, config, pool=None):
+        key, items = get_pool_items(config, pool)
+        return cls(items, key=key, activity_id=config.get('id', ''))
+
+    @classmethod
+    def from_activity(cls, activity_id, pool=None):
+        return cls.from_config(load_activity(activity_id), pool)
+
+    def default_targets(self):
+        """默认的集齐目标：所有有上限的非 common 物品"""
+        return self.limited[self.rarity_code[self.limited] > 0]
+
+    def item_label(self, slot):
+        return self.names[slot] or self.ids[slot] or f'#{slot}'
+
+
+# ========== 向量化抽取 ==========
+
+def draw_step(pool, obtained, rng):
+    """
+    为每个玩家抽一次
+    obtained: (玩家数, 有上限物品数) 已获得数量，会被原地更新
+    返回每个玩家抽中的物品位置
+    """
+    n = obtained.shape[0]
+    slots = np.searchsorted(pool.cdf, rng.random(n) * pool.total, side='right')
+    np.minimum(slots, pool.size - 1, out=slots)
+
+    if pool.limited.size:
+        cols = pool.slot_to_col[slots]
+        rows = np.flatnonzero(cols >= 0)
+        if rows.size:
+            exhausted = obtained[rows, cols[rows]] >= pool.limit[slots[rows]]
+            ex_rows = rows[exhausted]
+            if ex_rows.size:
+                slots[ex_rows] = _redistribute(pool, obtained[ex_rows], rng)
+
+        cols = pool.slot_to_col[slots]
+        rows = np.flatnonzero(cols >= 0)
+        obtained[rows, cols[rows]] += 1
+
+    return slots
+
+
+def _redistribute(pool, obtained, rng):
+    """抽中已达上限的物品时，在可抽的 common 物品中均匀重选"""
+    n = obtained.shape[0]
+    available = np.ones((n, pool.common.size), dtype=bool)
+    limited_common = np.flatnonzero(pool.common_col >= 0)
+    for c in limited_common:
+        col = pool.common_col[c]
+        available[:, c] = obtained[:, col] < pool.limited_limit[col]
+
+    counts = available.sum(axis=1)
+    result = np.empty(n, dtype=np.int64)
+
+    has_common = counts > 0
+    if has_common.any():
+        pick = (rng.random(n) * counts).astype(np.int64)
+        order = np.cumsum(available, axis=1) > pick[:, None]
+        result[has_common] = pool.common[np.argmax(order, axis=1)[has_common]]
+
+    # 没有可抽的 common 物品：drawSingle 不补给，相当于在可抽物品中按原始概率归一化
+    no_common = np.flatnonzero(~has_common)
+    if no_common.size:
+        weights = np.broadcast_to(pool.probability, (no_common.size, pool.size)).copy()
+        weights[:, pool.limited] *= obtained[no_common] < pool.limited_limit
+        cdf = np.cumsum(weights, axis=1)
+        r = rng.random(no_common.size) * cdf[:, -1]
+        result[no_common] = np.minimum((cdf <= r[:, None]).sum(axis=1), pool.size - 1)
+
+    return result
+
+
+def _make_rng(seed):
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def simulate_completion(pool, n_players=DEFAULT_PLAYERS, max_pulls=DEFAULT_MAX_PULLS,
+                        seed=None, targets=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    模拟每个玩家抽到集齐 targets（默认所有有上限的非 common 物品）所需的抽数
+
+    返回 dict:
+      pulls      每个玩家的集齐抽数（max_pulls 内未集齐为 -1）
+      item_hits  所有玩家合计抽中各物品的次数
+      total_pulls 实际模拟的总抽数
+    """
+    rng = _make_rng(seed)
+    targets = pool.default_targets() if targets is None else np.asarray(targets, dtype=np.int64)
+    is_target = np.zeros(pool.size, dtype=bool)
+    is_target[targets] = True
+    need = int(pool.limit[targets].sum())
+
+    pulls = np.full(n_players, -1, dtype=np.int64)
+    item_hits = np.zeros(pool.size, dtype=np.int64)
+    total_pulls = 0
+
+    for start in range(0, n_players, chunk_size):
+        count = min(chunk_size, n_players - start)
+        if need == 0:
+            pulls[start:start + count] = 0
+            continue
+
+        player_ids = np.arange(start, start + count)
+        obtained = np.zeros((count, pool.limited.size), dtype=np.int32)
+        remaining = np.full(count, need, dtype=np.int64)
+
+        for step in range(max_pulls):
+            slots = draw_step(pool, obtained, rng)
+            item_hits += np.bincount(slots, minlength=pool.size)
+            total_pulls += slots.size
+
+            # 抽中的物品必然可抽，抽中目标即向集齐推进一步
+            remaining -= is_target[slots]
+            done = remaining == 0
+            if done.any():
+                pulls[player_ids[done]] = step + 1
+                keep = ~done
+                player_ids = player_ids[keep]
+                obtained = obtained[keep]
+                remaining = remaining[keep]
+                if not player_ids.size:
+                    break
+
+    return {'pulls': pulls, 'item_hits': item_hits, 'total_pulls': total_pulls}
+
+
+def simulate_pulls(pool, n_players, n_pulls, seed=None):
+    """模拟每个玩家固定抽 n_pulls 次，返回 (玩家数, 物品数) 的抽中次数矩阵"""
+    rng = _make_rng(seed)
+    obtained = np.zeros((n_players, pool.limited.size), dtype=np.int32)
+    counts = np.zeros((n_players, pool.size), dtype=np.int32)
+    rows = np.arange(n_players)
+    for _ in range(n_pulls):
+        slots = draw_step(pool, obtained, rng)
+        counts[rows, slots] += 1
+    return counts
+
+
+# ========== 命令行 ==========
+
+def _print_completion(pool, result, elapsed):
+    pulls = result['pulls']
+    done = pulls[pulls >= 0]
+    print(f"\n🎯 集齐目标: {', '.join(pool.item_label(s) for s in pool.default_targets()) or '(无)'}")
+    print(f"👥 玩家数: {pulls.size} | 集齐: {done.size} ({done.size / pulls.size:.2%})")
+    if done.size:
+        p50, p90, p99 = np.percentile(done, [50, 90, 99])
+        print(f"📈 平均 {done.mean():.1f} 抽 | P50 {p50:.0f} | P90 {p90:.0f} | P99 {p99:.0f} | 最多 {done.max()}")
+    rate = result['total_pulls'] / elapsed if elapsed > 0 else float('inf')
+    print(f"⚡ {result['total_pulls']:,} 抽 / {elapsed:.2f}s = {rate / 1e6:.1f}M 抽/秒")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='抽奖模拟（NumPy 向量化）')
+    parser.add_argument('activity', help='活动 ID，例如 ag98')
+    parser.add_argument('--pool', help='奖池（cargo: gameplay/rm，flagship: container/flagship）')
+    parser.add_argument('--players', type=int, default=DEFAULT_PLAYERS, help='模拟玩家数')
+    parser.add_argument('--max-pulls', type=int, default=DEFAULT_MAX_PULLS, help='每个玩家最多抽数')
+    parser.add_argument('--pulls', type=int, help='固定抽数模式：每个玩家抽 N 次，输出物品期望')
+    parser.add_argument('--seed', type=int, help='随机种子')
+    args = parser.parse_args()
+
+    try:
+        pool = GachaPool.from_activity(args.activity, args.pool)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"🎰 {pool.activity_id} / {pool.key}: {pool.size} 个物品，{pool.limited.size} 个有上限")
+
+    start = time.perf_counter()
+    if args.pulls:
+        counts = simulate_pulls(pool, args.players, args.pulls, seed=args.seed)
+        elapsed = time.perf_counter() - start
+        mean = counts.mean(axis=0)
+        print(f"\n📋 每位玩家抽 {args.pulls} 次的平均获得:")
+        for slot in np.argsort(-mean):
+            print(f"   {mean[slot]:8.3f}  {pool.item_label(slot)}")
+        total = args.players * args.pulls
+        print(f"\n⚡ {total:,} 抽 / {elapsed:.2f}s = {total / elapsed / 1e6:.1f}M 抽/秒")
+    else:
+        result = simulate_completion(pool, args.players, args.max_pulls, seed=args.seed)
+        _print_completion(pool, result, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+氪金花费分析（抽数分布 × 商店套餐定价）
+把集齐抽数的精确分布换算成人民币花费，给出每个活动 / 奖池：
+  - 集齐所需花费的分布（期望和分位数，单位：元）
+  - 每个氪金里程碑（src/data/milestoneConfig.js）：预算内可抽的次数、
+    预算内集齐的概率、为集齐会触发该里程碑的概率
+
+花费模型（与各抽奖组件一致）：
+  - 初始状态来自 getDefaultGameState：初始货币和已计入的花费（rmb 的初始值）
+  - 货币不足时按 findCheapestPurchase 购买最便宜的套餐组合，这里对总缺口购买一次，
+    是逐次补差价的下界
+  - 抽到同种货币（extractCurrencyAmount）按每抽的期望返还折算，净消耗 = 单抽消耗 - 期望返还
+集齐抽数分布由 gacha_exact 精确求解，并按配置内容哈希存入 gacha_cache 的磁盘缓存，
+配置不变时全部活动 × 里程碑的扫描只需要查表
+
+依赖安装:
+  pip install numpy
+
+使用方法:
+  python scripts/gacha_spend.py ag98
+  python scripts/gacha_spend.py be100 --pool rm --milestones
+  python scripts/gacha_spend.py --all --output spend.json
+"""
+
+import re
+import sys
+import json
+import math
+import time
+import base64
+import argparse
+
+import numpy as np
+
+from gacha_sim import PROJECT_ROOT, GACHA_TYPE_DIRS, GachaPool, load_activity, load_index, list_pools
+from gacha_exact import DEFAULT_TAIL_EPS, solve_completion
+from gacha_stats import PULL_COSTS, PERCENTILES
+from gacha_cache import SimulationCache, cache_key, config_digest
+
+MILESTONE_CONFIG = PROJECT_ROOT / 'src' / 'data' / 'milestoneConfig.js'
+
+# 商店套餐（与各抽奖组件的 shopPackages 一致）
+CHIP_PACKAGES = [
+    {'id': 1, 'coins': 22, 'price': 28},
+    {'id': 2, 'coins': 60, 'price': 65},
+    {'id': 3, 'coins': 135, 'baseCoins': 135, 'price': 125, 'basePrice': 125},
+]
+FLAGSHIP_PACKAGES = [
+    {'id': 1, 'coins': 20, 'bonus': 0, 'price': 20},
+    {'id': 2, 'coins': 104, 'bonus': 6, 'price': 96},
+    {'id': 3, 'coins': 234, 'bonus': 26, 'price': 216},
+]
+
+# (配置类型, 奖池) -> 可购买的套餐（无人机电池 / 遥控器和普通宝箱钥匙不能购买）
+SHOP_PACKAGES = {
+    ('chip', 'default'): CHIP_PACKAGES,
+    ('cargo', 'rm'): CHIP_PACKAGES,
+    ('flagship', 'flagship'): FLAGSHIP_PACKAGES,
+    ('flagship', 'medium'): FLAGSHIP_PACKAGES,
+}
+
+# getDefaultGameState：初始货币（按奖池消耗的货币）和初始花费（-rmb）
+STARTING_CURRENCY = {
+    ('chip', 'default'): 40,
+    ('cargo', 'rm'): 70,
+    ('cargo', 'gameplay'): 3000,
+    ('flagship', 'flagship'): 110,
+    ('flagship', 'medium'): 110,
+    ('flagship', 'container'): 0,
+}
+STARTING_SPEND = {'chip': 25, 'cargo': 25, 'flagship': 88}
+
+# 返还本奖池货币的物品 id 和数量格式（与各组件的 extractCurrencyAmount 一致）
+_AMOUNT = re.compile(r'^(\d+)\s*')
+_CHIP_AMOUNT = re.compile(r'^(\d+)\s*筹码')
+REFUND_ITEMS = {
+    ('chip', 'default'): (('currency_gachacoins',), _CHIP_AMOUNT),
+    ('cargo', 'rm'): (('bigevent_currency_gacha_rm', 'Authorization_Key'), _AMOUNT),
+    ('cargo', 'gameplay'): (('bigevent_currency_gacha_gameplay', 'Drone_Fob'), _AMOUNT),
+    ('flagship', 'flagship'): (('currency_premium_lootboxkey',), _AMOUNT),
+    ('flagship', 'medium'): (('currency_premium_lootboxkey',), _AMOUNT),
+    ('flagship', 'container'): (('currency_common_lootboxkey',), _AMOUNT),
+}
+
+
+def load_milestones(path=MILESTONE_CONFIG):
+    """读取 milestoneConfig.js 中的里程碑金额（升序）"""
+    text = path.read_text(encoding='utf-8')
+    return sorted({int(m) for m in re.findall(r'amount:\s*(\d+)', text)})
+
+
+# ========== 套餐定价 ==========
+
+def normalize_packages(packages):
+    """与 findCheapestPurchase 相同的标准化：(币数, 价格)，按币数降序"""
+    normalized = [
+        ((pkg.get('baseCoins') or pkg['coins']) + (pkg.get('bonus') or 0), pkg.get('basePrice') or pkg['price'])
+        for pkg in packages
+    ]
+    return sorted(normalized, key=lambda p: -p[0])
+
+
+def find_cheapest_purchase(deficit, packages):
+    """findCheapestPurchase 的逐项移植（用于核对 PriceTable），返回 (总币数, 总价格)"""
+    if deficit <= 0 or not packages:
+        return 0, 0
+    normalized = normalize_packages(packages)
+    best = None
+    for quantities in _combos(deficit, [coins for coins, _ in normalized]):
+        coins = sum(q * c for q, (c, _) in zip(quantities, normalized))
+        price = sum(q * p for q, (_, p) in zip(quantities, normalized))
+        if coins >= deficit and (best is None or price < best[1]):
+            best = (coins, price)
+    return best or (0, 0)
+
+
+def _combos(deficit, coins):
+    """外层套餐逐个枚举数量，最小的套餐补齐剩余缺口"""
+    if len(coins) == 1:
+        yield (max(math.ceil(deficit / coins[0]), 0),)
+        return
+    for q in range(math.ceil(deficit / coins[0]) + 1):
+        remaining = deficit - q * coins[0]
+        if remaining <= 0:
+            yield (q,) + (0,) * (len(coins) - 1)
+            continue
+        for rest in _combos(remaining, coins[1:]):
+            yield (q,) + rest
+
+
+class PriceTable:
+    """
+    补足 deficit 个货币的最低价格，对任意大小的缺口 O(1) 查询
+    存在最优方案使性价比最高的套餐以外的套餐少于 c* 个（c* 为其币数，否则其中必有币数和为 c* 倍数的
+    子集，换成最优套餐不会更贵），所以缺口超过 (c* - 1) · 最大币数 后，最优方案一定包含最优套餐：
+      price(d) = p* + price(d - c*)
+    只需对较小的缺口做一次动态规划
+    """
+
+    def __init__(self, packages):
+        self.packages = normalize_packages(packages)
+        coins = np.array([c for c, _ in self.packages], dtype=np.int64)
+        prices = np.array([p for _, p in self.packages], dtype=np.int64)
+        best = int(np.argmin(prices / coins))
+        self.best_coins, self.best_price = int(coins[best]), int(prices[best])
+        self.bound = (self.best_coins - 1) * int(coins.max())
+
+        # 覆盖问题的 DP：table[d] = min(price + table[max(d - coins, 0)])
+        # 按最小币数分块，块内的依赖都在之前的块里，可整块向量化
+        table = np.zeros(self.bound + 1, dtype=np.int64)
+        step = int(coins.min())
+        for start in range(1, self.bound + 1, step):
+            d = np.arange(start, min(start + step, self.bound + 1))
+            table[d] = (prices[:, None] + table[np.maximum(d[None, :] - coins[:, None], 0)]).min(axis=0)
+        self.table = table
+
+    def price(self, deficit):
+        """最低价格（deficit 可以是数组，<= 0 时为 0）"""
+        deficit = np.maximum(np.asarray(deficit, dtype=np.int64), 0)
+        over = np.maximum(deficit - self.bound, 0)
+        repeats = -(-over // self.best_coins)
+        return repeats * self.best_price + self.table[deficit - repeats * self.best_coins]
+
+
+# ========== 花费模型 ==========
+
+def refund_per_pull(pool, config_type, pool_key):
+    """每抽期望返还的本奖池货币（按原始概率，不计达到上限后的补给）"""
+    ids, pattern = REFUND_ITEMS.get((config_type, pool_key), ((), _AMOUNT))
+    refund = 0.0
+    for slot, item_id in enumerate(pool.ids):
+        if item_id in ids:
+            match = pattern.match(pool.names[slot])
+            refund += pool.probability[slot] * (int(match.group(1)) if match else 1)
+    return refund / pool.total
+
+
+class SpendModel:
+    """抽数 -> 累计花费（元），对抽数单调不减"""
+
+    def __init__(self, config_type, pool_key, pool):
+        self.cost, self.currency = PULL_COSTS.get((config_type, pool_key), (1, ''))
+        self.refund = refund_per_pull(pool, config_type, pool_key)
+        self.net_cost = self.cost - self.refund
+        self.starting_currency = STARTING_CURRENCY.get((config_type, pool_key), 0)
+        self.starting_spend = STARTING_SPEND.get(config_type, 0)
+        packages = SHOP_PACKAGES.get((config_type, pool_key))
+        self.prices = PriceTable(packages) if packages else None
+
+    @property
+    def purchasable(self):
+        return self.prices is not None and self.net_cost > 0
+
+    def spend(self, pulls):
+        pulls = np.asarray(pulls, dtype=np.float64)
+        deficit = np.ceil(pulls * self.net_cost - self.starting_currency - 1e-9).astype(np.int64)
+        return self.starting_spend + self.prices.price(deficit)
+
+    def pulls_within(self, budget):
+        """花费不超过 budget 时最多能抽的次数（低于初始花费时为 None）"""
+        if budget < self.starting_spend:
+            return None
+        low, high = 0, 1
+        while self.spend(high) <= budget:
+            low, high = high, high * 2
+        while high - low > 1:
+            mid = (low + high) // 2
+            if self.spend(mid) <= budget:
+                low = mid
+            else:
+                high = mid
+        return low
+
+
+# ========== 抽数分布（带磁盘缓存） ==========
+
+def completion_cdf(config, pool_key, pool=None, cache=None):
+    """集齐抽数的 CDF（float32，下标为抽数）；cache 为 SimulationCache 时先查缓存"""
+    key = None
+    if cache is not None:
+        config_hash = config_digest(config)
+        key = cache_key(config_hash, {'kind': 'exact-cdf', 'pool': pool_key, 'tailEps': DEFAULT_TAIL_EPS})
+        value = cache.get(key)
+        if value is not None:
+            return np.frombuffer(base64.b64decode(value['cdf']), dtype=np.float32), value['truncated']
+
+    pool = pool or GachaPool.from_config(config, pool_key)
+    solution = solve_completion(pool)
+    cdf = solution['cdf'].astype(np.float32)
+    if key is not None:
+        value = {'cdf': base64.b64encode(cdf.tobytes()).decode('ascii'), 'truncated': solution['truncated']}
+        cache.put(key, config.get('id', ''), config_hash, value)
+    return cdf, solution['truncated']
+
+
+def analyze_pool(config, config_type, pool_key, milestones, cache=None):
+    pool = GachaPool.from_config(config, pool_key)
+    model = SpendModel(config_type, pool_key, pool)
+    result = {
+        'costPerPull': model.cost,
+        'currency': model.currency,
+        'refundPerPull': round(model.refund, 4),
+        'startingCurrency': model.starting_currency,
+        'startingSpend': model.starting_spend,
+    }
+    if not pool.default_targets().size:
+        return result
+    if not model.purchasable:
+        result['error'] = f'{model.currency or pool_key} 不能购买或无需购买'
+        return result
+
+    cdf, truncated = completion_cdf(config, pool_key, pool, cache)
+    pmf = np.diff(cdf, prepend=np.float32(0)).astype(np.float64)
+    spend = model.spend(np.arange(cdf.size))
+    # 花费对抽数单调，花费分位数 = 抽数分位数处的花费
+    quantile_pulls = np.minimum(np.searchsorted(cdf, np.array(PERCENTILES) / 100.0), cdf.size - 1)
+    result['complete'] = {
+        'meanPulls': round(float((pmf * np.arange(cdf.size)).sum()), 1),
+        'meanSpend': round(float((pmf * spend).sum()), 1),
+        'percentiles': {f'p{q}': int(spend[n]) for q, n in zip(PERCENTILES, quantile_pulls)},
+        'truncated': bool(truncated),
+    }
+
+    # P(集齐花费 <= M) = CDF(最后一个花费 <= M 的抽数)；P(集齐花费 >= M) = 1 - CDF(最后一个花费 < M 的抽数)
+    total = float(cdf[-1])
+    within = np.searchsorted(spend, milestones, side='right') - 1
+    below = np.searchsorted(spend, milestones, side='left') - 1
+    rows = []
+    for amount, i, j in zip(milestones, within, below):
+        rows.append({
+            'amount': amount,
+            'pulls': model.pulls_within(amount),
+            'completeRate': round(float(cdf[i]) if i >= 0 else 0.0, 6),
+            'reachRate': round(total - (float(cdf[j]) if j >= 0 else 0.0), 6),
+        })
+    result['milestones'] = rows
+    return result
+
+
+def analyze_activity(config, config_type, milestones, cache=None, pool_keys=None):
+    pools = {}
+    for pool_key, _ in list_pools(config):
+        if pool_keys and pool_key not in pool_keys:
+            continue
+        try:
+            pools[pool_key] = analyze_pool(config, config_type, pool_key, milestones, cache)
+        except ValueError as e:
+            pools[pool_key] = {'error': str(e)}
+    return {'id': config.get('id', ''), 'type': config_type, 'pools': pools}
+
+
+# ========== 命令行 ==========
+
+def _print_pool(label, stats, show_milestones):
+    complete = stats.get('complete')
+    if 'error' in stats or not complete:
+        print(f"   {label:<24} ⚠️  {stats.get('error', '没有集齐目标')}")
+        return
+    p = complete['percentiles']
+    print(f"   {label:<24} 期望 ¥{complete['meanSpend']:>9,.0f} | P50 ¥{p['p50']:>8,} | "
+          f"P90 ¥{p['p90']:>8,} | P99 ¥{p['p99']:>9,} | 返还 {stats['refundPerPull']:.2f}/抽")
+    if show_milestones:
+        for row in stats['milestones']:
+            pulls = '-' if row['pulls'] is None else f"{row['pulls']:,}"
+            print(f"      ¥{row['amount']:>9,} | {pulls:>10} 抽 | 预算内集齐 {row['completeRate']:7.2%} | "
+                  f"集齐前触发 {row['reachRate']:7.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='集齐花费与氪金里程碑分析')
+    parser.add_argument('activity', nargs='?', help='活动 ID，例如 ag98')
+    parser.add_argument('--pool', help='奖池（cargo: gameplay/rm，flagship: flagship/medium）')
+    parser.add_argument('--all', action='store_true', help='分析 index.json 中的所有活动')
+    parser.add_argument('--milestones', action='store_true', help='输出每个里程碑的明细')
+    parser.add_argument('--no-cache', action='store_true', help='不读写磁盘缓存')
+    parser.add_argument('--output', help='结果写入 JSON 文件')
+    args = parser.parse_args()
+
+    if not args.all and not args.activity:
+        parser.error('需要指定活动 ID 或 --all')
+
+    start = time.perf_counter()
+    index = {a.get('id'): a for a in load_index().get('activities', [])}
+    activity_ids = list(index) if args.all else [args.activity]
+    milestones = load_milestones()
+    cache = None if args.no_cache else SimulationCache()
+
+    report = {'milestones': milestones, 'activities': {}}
+    try:
+        for activity_id in activity_ids:
+            try:
+                config = load_activity(activity_id)
+            except FileNotFoundError as e:
+                print(f"   ❌ {e}")
+                continue
+            config_type = GACHA_TYPE_DIRS.get(index.get(activity_id, {}).get('gacha_type'))
+            if config_type is None:
+                print(f"   ❌ {activity_id}: 未知的抽卡类型")
+                continue
+            pool_keys = [args.pool] if args.pool else None
+            stats = analyze_activity(config, config_type, milestones, cache, pool_keys)
+            report['activities'][activity_id] = stats
+            for pool_key, pool_stats in stats['pools'].items():
+                _print_pool(f'{activity_id}/{pool_key}', pool_stats, args.milestones)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 已写入 {args.output}")
+    print(f"\n⏱️  总耗时 {time.perf_counter() - start:.2f}s")
+    if not report['activities']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
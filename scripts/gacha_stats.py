@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+活动统计预计算（随配置一起发布）
+为每个活动生成 <类型目录>/<活动ID>.stats.json，放在配置文件旁边，由 upload-to-oss.py 一并上传：
+  - 每个奖池集齐所有有上限的非 common 物品的期望抽数 / 花费和分位数表（gacha_exact 精确求解）
+  - 每个有上限的非 common 物品单独抽满的期望抽数 / 花费和分位数
+  - 机密货物类的保底效果（guaranteeThreshold 抽强制出头奖）
+统计文件记录配置内容哈希和引擎版本，只有配置内容变化（或引擎升级）时才重新生成
+
+依赖安装:
+  pip install numpy
+
+使用方法:
+  python scripts/gacha_stats.py --all
+  python scripts/gacha_stats.py ag98 be100 --force
+"""
+
+import json
+import time
+import argparse
+from datetime import datetime
+
+from gacha_sim import ENGINE_VERSION, GACHA_TYPE_DIRS, GachaPool, find_config_path, load_index, list_pools
+from gacha_exact import solve_completion, percentile
+from gacha_cache import config_digest
+from config_store import STATS_SUFFIX, load_config, write_bytes_atomic
+
+PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+ITEM_PERCENTILES = (50, 90)
+
+# 单抽消耗（与各抽奖组件的 singleCost 一致）：(配置类型, 奖池) -> (数量, 货币名称)
+PULL_COSTS = {
+    ('chip', 'default'): (1, '筹码'),
+    ('cargo', 'rm'): (1, '授权密钥'),
+    ('cargo', 'gameplay'): (30, '无人机电池'),
+    ('flagship', 'flagship'): (10, '旗舰钥匙'),
+    ('flagship', 'medium'): (2, '旗舰钥匙'),
+    ('flagship', 'container'): (2, '普通宝箱钥匙'),
+}
+
+# 机密货物类保底默认值（与 CargoGacha.getGuaranteeThreshold 一致）
+DEFAULT_GUARANTEE_THRESHOLDS = {'rm': 1150, 'gameplay': 950}
+
+
+def stats_path(config_path):
+    """配置文件对应的统计文件路径"""
+    return config_path.with_name(config_path.stem + STATS_SUFFIX)
+
+
+def _round(value, digits=1):
+    return None if value is None else round(float(value), digits)
+
+
+def _distribution_stats(solution, cost, quantiles):
+    return {
+        'mean': _round(solution['mean']),
+        'std': _round(solution['std']),
+        'meanCost': _round(solution['mean'] * cost),
+        'percentiles': {f'p{q}': percentile(solution, q) for q in quantiles},
+    }
+
+
+def prize_pity_stats(pool, threshold):
+    """
+    机密货物保底：计数器达到 threshold - 1 时强制抽出头奖（items[0]），抽到头奖即清零
+    首个头奖的抽数 G ~ 几何分布(p)，有保底时为 min(G, threshold)：
+      自然抽中概率 = 1 - (1 - p)^(threshold - 1)
+      期望抽数     = (1 - (1 - p)^threshold) / p
+    """
+    p = pool.probability[0] / pool.total
+    if p <= 0:
+        return {'threshold': threshold, 'prize': pool.item_label(0), 'naturalChance': 0.0,
+                'meanPullsWithPity': threshold, 'meanPullsWithoutPity': None}
+    return {
+        'threshold': threshold,
+        'prize': pool.item_label(0),
+        'naturalChance': _round(1 - (1 - p) ** (threshold - 1), 4),
+        'meanPullsWithPity': _round((1 - (1 - p) ** threshold) / p),
+        'meanPullsWithoutPity': _round(1 / p),
+    }
+
+
+def build_pool_stats(config, config_type, pool_key, group_metadata=None):
+    pool = GachaPool.from_config(config, pool_key)
+    cost, currency = PULL_COSTS.get((config_type, pool_key), (1, ''))
+    stats = {'costPerPull': cost, 'currency': currency}
+
+    targets = pool.default_targets()
+    if targets.size:
+        stats['complete'] = _distribution_stats(solve_completion(pool), cost, PERCENTILES)
+
+    items = []
+    for slot in targets:
+        solution = solve_completion(pool, targets=[slot])
+        items.append({
+            'id': pool.ids[slot],
+            'name': pool.names[slot],
+            'rarity': pool.rarities[slot],
+            'limit': int(pool.limit[slot]),
+            **_distribution_stats(solution, cost, ITEM_PERCENTILES),
+        })
+    stats['items'] = items
+
+    if config_type == 'cargo':
+        threshold = (group_metadata or {}).get('guaranteeThreshold')
+        if not isinstance(threshold, (int, float)) or threshold <= 0:
+            threshold = DEFAULT_GUARANTEE_THRESHOLDS.get(pool_key)
+        if threshold:
+            stats['pity'] = prize_pity_stats(pool, int(threshold))
+    return stats
+
+
+def build_activity_stats(config, config_type):
+    """计算单个活动的统计（无法计算的奖池记录错误原因）"""
+    groups = config.get('cargos') or config.get('lootboxes') or []
+    metadata = {group.get('type'): group.get('metadata') for group in groups}
+
+    pools = {}
+    for pool_key, _ in list_pools(config):
+        try:
+            pools[pool_key] = build_pool_stats(config, config_type, pool_key, metadata.get(pool_key))
+        except ValueError as e:
+            pools[pool_key] = {'error': str(e)}
+
+    return {
+        'id': config.get('id', ''),
+        'configHash': config_digest(config),
+        'engine': ENGINE_VERSION,
+        'generatedAt': datetime.now().isoformat(timespec='seconds'),
+        'pools': pools,
+    }
+
+
+def _is_current(path, config_hash):
+    try:
+        existing = load_config(path)
+    except (OSError, ValueError):
+        return False
+    return existing.get('configHash') == config_hash and existing.get('engine') == ENGINE_VERSION
+
+
+def refresh_stats(activity_ids=None, force=False, progress=None):
+    """
+    重新生成配置内容已变化的活动统计
+    返回 {'generated': [...], 'skipped': [...], 'failed': [(活动ID, 原因)]}
+    """
+    index = {a.get('id'): a for a in load_index().get('activities', [])}
+    activity_ids = list(index) if activity_ids is None else activity_ids
+    report = {'generated': [], 'skipped': [], 'failed': []}
+
+    for activity_id in activity_ids:
+        try:
+            config_path = find_config_path(activity_id)
+            config = load_config(config_path)
+        except (OSError, ValueError) as e:
+            report['failed'].append((activity_id, str(e)))
+            continue
+
+        path = stats_path(config_path)
+        if not force and _is_current(path, config_digest(config)):
+            report['skipped'].append(activity_id)
+            continue
+
+        config_type = GACHA_TYPE_DIRS.get(index.get(activity_id, {}).get('gacha_type'), config_path.parent.name)
+        start = time.perf_counter()
+        stats = build_activity_stats(config, config_type)
+        content = json.dumps(stats, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        write_bytes_atomic(path, content)
+        report['generated'].append(activity_id)
+        if progress:
+            progress(activity_id, path, time.perf_counter() - start)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成活动统计文件（<活动ID>.stats.json）')
+    parser.add_argument('activities', nargs='*', help='活动 ID（不指定时处理 index.json 中的所有活动）')
+    parser.add_argument('--all', action='store_true', help='处理所有活动（默认行为）')
+    parser.add_argument('--force', action='store_true', help='忽略内容哈希，全部重新生成')
+    args = parser.parse_args()
+
+    def progress(activity_id, path, elapsed):
+        print(f"✅ {activity_id} → {path.parent.name}/{path.name} ({elapsed * 1000:.0f} ms)", flush=True)
+
+    report = refresh_stats(args.activities or None, args.force, progress)
+    for activity_id, reason in report['failed']:
+        print(f"❌ {activity_id}: {reason}")
+    print(f"\n📊 生成 {len(report['generated'])} 个 | 未变化 {len(report['skipped'])} 个 | "
+          f"失败 {len(report['failed'])} 个")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+固定内存的流式统计（可合并）
+超大规模模拟（1e8+ 玩家）不保存每个玩家的结果，而是边模拟边累加到摘要里：
+  - LogLinearHistogram  对数-线性分桶直方图（HDR 风格）：小于 2^(bits+1) 的值精确计数，
+    更大的值每个 2 的幂区间分 2^bits 个桶，分位数的相对误差不超过 2^-bits
+  - CompletionSummary   集齐抽数直方图 + 精确的总和 / 平方和 + 各物品命中计数
+  - PullSummary         固定抽数场景下各物品获得数的总和 / 平方和
+所有摘要都只做整数累加，merge 满足交换律和结合律，多进程合并结果与顺序无关
+
+依赖安装:
+  pip install numpy
+"""
+
+import numpy as np
+
+from gacha_sim import DEFAULT_MAX_PULLS, DEFAULT_CHUNK_SIZE, simulate_completion, simulate_pulls, _make_rng
+
+DEFAULT_SUB_BUCKET_BITS = 7
+MAX_VALUE_BITS = 48
+
+
+class LogLinearHistogram:
+    """非负整数的对数-线性直方图，桶数固定（与样本数无关）"""
+
+    def __init__(self, sub_bucket_bits=DEFAULT_SUB_BUCKET_BITS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_buckets = 1 << sub_bucket_bits
+        # 桶号 [0, 2 * sub_buckets) 精确对应值本身，之后每 sub_buckets 个桶覆盖一个 2 的幂区间
+        self.counts = np.zeros((MAX_VALUE_BITS - sub_bucket_bits + 2) * self.sub_buckets, dtype=np.int64)
+
+    @property
+    def relative_error(self):
+        return 1.0 / self.sub_buckets
+
+    def _index(self, values):
+        values = np.asarray(values, dtype=np.int64)
+        # 值所在的 2 的幂区间（0 段内精确）
+        magnitude = np.zeros(values.shape, dtype=np.int64)
+        big = values >= 2 * self.sub_buckets
+        magnitude[big] = np.floor(np.log2(values[big])).astype(np.int64) - self.sub_bucket_bits
+        # log2 的浮点误差修正
+        too_high = big & ((values >> magnitude) < self.sub_buckets)
+        magnitude[too_high] -= 1
+        too_low = big & ((values >> magnitude) >= 2 * self.sub_buckets)
+        magnitude[too_low] += 1
+        return magnitude * self.sub_buckets + (values >> magnitude)
+
+    def bucket_bounds(self, index):
+        """桶 index 覆盖的闭区间 [low, high]"""
+        index = int(index)
+        if index < 2 * self.sub_buckets:
+            return index, index
+        segment, offset = divmod(index, self.sub_buckets)
+        shift = segment - 1
+        base = offset + self.sub_buckets
+        return base << shift, ((base + 1) << shift) - 1
+
+    def add(self, values):
+        values = np.asarray(values)
+        if values.size:
+            self.counts += np.bincount(self._index(values), minlength=self.counts.size)
+
+    def merge(self, other):
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError('直方图精度不同，无法合并')
+        self.counts += other.counts
+        return self
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def quantile(self, q):
+        """
+        最近秩分位数：返回 (估计值, 下界, 上界)，真实分位数一定落在 [下界, 上界] 内
+        无样本时返回 None
+        """
+        total = self.total
+        if total == 0:
+            return None
+        rank = max(int(np.ceil(q * total)), 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        low, high = self.bucket_bounds(index)
+        return (low + high) / 2, low, high
+
+    def to_dict(self):
+        nonzero = np.flatnonzero(self.counts)
+        return {
+            'subBucketBits': self.sub_bucket_bits,
+            'buckets': {int(i): int(self.counts[i]) for i in nonzero},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['subBucketBits'])
+        for index, count in data['buckets'].items():
+            histogram.counts[int(index)] = count
+        return histogram
+
+
+class CompletionSummary:
+    """集齐抽数的流式摘要"""
+
+    def __init__(self, n_items, sub_bucket_bits=DEFAULT_SUB_BUCKET_BITS):
+        self.histogram = LogLinearHistogram(sub_bucket_bits)
+        self.item_hits = np.zeros(n_items, dtype=np.int64)
+        self.players = 0
+        self.completed = 0
+        self.total_pulls = 0
+        # Python 整数累加，不会溢出
+        self.sum = 0
+        self.sum_squares = 0
+
+    def add(self, result):
+        """累加 simulate_completion 的一个分块结果"""
+        pulls = result['pulls']
+        done = pulls[pulls >= 0]
+        self.histogram.add(done)
+        self.item_hits += result['item_hits']
+        self.players += int(pulls.size)
+        self.completed += int(done.size)
+        self.total_pulls += int(result['total_pulls'])
+        self.sum += int(done.sum())
+        self.sum_squares += int(np.square(done, dtype=np.int64).sum())
+        return self
+
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.item_hits += other.item_hits
+        self.players += other.players
+        self.completed += other.completed
+        self.total_pulls += other.total_pulls
+        self.sum += other.sum
+        self.sum_squares += other.sum_squares
+        return self
+
+    @property
+    def mean(self):
+        return self.sum / self.completed if self.completed else None
+
+    @property
+    def std(self):
+        if not self.completed:
+            return None
+        variance = self.sum_squares / self.completed - (self.sum / self.completed) ** 2
+        return max(variance, 0.0) ** 0.5
+
+    def report(self, quantiles=(0.5, 0.9, 0.99)):
+        """输出可 JSON 化的统计结果（分位数附带误差区间）"""
+        result = {
+            'players': self.players,
+            'completed': self.completed,
+            'totalPulls': self.total_pulls,
+            'mean': self.mean,
+            'std': self.std,
+            'relativeError': self.histogram.relative_error,
+        }
+        for q in quantiles:
+            value = self.histogram.quantile(q)
+            if value is not None:
+                key = f'p{q * 100:g}'
+                result[key] = value[0]
+                result[f'{key}Bounds'] = [value[1], value[2]]
+        return result
+
+
+class PullSummary:
+    """固定抽数场景：各物品获得数的流式摘要"""
+
+    def __init__(self, n_items):
+        self.players = 0
+        self.total_pulls = 0
+        self.item_hits = np.zeros(n_items, dtype=np.int64)
+        self.item_squares = np.zeros(n_items, dtype=np.int64)
+
+    def add(self, counts):
+        """累加 simulate_pulls 返回的 (玩家数, 物品数) 矩阵"""
+        counts = counts.astype(np.int64, copy=False)
+        self.players += int(counts.shape[0])
+        self.total_pulls += int(counts.sum())
+        self.item_hits += counts.sum(axis=0)
+        self.item_squares += np.square(counts).sum(axis=0)
+        return self
+
+    def merge(self, other):
+        self.players += other.players
+        self.total_pulls += other.total_pulls
+        self.item_hits += other.item_hits
+        self.item_squares += other.item_squares
+        return self
+
+    def report(self):
+        if not self.players:
+            return {'players': 0, 'totalPulls': 0, 'mean': [], 'std': []}
+        mean = self.item_hits / self.players
+        std = np.sqrt(np.maximum(self.item_squares / self.players - mean ** 2, 0.0))
+        return {
+            'players': self.players,
+            'totalPulls': self.total_pulls,
+            'mean': mean.tolist(),
+            'std': std.tolist(),
+        }
+
+
+def stream_completion(pool, n_players, max_pulls=DEFAULT_MAX_PULLS, seed=None,
+                      chunk_size=DEFAULT_CHUNK_SIZE, summary=None):
+    """分块模拟集齐抽数并累加到摘要，内存只与 chunk_size 有关"""
+    rng = _make_rng(seed)
+    summary = summary or CompletionSummary(pool.size)
+    for start in range(0, n_players, chunk_size):
+        count = min(chunk_size, n_players - start)
+        summary.add(simulate_completion(pool, count, max_pulls, seed=rng, chunk_size=chunk_size))
+    return summary
+
+
+def stream_pulls(pool, n_players, n_pulls, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, summary=None):
+    """分块模拟固定抽数并累加到摘要"""
+    rng = _make_rng(seed)
+    summary = summary or PullSummary(pool.size)
+    for start in range(0, n_players, chunk_size):
+        count = min(chunk_size, n_players - start)
+        summary.add(simulate_pulls(pool, count, n_pulls, seed=rng))
+    return summary
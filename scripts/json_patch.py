@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+RFC 6902 JSON Patch：生成两个 JSON 文档之间的补丁，以及应用补丁（发布前校验用）
+make_patch 只生成 add / remove / replace；apply_patch 支持全部六种操作（与 src/utils/jsonPatch.js 一致）
+
+  - 对象按键递归比较
+  - 数组先去掉相同的前缀和后缀，中间部分逐项递归比较，多出的元素 remove（从后往前）/ add
+"""
+
+import copy
+
+
+def _escape(token):
+    """JSON Pointer 转义（RFC 6901）"""
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def _same(a, b):
+    # True == 1（以及 [True] == [1]）在 Python 中成立，但在 JSON 里是不同的值
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _diff(old, new, path, ops):
+    if _same(old, new):
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f'{path}/{_escape(key)}'})
+        for key, value in new.items():
+            child = f'{path}/{_escape(key)}'
+            if key in old:
+                _diff(old[key], value, child, ops)
+            else:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+        return
+    if isinstance(old, list) and isinstance(new, list):
+        start = 0
+        while start < len(old) and start < len(new) and _same(old[start], new[start]):
+            start += 1
+        end_old, end_new = len(old), len(new)
+        while end_old > start and end_new > start and _same(old[end_old - 1], new[end_new - 1]):
+            end_old -= 1
+            end_new -= 1
+        common = min(end_old, end_new) - start
+        for i in range(start, start + common):
+            _diff(old[i], new[i], f'{path}/{i}', ops)
+        for i in range(end_old - 1, start + common - 1, -1):
+            ops.append({'op': 'remove', 'path': f'{path}/{i}'})
+        for i in range(start + common, end_new):
+            ops.append({'op': 'add', 'path': f'{path}/{i}', 'value': new[i]})
+        return
+    ops.append({'op': 'replace', 'path': path, 'value': new})
+
+
+def make_patch(old, new):
+    """old -> new 的补丁（操作列表）"""
+    ops = []
+    _diff(old, new, '', ops)
+    return ops
+
+
+def _parent(document, path):
+    """path 的父容器和最后一级键（数组时为下标字符串）"""
+    if not path.startswith('/'):
+        raise ValueError(f'无效的 JSON Pointer: {path!r}')
+    tokens = [_unescape(token) for token in path[1:].split('/')]
+    target = document
+    for token in tokens[:-1]:
+        target = target[int(token)] if isinstance(target, list) else target[token]
+    return target, tokens[-1]
+
+
+def _get(document, path):
+    if path == '':
+        return document
+    parent, key = _parent(document, path)
+    return parent[int(key)] if isinstance(parent, list) else parent[key]
+
+
+def _add(document, path, value):
+    if path == '':
+        return value
+    parent, key = _parent(document, path)
+    if isinstance(parent, list):
+        index = len(parent) if key == '-' else int(key)
+        if not 0 <= index <= len(parent):
+            raise ValueError(f'数组下标越界: {path}')
+        parent.insert(index, value)
+    else:
+        parent[key] = value
+    return document
+
+
+def _remove(document, path):
+    parent, key = _parent(document, path)
+    if isinstance(parent, list):
+        return parent.pop(int(key))
+    return parent.pop(key)
+
+
+def apply_patch(document, patch):
+    """应用补丁，返回新文档（不修改传入的 document）；操作无效时抛出 ValueError / KeyError / IndexError"""
+    document = copy.deepcopy(document)
+    for op in patch:
+        name, path = op['op'], op['path']
+        if name == 'add':
+            document = _add(document, path, copy.deepcopy(op['value']))
+        elif name == 'remove':
+            _remove(document, path)
+        elif name == 'replace':
+            if path == '':
+                document = copy.deepcopy(op['value'])
+            else:
+                parent, key = _parent(document, path)
+                if isinstance(parent, list):
+                    parent[int(key)] = copy.deepcopy(op['value'])
+                elif key in parent:
+                    parent[key] = copy.deepcopy(op['value'])
+                else:
+                    raise KeyError(path)
+        elif name == 'move':
+            value = _remove(document, op['from'])
+            document = _add(document, path, value)
+        elif name == 'copy':
+            document = _add(document, path, copy.deepcopy(_get(document, op['from'])))
+        elif name == 'test':
+            if not _same(_get(document, path), op['value']):
+                raise ValueError(f'test 失败: {path}')
+        else:
+            raise ValueError(f'未知的操作: {name}')
+    return document
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+抽奖模拟引擎基准测试（含回归对比）
+对真实配置（REAL_CASES 中固定的 chip / cargo / flagship 活动）和合成奖池（10–500 个物品）测量：
+  - pulls_per_sec      向量化逐抽吞吐（gacha_sim.simulate_pulls）
+  - bytes_per_player   集齐模拟时每个玩家的峰值内存（tracemalloc）
+  - exact_seconds      精确求解耗时（gacha_exact.solve_completion，无法求解时为 null）
+结果写成 JSON；compare 模式按阈值标记回归，发现回归时退出码为 1；
+基线中有而本次没有（或本次新增）的用例会单独列出
+
+依赖安装:
+  pip install numpy
+
+使用方法:
+  python scripts/sim-bench.py run --output bench.json
+  python scripts/sim-bench.py run --quick --baseline bench.json
+  python scripts/sim-bench.py compare old.json new.json --threshold 0.15
+"""
+
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import subprocess
+from datetime import datetime
+
+import numpy as np
+
+import gacha_exact
+from gacha_sim import (
+    PROJECT_ROOT, ENGINE_VERSION, GachaPool, load_activity,
+    simulate_completion, simulate_pulls,
+)
+
+SYNTHETIC_SIZES = (10, 50, 100, 500)
+# 合成奖池中有上限的非 common 物品数（保持精确求解可行）
+SYNTHETIC_TARGETS = 6
+DEFAULT_THRESHOLD = 0.10
+
+# 真实配置用例：(配置类型, 活动 ID, 奖池)，固定下来使不同版本的结果可以对比
+REAL_CASES = (
+    ('chip', 'ag100', 'default'),
+    ('cargo', 'be100', 'rm'),
+    ('flagship', 'la100', 'flagship'),
+)
+
+# 指标方向：True 表示越大越好
+METRICS = {
+    'pulls_per_sec': True,
+    'bytes_per_player': False,
+    'exact_seconds': False,
+}
+
+PROFILES = {
+    'full': {'players': 20_000, 'pulls': 200, 'memory_players': 20_000, 'repeat': 3},
+    'quick': {'players': 5_000, 'pulls': 50, 'memory_players': 5_000, 'repeat': 1},
+}
+
+
+def synthetic_items(size, seed=0):
+    """合成奖池：概率按 Zipf 分布，最稀有的若干物品为有上限的目标，其余为 common"""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, size + 1) ** 1.1
+    weights = weights / weights.sum() * 100
+    rng.shuffle(weights[:-SYNTHETIC_TARGETS])
+    items = []
+    for i, probability in enumerate(weights):
+        is_target = i >= size - SYNTHETIC_TARGETS
+        items.append({
+            'id': f'syn{i}',
+            'name': f'合成物品{i}',
+            'rarity': 'epic' if is_target else 'common',
+            'probability': float(probability),
+            'limit': int(rng.integers(1, 4)) if is_target else 0,
+        })
+    return items
+
+
+def real_cases():
+    """REAL_CASES 中的真实配置奖池（无法加载的用例打印警告后跳过）"""
+    cases = []
+    for config_type, activity_id, pool_key in REAL_CASES:
+        name = f'{config_type}:{activity_id}/{pool_key}'
+        try:
+            pool = GachaPool.from_config(load_activity(activity_id), pool_key)
+        except (FileNotFoundError, ValueError, KeyError) as e:
+            print(f"⚠️  跳过用例 {name}: {e}")
+            continue
+        cases.append((name, pool))
+    return cases
+
+
+def synthetic_cases():
+    return [(f'synthetic:{size}', GachaPool(synthetic_items(size), key=f'synthetic{size}'))
+            for size in SYNTHETIC_SIZES]
+
+
+def measure_throughput(pool, players, pulls, repeat):
+    best = float('inf')
+    for i in range(repeat):
+        start = time.perf_counter()
+        simulate_pulls(pool, players, pulls, seed=i)
+        best = min(best, time.perf_counter() - start)
+    return players * pulls / best
+
+
+def measure_memory(pool, players):
+    """集齐模拟的峰值内存 / 玩家数（分块大小 >= 玩家数，即全部玩家同时在内存中）"""
+    tracemalloc.start()
+    try:
+        simulate_completion(pool, players, max_pulls=2_000, seed=0, chunk_size=players)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / players
+
+
+def measure_exact(pool, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        gacha_exact._solution_cache.clear()
+        start = time.perf_counter()
+        try:
+            gacha_exact.solve_completion(pool)
+        except ValueError:
+            return None
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _git_revision():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def run_suite(profile='full', progress=print):
+    settings = PROFILES[profile]
+    results = {}
+    for name, pool in real_cases() + synthetic_cases():
+        results[name] = {
+            'items': pool.size,
+            'pulls_per_sec': measure_throughput(pool, settings['players'], settings['pulls'], settings['repeat']),
+            'bytes_per_player': measure_memory(pool, settings['memory_players']),
+            'exact_seconds': measure_exact(pool, settings['repeat']),
+        }
+        if progress:
+            progress(name, results[name])
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'engine': ENGINE_VERSION,
+            'profile': profile,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+
+def case_changes(baseline, current):
+    """返回 (基线中有而本次缺失的用例, 本次新增的用例)"""
+    old, new = set(baseline['results']), set(current['results'])
+    return sorted(old - new), sorted(new - old)
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    对比两次结果，返回 [(用例, 指标, 基线值, 当前值, 变化比例, 是否回归)]
+    变化比例为正表示变好；变差超过 threshold 记为回归；只在一方存在的用例见 case_changes
+    """
+    rows = []
+    for name, metrics in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old if higher_is_better else (old - new) / old
+            rows.append((name, metric, old, new, change, change < -threshold))
+    return rows
+
+
+def _format_metric(metric, value):
+    if metric == 'pulls_per_sec':
+        return f'{value / 1e6:.2f}M/s'
+    if metric == 'bytes_per_player':
+        return f'{value:.0f} B'
+    return f'{value * 1000:.1f} ms'
+
+
+def _print_result(name, result):
+    exact = result['exact_seconds']
+    print(f"   {name:<28} {result['items']:4d} 物品 | "
+          f"{_format_metric('pulls_per_sec', result['pulls_per_sec']):>10} | "
+          f"{_format_metric('bytes_per_player', result['bytes_per_player']):>8}/玩家 | "
+          f"精确 {_format_metric('exact_seconds', exact) if exact is not None else '-':>9}", flush=True)
+
+
+def _print_comparison(rows, threshold, baseline, current):
+    missing, added = case_changes(baseline, current)
+    for name in missing:
+        print(f" ⚠️  {name:<28} 基线中有，本次缺失（无法对比）")
+    for name in added:
+        print(f" 🆕 {name:<28} 基线中没有（新用例）")
+    regressions = [row for row in rows if row[5]]
+    for name, metric, old, new, change, regressed in rows:
+        mark = '❌' if regressed else ('✅' if change > threshold else '  ')
+        print(f" {mark} {name:<28} {metric:<17} {_format_metric(metric, old):>10} → "
+              f"{_format_metric(metric, new):>10} ({change:+.1%})")
+    print(f"\n{'❌' if regressions else '✅'} {len(regressions)} 项回归（阈值 {threshold:.0%}）")
+    return regressions
+
+
+def _load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='抽奖模拟引擎基准测试')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('run', help='运行基准测试')
+    p.add_argument('--quick', action='store_true', help='快速模式（更少玩家和重复次数）')
+    p.add_argument('--output', help='结果写入 JSON 文件')
+    p.add_argument('--baseline', help='与基线结果对比')
+    p.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='回归阈值（默认 0.10）')
+
+    p = sub.add_parser('compare', help='对比两次结果')
+    p.add_argument('baseline')
+    p.add_argument('current')
+    p.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='回归阈值（默认 0.10）')
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        baseline, current = _load(args.baseline), _load(args.current)
+        rows = compare(baseline, current, args.threshold)
+        sys.exit(1 if _print_comparison(rows, args.threshold, baseline, current) else 0)
+
+    print('⏱️  运行基准测试...')
+    report = run_suite('quick' if args.quick else 'full', progress=_print_result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 已写入 {args.output}")
+    if args.baseline:
+        print()
+        baseline = _load(args.baseline)
+        rows = compare(baseline, report, args.threshold)
+        sys.exit(1 if _print_comparison(rows, args.threshold, baseline, report) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+对象存储后端（upload-to-oss.py / config_store.upload_documents 共用）
+统一的接口：put / put_file / get / head / list / delete / copy 和分片上传，三种实现：
+  - OssBackend     阿里云 OSS（仅在创建时导入 oss2）
+  - LocalBackend   本地目录，对象写成 <目录>/<key>，响应头保存在 <目录>/.storage-meta/
+  - MemoryBackend  进程内字典
+任意后端都可以套一层 LatencyBackend 注入往返延迟 / 带宽限制，离线测试和压测上传流程
+
+后端选择（环境变量或 .env，由 open_backend 解析）:
+  STORAGE_BACKEND=oss                 默认，使用 OSS_* 配置
+  STORAGE_BACKEND=local:/tmp/oss      本地目录
+  STORAGE_BACKEND=memory              内存（进程退出即丢弃）
+  STORAGE_LATENCY_MS=80               每次请求额外延迟（毫秒，可选）
+  STORAGE_BANDWIDTH_KBPS=2048         传输带宽（KB/s，可选）
+"""
+
+import json
+import time
+import random
+import hashlib
+import threading
+from pathlib import Path
+
+from config_store import write_bytes_atomic
+
+# 大于该大小的文件用分片上传（put_file / put_content）
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+PART_SIZE = 8 * 1024 * 1024
+
+# list 每页数量（与 OSS ListObjects 的默认 max-keys 一致，LatencyBackend 按页计延迟）
+LIST_PAGE_SIZE = 100
+
+META_DIR = '.storage-meta'
+
+
+def _read_data(data):
+    """put 的 data 可以是 bytes / memoryview 或已打开的二进制文件"""
+    return data if isinstance(data, (bytes, bytearray, memoryview)) else data.read()
+
+
+def _etag(content):
+    return hashlib.md5(content).hexdigest().upper()
+
+
+def _multipart_etag(part_etags):
+    """与 OSS 一致：各分片 MD5 拼接后再取 MD5，后缀分片数"""
+    joined = b''.join(bytes.fromhex(etag) for etag in part_etags)
+    return f'{_etag(joined)}-{len(part_etags)}'
+
+
+class StorageBackend:
+    """
+    后端基类：子类实现 put / get / head / list / delete / copy 和分片上传（init / upload_part / complete / abort）
+    对象信息统一为 {'key', 'size', 'etag', 'headers'}（list 不含 headers）
+    """
+
+    name = 'storage'
+
+    def put(self, key, data, headers=None):
+        """上传对象，返回 etag"""
+        raise NotImplementedError
+
+    def get(self, key):
+        """对象内容（bytes），不存在时返回 None"""
+        raise NotImplementedError
+
+    def head(self, key):
+        """对象信息，不存在时返回 None"""
+        raise NotImplementedError
+
+    def list(self, prefix=''):
+        """按 key 顺序迭代 prefix 下的对象信息"""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """删除对象（不存在时忽略）"""
+        raise NotImplementedError
+
+    def copy(self, source_key, key, headers=None):
+        """服务端复制对象，headers 为 None 时沿用源对象的响应头，返回 etag"""
+        raise NotImplementedError
+
+    def init_multipart(self, key, headers=None):
+        """开始分片上传，返回 upload_id"""
+        raise NotImplementedError
+
+    def upload_part(self, key, upload_id, part_number, data):
+        """上传一个分片（part_number 从 1 开始），返回分片 etag"""
+        raise NotImplementedError
+
+    def complete_multipart(self, key, upload_id, parts):
+        """按 [(part_number, etag)] 合并分片，返回 etag"""
+        raise NotImplementedError
+
+    def abort_multipart(self, key, upload_id):
+        raise NotImplementedError
+
+    def put_file(self, key, path, headers=None, part_size=PART_SIZE):
+        """上传本地文件：小文件一次 put，超过 MULTIPART_THRESHOLD 时分片上传"""
+        path = Path(path)
+        if path.stat().st_size <= MULTIPART_THRESHOLD:
+            with open(path, 'rb') as f:
+                return self.put(key, f, headers)
+        with open(path, 'rb') as f:
+            return self._put_parts(key, iter(lambda: f.read(part_size), b''), headers)
+
+    def put_content(self, key, content, headers=None, part_size=PART_SIZE):
+        """上传内存中的字节（多个目标共用同一份内容），超过 MULTIPART_THRESHOLD 时分片上传"""
+        if len(content) <= MULTIPART_THRESHOLD:
+            return self.put(key, content, headers)
+        view = memoryview(content)
+        return self._put_parts(key, (view[i:i + part_size] for i in range(0, len(view), part_size)), headers)
+
+    def _put_parts(self, key, chunks, headers):
+        upload_id = self.init_multipart(key, headers)
+        try:
+            parts = []
+            for chunk in chunks:
+                part_number = len(parts) + 1
+                parts.append((part_number, self.upload_part(key, upload_id, part_number, chunk)))
+            return self.complete_multipart(key, upload_id, parts)
+        except BaseException:
+            self.abort_multipart(key, upload_id)
+            raise
+
+    def check(self):
+        """验证连接（本地 / 内存后端无需验证）"""
+
+    def describe(self):
+        return self.name
+
+
+class MemoryBackend(StorageBackend):
+    """进程内对象存储：{key: (内容, 响应头, etag)}，线程安全"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self.objects = {}
+        self._uploads = {}
+        self._lock = threading.Lock()
+
+    def put(self, key, data, headers=None):
+        content = bytes(_read_data(data))
+        etag = _etag(content)
+        with self._lock:
+            self.objects[key] = (content, dict(headers or {}), etag)
+        return etag
+
+    def get(self, key):
+        entry = self.objects.get(key)
+        return entry[0] if entry else None
+
+    def head(self, key):
+        entry = self.objects.get(key)
+        if entry is None:
+            return None
+        content, headers, etag = entry
+        return {'key': key, 'size': len(content), 'etag': etag, 'headers': dict(headers)}
+
+    def list(self, prefix=''):
+        with self._lock:
+            keys = sorted(key for key in self.objects if key.startswith(prefix))
+        for key in keys:
+            entry = self.objects.get(key)
+            if entry:
+                yield {'key': key, 'size': len(entry[0]), 'etag': entry[2]}
+
+    def delete(self, key):
+        with self._lock:
+            self.objects.pop(key, None)
+
+    def copy(self, source_key, key, headers=None):
+        with self._lock:
+            content, source_headers, etag = self.objects[source_key]
+            self.objects[key] = (content, dict(source_headers if headers is None else headers), etag)
+        return etag
+
+    def init_multipart(self, key, headers=None):
+        upload_id = hashlib.md5(f'{key}:{time.time_ns()}:{random.random()}'.encode()).hexdigest()
+        with self._lock:
+            self._uploads[upload_id] = (key, dict(headers or {}), {})
+        return upload_id
+
+    def upload_part(self, key, upload_id, part_number, data):
+        content = bytes(_read_data(data))
+        with self._lock:
+            self._uploads[upload_id][2][part_number] = content
+        return _etag(content)
+
+    def complete_multipart(self, key, upload_id, parts):
+        with self._lock:
+            _, headers, uploaded = self._uploads.pop(upload_id)
+        chunks = [uploaded[part_number] for part_number, _ in sorted(parts)]
+        etag = _multipart_etag([etag for _, etag in sorted(parts)])
+        with self._lock:
+            self.objects[key] = (b''.join(chunks), headers, etag)
+        return etag
+
+    def abort_multipart(self, key, upload_id):
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+
+
+class LocalBackend(StorageBackend):
+    """
+    本地目录：对象写成 <root>/<key>（原子替换），响应头和 etag 保存在 <root>/.storage-meta/<key>.json
+    可以直接当作静态服务器目录预览上传结果
+    """
+
+    name = 'local'
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def describe(self):
+        return f'local:{self.root}'
+
+    def _path(self, key):
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f'非法的对象 key: {key}')
+        return path
+
+    def _meta_path(self, key):
+        return self.root / META_DIR / f'{key}.json'
+
+    def _write(self, key, content, headers, etag):
+        write_bytes_atomic(self._path(key), content)
+        meta = json.dumps({'headers': dict(headers or {}), 'etag': etag}, ensure_ascii=False)
+        write_bytes_atomic(self._meta_path(key), meta.encode('utf-8'))
+        return etag
+
+    def _meta(self, key):
+        try:
+            return json.loads(self._meta_path(key).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def put(self, key, data, headers=None):
+        content = bytes(_read_data(data))
+        return self._write(key, content, headers, _etag(content))
+
+    def get(self, key):
+        path = self._path(key)
+        return path.read_bytes() if path.is_file() else None
+
+    def head(self, key):
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        meta = self._meta(key)
+        etag = meta.get('etag') or _etag(path.read_bytes())
+        return {'key': key, 'size': path.stat().st_size, 'etag': etag, 'headers': meta.get('headers', {})}
+
+    def list(self, prefix=''):
+        meta_root = self.root / META_DIR
+        keys = sorted(
+            path.relative_to(self.root).as_posix()
+            for path in self.root.rglob('*')
+            if path.is_file() and meta_root not in path.parents and not path.name.endswith('.tmp')
+        )
+        for key in keys:
+            if key.startswith(prefix):
+                info = self.head(key)
+                if info:
+                    yield {'key': key, 'size': info['size'], 'etag': info['etag']}
+
+    def delete(self, key):
+        for path in (self._path(key), self._meta_path(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def copy(self, source_key, key, headers=None):
+        info = self.head(source_key)
+        if info is None:
+            raise FileNotFoundError(source_key)
+        content = self._path(source_key).read_bytes()
+        return self._write(key, content, info['headers'] if headers is None else headers, info['etag'])
+
+    def _parts_dir(self, upload_id):
+        return self.root / META_DIR / '.multipart' / upload_id
+
+    def init_multipart(self, key, headers=None):
+        upload_id = hashlib.md5(f'{key}:{time.time_ns()}:{random.random()}'.encode()).hexdigest()
+        parts_dir = self._parts_dir(upload_id)
+        parts_dir.mkdir(parents=True)
+        (parts_dir / 'headers.json').write_text(json.dumps(dict(headers or {})), encoding='utf-8')
+        return upload_id
+
+    def upload_part(self, key, upload_id, part_number, data):
+        content = bytes(_read_data(data))
+        (self._parts_dir(upload_id) / f'{part_number:05d}').write_bytes(content)
+        return _etag(content)
+
+    def complete_multipart(self, key, upload_id, parts):
+        parts_dir = self._parts_dir(upload_id)
+        headers = json.loads((parts_dir / 'headers.json').read_text(encoding='utf-8'))
+        content = b''.join((parts_dir / f'{part_number:05d}').read_bytes() for part_number, _ in sorted(parts))
+        etag = self._write(key, content, headers, _multipart_etag([etag for _, etag in sorted(parts)]))
+        self.abort_multipart(key, upload_id)
+        return etag
+
+    def abort_multipart(self, key, upload_id):
+        parts_dir = self._parts_dir(upload_id)
+        if parts_dir.is_dir():
+            for path in parts_dir.iterdir():
+                path.unlink()
+            parts_dir.rmdir()
+
+
+class OssBackend(StorageBackend):
+    """阿里云 OSS（oss2.Bucket 的薄封装）"""
+
+    name = 'oss'
+
+    def __init__(self, access_key_id, access_key_secret, endpoint, bucket_name):
+        import oss2
+        self._oss2 = oss2
+        self.bucket_name = bucket_name
+        self.bucket = oss2.Bucket(oss2.Auth(access_key_id, access_key_secret), endpoint, bucket_name)
+
+    def describe(self):
+        return f'oss:{self.bucket_name}'
+
+    def check(self):
+        """验证连接和权限（失败时抛出 oss2 的异常）"""
+        self.bucket.get_bucket_info()
+
+    def put(self, key, data, headers=None):
+        return self.bucket.put_object(key, data, headers=headers).etag
+
+    def get(self, key):
+        try:
+            return self.bucket.get_object(key).read()
+        except self._oss2.exceptions.NotFound:
+            return None
+
+    def head(self, key):
+        try:
+            result = self.bucket.head_object(key)
+        except self._oss2.exceptions.NotFound:
+            return None
+        return {'key': key, 'size': result.content_length, 'etag': result.etag, 'headers': dict(result.headers)}
+
+    def list(self, prefix=''):
+        for obj in self._oss2.ObjectIterator(self.bucket, prefix=prefix, max_keys=LIST_PAGE_SIZE):
+            yield {'key': obj.key, 'size': obj.size, 'etag': obj.etag}
+
+    def delete(self, key):
+        self.bucket.delete_object(key)
+
+    def copy(self, source_key, key, headers=None):
+        if headers is not None:
+            headers = {**headers, 'x-oss-metadata-directive': 'REPLACE'}
+        return self.bucket.copy_object(self.bucket_name, source_key, key, headers=headers).etag
+
+    def init_multipart(self, key, headers=None):
+        return self.bucket.init_multipart_upload(key, headers=headers).upload_id
+
+    def upload_part(self, key, upload_id, part_number, data):
+        return self.bucket.upload_part(key, upload_id, part_number, bytes(_read_data(data))).etag
+
+    def complete_multipart(self, key, upload_id, parts):
+        part_infos = [self._oss2.models.PartInfo(part_number, etag) for part_number, etag in sorted(parts)]
+        return self.bucket.complete_multipart_upload(key, upload_id, part_infos).etag
+
+    def abort_multipart(self, key, upload_id):
+        self.bucket.abort_multipart_upload(key, upload_id)
+
+
+class LatencyBackend(StorageBackend):
+    """
+    给任意后端注入网络开销：每次请求 latency ± jitter 秒，有 bandwidth（字节/秒）时再加传输时间
+    list 按 LIST_PAGE_SIZE 分页计请求数；calls 记录各操作的请求次数，便于压测对比
+    """
+
+    def __init__(self, backend, latency=0.05, jitter=0.0, bandwidth=None):
+        self.backend = backend
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def check(self):
+        self.backend.check()
+
+    def describe(self):
+        extra = f'，{self.bandwidth / 1024:.0f} KB/s' if self.bandwidth else ''
+        return f'{self.backend.describe()}（延迟 {self.latency * 1000:.0f} ms{extra}）'
+
+    def _wait(self, operation, size=0):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        delay = self.latency + (random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if self.bandwidth and size:
+            delay += size / self.bandwidth
+        if delay > 0:
+            time.sleep(delay)
+
+    def put(self, key, data, headers=None):
+        content = _read_data(data)
+        self._wait('put', len(content))
+        return self.backend.put(key, content, headers)
+
+    def get(self, key):
+        content = self.backend.get(key)
+        self._wait('get', len(content or b''))
+        return content
+
+    def head(self, key):
+        self._wait('head')
+        return self.backend.head(key)
+
+    def list(self, prefix=''):
+        self._wait('list')
+        for i, info in enumerate(self.backend.list(prefix), 1):
+            yield info
+            if i % LIST_PAGE_SIZE == 0:
+                self._wait('list')
+
+    def delete(self, key):
+        self._wait('delete')
+        return self.backend.delete(key)
+
+    def copy(self, source_key, key, headers=None):
+        self._wait('copy')
+        return self.backend.copy(source_key, key, headers)
+
+    def init_multipart(self, key, headers=None):
+        self._wait('init_multipart')
+        return self.backend.init_multipart(key, headers)
+
+    def upload_part(self, key, upload_id, part_number, data):
+        content = _read_data(data)
+        self._wait('upload_part', len(content))
+        return self.backend.upload_part(key, upload_id, part_number, content)
+
+    def complete_multipart(self, key, upload_id, parts):
+        self._wait('complete_multipart')
+        return self.backend.complete_multipart(key, upload_id, parts)
+
+    def abort_multipart(self, key, upload_id):
+        self._wait('abort_multipart')
+        return self.backend.abort_multipart(key, upload_id)
+
+
+def open_backend(spec='oss', access_key_id=None, access_key_secret=None, endpoint=None, bucket_name=None,
+                 latency_ms=0, bandwidth_kbps=0):
+    """
+    按描述创建后端：'oss' / 'local:<目录>' / 'memory'
+    latency_ms / bandwidth_kbps 非 0 时套上 LatencyBackend
+    OSS 配置不完整时抛出 ValueError
+    """
+    spec = (spec or 'oss').strip()
+    if spec == 'oss':
+        if not all([access_key_id, access_key_secret, bucket_name]):
+            raise ValueError('OSS 配置不完整，请检查 .env 文件中的配置')
+        backend = OssBackend(access_key_id, access_key_secret, endpoint, bucket_name)
+    elif spec == 'memory':
+        backend = MemoryBackend()
+    elif spec.startswith('local:'):
+        backend = LocalBackend(Path(spec[len('local:'):]).expanduser())
+    else:
+        raise ValueError(f'未知的存储后端: {spec}（可选 oss / local:<目录> / memory）')
+
+    latency_ms, bandwidth_kbps = float(latency_ms or 0), float(bandwidth_kbps or 0)
+    if latency_ms or bandwidth_kbps:
+        backend = LatencyBackend(backend, latency_ms / 1000, bandwidth=bandwidth_kbps * 1024 or None)
+    return backend
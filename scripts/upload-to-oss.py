@@ -3,27 +3,76 @@
 阿里云 OSS 资源管理脚本
 统一管理配置文件和静态资源的上传
 
+上传配置文件前会重新生成内容有变化的活动统计（<活动ID>.stats.json，见 gacha_stats.py），
+由各活动的 metadata 重新生成 index.json 及其分片（见 config_index.py），并校验所有活动配置（见 gacha_catalog.py）
+
+配置文件按版本发布（见 config_release.py）：整套配置写入不可变的 gacha-configs/releases/<发布ID>/
+（长期缓存，可走 CDN），全部成功后才切换 gacha-configs/current.json 指针，客户端始终读到一致的配置集；
+内容变化的配置同时生成相对最近几个旧版本的 JSON Patch，已缓存旧版本的客户端只下载补丁；
+过渡期内切换指针前还会把内容变化的文件复制到原来的 gacha-configs/<相对路径>，供不读指针的旧版客户端使用
+
+watch 模式监听 public/ 下的文件变化，防抖后只上传改动过的文件：
+  - 远端文件列表只在启动时列举一次，之后在内存中随上传更新
+  - 配置文件变化时重新生成该活动的统计文件和活动索引，并发布新的配置版本
+
+多个目标（多个地域的 Bucket / Endpoint / 前缀）时，在 OSS_TARGETS 指定一个 JSON 文件：
+  [{"name": "hangzhou", "bucket": "...", "endpoint": "oss-cn-hangzhou.aliyuncs.com", "prefix": "mw-gacha-simulation"},
+   {"name": "hongkong", "bucket": "...", "endpoint": "oss-cn-hongkong.aliyuncs.com"}]
+  未写的字段沿用 .env 中的 OSS_* 配置（可以单独写 access_key_id / access_key_secret / backend）
+  每个本地文件只读取和计算哈希一次，同一份字节并发上传到所有需要它的目标，
+  总耗时接近最慢的目标；增量上传按目标分别列举和对比，最后汇总各目标的结果
+
+上传静态资源时顺带生成 Service Worker 预缓存清单 precache-manifest.json（URL、内容哈希、大小），
+范围为 PRECACHE_PATTERNS 中的资源（UI 音效、核心图片）；sw.js 按清单预加载，只重新下载哈希变化的文件
+
+存储后端由 STORAGE_BACKEND 选择（oss / local:<目录> / memory，见 storage_backend.py），
+可用 STORAGE_LATENCY_MS / STORAGE_BANDWIDTH_KBPS 注入网络开销，离线测试和压测上传流程
+
 依赖安装:
   pip install oss2 python-dotenv
+  pip install numpy      # 可选，生成活动统计和校验配置
+  pip install watchdog   # 可选，watch 模式使用文件系统事件（未安装时轮询）
 
 使用方法:
   python scripts/upload-to-oss.py
+  python scripts/upload-to-oss.py incremental
+  python scripts/upload-to-oss.py configs
+  python scripts/upload-to-oss.py watch
 """
 
 import os
 import sys
 import json
+import time
+import queue
 import hashlib
+import threading
 import mimetypes
+from fnmatch import fnmatch
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 
 # 清除代理环境变量，防止本地代理干扰 OSS 连接
 for _k in ('HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy'):
     os.environ.pop(_k, None)
 
-import oss2
 from dotenv import load_dotenv
 
+from config_index import refresh_indexes
+from config_store import (
+    JSON_UPLOAD_HEADERS,
+    PROJECT_ROOT,
+    content_digest,
+    dump_json_bytes,
+    file_digest,
+    is_stats_file,
+    load_document,
+    write_bytes_atomic,
+)
+from storage_backend import open_backend
+from config_release import RELEASE_HEADERS, finish_release, plan_release, remember_version
+
 # 加载 .env 文件
 load_dotenv()
 
@@ -33,9 +82,11 @@ ACCESS_KEY_SECRET = os.getenv('OSS_ACCESS_KEY_SECRET')
 ENDPOINT = os.getenv('OSS_ENDPOINT', 'oss-cn-hangzhou.aliyuncs.com')
 BUCKET_NAME = os.getenv('OSS_BUCKET_NAME')
 PATH_PREFIX = os.getenv('OSS_PATH_PREFIX', '')  # 例如: mw-gacha-simulation
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'oss')  # oss / local:<目录> / memory
+OSS_TARGETS = os.getenv('OSS_TARGETS', '')  # 多目标配置文件（JSON 列表），为空时只有 .env 中的一个目标
 
-# 验证配置
-if not all([ACCESS_KEY_ID, ACCESS_KEY_SECRET, BUCKET_NAME]):
+# 验证配置（本地 / 内存后端不需要 OSS 配置；多目标时由各目标自行验证）
+if STORAGE_BACKEND == 'oss' and not OSS_TARGETS and not all([ACCESS_KEY_ID, ACCESS_KEY_SECRET, BUCKET_NAME]):
     print("❌ 错误：缺少 OSS 配置")
     print("请在 .env 文件中配置以下变量：")
     print("  OSS_ACCESS_KEY_ID=你的AccessKey")
@@ -49,14 +100,6 @@ if not all([ACCESS_KEY_ID, ACCESS_KEY_SECRET, BUCKET_NAME]):
 LOCAL_CONFIG_DIR = Path(__file__).parent.parent / 'public' / 'gacha-configs'
 LOCAL_PUBLIC_DIR = Path(__file__).parent.parent / 'public'
 
-# OSS 上传目标路径前缀
-# 如果设置了 PATH_PREFIX，则上传到: PATH_PREFIX/gacha-configs/
-# 否则上传到: gacha-configs/
-if PATH_PREFIX:
-    OSS_PREFIX = f'{PATH_PREFIX.rstrip("/")}/gacha-configs/'
-else:
-    OSS_PREFIX = 'gacha-configs/'
-
 # 不需要列举，直接扫描整个 gacha-configs 目录
 
 # 排除的文件/目录（不上传到 OSS）
@@ -71,6 +114,26 @@ EXCLUDE_PATTERNS = [
     'gacha-configs',  # 配置文件单独管理
 ]
 
+# Service Worker 预缓存清单（相对 public）：匹配的资源按层级逐段比较，* 不跨目录
+PRECACHE_MANIFEST = 'precache-manifest.json'
+PRECACHE_PATTERNS = (
+    'audio/*_UI.wav',   # UI 音效
+    'MW.png',           # 侧边栏 / 顶栏 Logo；其他图片按页面实际引用再列出，不用通配符
+)
+# 超过此大小的文件不预缓存（避免首次安装时下载大文件）
+PRECACHE_MAX_SIZE = 2 * 1024 * 1024
+
+# watch 模式：最后一次变化后静默多久开始上传 / 一批最多等待多久 / 轮询间隔（秒）
+WATCH_DEBOUNCE = 1.0
+WATCH_MAX_DELAY = 10.0
+WATCH_POLL_INTERVAL = 1.0
+# 会改变文件内容的 watchdog 事件类型
+WATCH_EVENT_TYPES = ('created', 'modified', 'moved', 'deleted')
+
+# 每个目标的并发上传数 / 同时在内存中等待上传的文件数上限
+TARGET_WORKERS = 4
+FANOUT_WINDOW = 32
+
 # 缓存配置（根据文件类型）
 CACHE_RULES = {
     '.json': 'public, max-age=0, must-revalidate',
@@ -111,49 +174,165 @@ def get_content_type(file_path):
     return content_type or 'application/octet-stream'
 
 
-def upload_config_file(bucket, local_path, oss_path):
-    """上传配置文件（JSON）"""
-    try:
-        with open(local_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        json.loads(content)  # 验证 JSON
-
-        bucket.put_object(
-            oss_path,
-            content.encode('utf-8'),
-            headers={
-                'Content-Type': 'application/json; charset=utf-8',
-                'Cache-Control': 'public, max-age=0, must-revalidate',
-            }
+class Target:
+    """
+    一个上传目标：存储后端 + 路径前缀
+    设置了前缀时静态资源上传到 <前缀>/，配置文件上传到 <前缀>/gacha-configs/
+    """
+
+    def __init__(self, name, backend, path_prefix=''):
+        self.name = name
+        self.backend = backend
+        self.static_prefix = f'{path_prefix.rstrip("/")}/' if path_prefix else ''
+        self.config_prefix = self.static_prefix + 'gacha-configs/'
+
+    def key(self, kind, rel_path):
+        """本地相对路径 -> 对象 key（kind 为 'static' 时相对 public，其余相对 gacha-configs）"""
+        return (self.static_prefix if kind == 'static' else self.config_prefix) + rel_path
+
+    def describe(self):
+        return f"{self.name} ({self.backend.describe()}, 前缀: {self.static_prefix or '(根目录)'})"
+
+
+def load_targets():
+    """
+    上传目标列表：OSS_TARGETS 指向的 JSON 列表，未设置时为 .env 中的单个目标
+    目标名重复或 OSS 配置不完整时抛出 ValueError
+    """
+    if OSS_TARGETS:
+        path = Path(OSS_TARGETS)
+        if not path.is_absolute() and not path.exists():
+            path = PROJECT_ROOT / path
+        specs = json.loads(path.read_text(encoding='utf-8'))
+    else:
+        specs = [{}]
+
+    targets = []
+    for spec in specs:
+        backend = open_backend(
+            spec.get('backend', STORAGE_BACKEND),
+            spec.get('access_key_id', ACCESS_KEY_ID),
+            spec.get('access_key_secret', ACCESS_KEY_SECRET),
+            spec.get('endpoint', ENDPOINT),
+            spec.get('bucket', BUCKET_NAME),
+            latency_ms=spec.get('latency_ms', os.getenv('STORAGE_LATENCY_MS', 0)),
+            bandwidth_kbps=spec.get('bandwidth_kbps', os.getenv('STORAGE_BANDWIDTH_KBPS', 0)),
         )
-        print(f"✅ {local_path.name} → {oss_path}")
-        return True
-    except json.JSONDecodeError as e:
-        print(f"❌ {local_path.name}: JSON 格式错误 - {e}")
-        return False
-    except Exception as e:
-        print(f"❌ {local_path.name}: 上传失败 - {e}")
-        return False
-
-
-def upload_static_file(bucket, local_path, oss_path):
-    """上传静态资源文件"""
-    try:
-        file_ext = local_path.suffix
+        targets.append(Target(spec.get('name') or backend.describe(), backend, spec.get('prefix', PATH_PREFIX)))
+
+    names = [target.name for target in targets]
+    if len(set(names)) != len(names):
+        raise ValueError(f'目标名重复: {", ".join(names)}')
+    return targets
+
+
+def for_each_target(targets, func):
+    """对每个目标并发执行 func(target)，返回 {目标名: 结果}（异常原样抛出）"""
+    with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+        futures = {target.name: pool.submit(func, target) for target in targets}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def read_payload(kind, local_path):
+    """
+    读取一个待上传文件：返回 (内容, 内容哈希, 响应头)
+    kind 为 'config'（原路径）或 'release'（不可变的发布目录）时先校验 JSON 格式，格式错误时抛出 ValueError
+    """
+    if kind in ('config', 'release'):
+        document = load_document(local_path)
+        document.data  # 验证 JSON（解析结果与前面的校验 / 统计共用缓存）
+        content = document.content
+        headers = RELEASE_HEADERS if kind == 'release' else JSON_UPLOAD_HEADERS
+    else:
+        content = local_path.read_bytes()
         headers = {
             'Content-Type': get_content_type(local_path),
-            'Cache-Control': get_cache_control(file_ext),
+            'Cache-Control': get_cache_control(local_path.suffix),
         }
-
-        with open(local_path, 'rb') as f:
-            bucket.put_object(oss_path, f, headers=headers)
-
-        size_kb = local_path.stat().st_size / 1024
-        print(f"✅ {local_path.name} ({size_kb:.1f} KB)")
-        return True
-    except Exception as e:
-        print(f"❌ {local_path.name}: {e}")
-        return False
+    return content, content_digest(content), headers
+
+
+def publish(targets, plans, skip=None):
+    """
+    按目标分别的上传计划并发上传
+    plans: {目标名: [(类型, 相对路径, 本地文件)]}，类型为 'config'（相对 gacha-configs）或 'static'（相对 public）
+    skip(目标, 对象 key, 内容哈希) 返回 True 时跳过该目标的这个文件
+
+    每个本地文件只读取一次，同一份字节提交给所有需要它的目标；
+    每个目标有自己的上传线程池，互不等待，总耗时接近最慢的目标
+    返回 {目标名: {'uploaded': [(类型, 相对路径, 大小, 哈希)], 'failed': [(相对路径, 原因)], 'skipped': 数量, 'seconds': 耗时}}
+    """
+    by_name = {target.name: target for target in targets}
+    jobs = {}
+    for name, plan in plans.items():
+        for kind, rel_path, local_path in plan:
+            jobs.setdefault((kind, rel_path), (local_path, []))[1].append(by_name[name])
+
+    report = {name: {'uploaded': [], 'failed': [], 'skipped': 0, 'seconds': 0.0} for name in plans}
+    lock = threading.Lock()
+    start = time.perf_counter()
+    multi = len(targets) > 1
+
+    def put(target, kind, rel_path, payload):
+        content, digest, headers = payload
+        result = report[target.name]
+        label = f"[{target.name}] " if multi else ""
+        try:
+            target.backend.put_content(target.key(kind, rel_path), content, headers=headers)
+        except Exception as e:
+            with lock:
+                print(f"❌ {label}{rel_path}: {e}")
+                result['failed'].append((rel_path, str(e)))
+        else:
+            with lock:
+                print(f"✅ {label}{rel_path} ({len(content) / 1024:.1f} KB)")
+                result['uploaded'].append((kind, rel_path, len(content), digest))
+        with lock:
+            result['seconds'] = time.perf_counter() - start
+
+    executors = {target.name: ThreadPoolExecutor(max_workers=TARGET_WORKERS) for target in targets}
+    in_flight = deque()
+    try:
+        for (kind, rel_path), (local_path, job_targets) in jobs.items():
+            try:
+                payload = read_payload(kind, local_path)
+            except (OSError, ValueError) as e:
+                print(f"❌ {rel_path}: {e}")
+                for target in job_targets:
+                    report[target.name]['failed'].append((rel_path, str(e)))
+                continue
+
+            futures = []
+            for target in job_targets:
+                if skip and skip(target, target.key(kind, rel_path), payload[1]):
+                    report[target.name]['skipped'] += 1
+                    continue
+                futures.append(executors[target.name].submit(put, target, kind, rel_path, payload))
+            # 限制同时驻留内存的文件数
+            in_flight.append(futures)
+            while len(in_flight) > FANOUT_WINDOW:
+                wait(in_flight.popleft())
+    finally:
+        for executor in executors.values():
+            executor.shutdown(wait=True)
+    return report
+
+
+def print_publish_summary(report, elapsed):
+    """打印各目标的结果和总耗时"""
+    print()
+    for name, result in report.items():
+        print(f"📦 {name}: ✅ {len(result['uploaded'])} 个 | ❌ 失败 {len(result['failed'])} 个"
+              + (f" | 跳过 {result['skipped']} 个" if result['skipped'] else "")
+              + f" | {result['seconds']:.1f}s")
+        for rel_path, reason in result['failed'][:10]:
+            print(f"   ❌ {rel_path}: {reason}")
+        if len(result['failed']) > 10:
+            print(f"   ... 还有 {len(result['failed']) - 10} 个")
+    if len(report) > 1:
+        uploaded = sum(len(result['uploaded']) for result in report.values())
+        failed = sum(len(result['failed']) for result in report.values())
+        print(f"\n✅ 完成: {len(report)} 个目标共上传 {uploaded} 个 | ❌ 失败: {failed} 个 | 总耗时 {elapsed:.1f}s")
 
 
 def scan_local_files(base_dir):
@@ -169,31 +348,217 @@ def scan_local_files(base_dir):
     return files
 
 
-def scan_oss_files(bucket, prefix):
+def is_precached(rel_path):
+    """相对 public 的路径是否属于预缓存资源"""
+    parts = rel_path.split('/')
+    for pattern in PRECACHE_PATTERNS:
+        pattern_parts = pattern.split('/')
+        if len(parts) == len(pattern_parts) and all(fnmatch(a, b) for a, b in zip(parts, pattern_parts)):
+            return True
+    return False
+
+
+def build_precache_manifest(local_files):
+    """
+    由本地文件扫描结果生成预缓存清单：
+    {'version': 清单哈希, 'entries': [{'url': 相对 public 的路径, 'hash': 内容哈希前 16 位, 'size': 字节数}]}
+    """
+    entries = [
+        {'url': rel_path, 'hash': file_digest(info['path'])[:16], 'size': info['size']}
+        for rel_path, info in sorted(local_files.items())
+        if is_precached(rel_path) and info['size'] <= PRECACHE_MAX_SIZE
+    ]
+    version = content_digest(json.dumps(entries, sort_keys=True).encode('utf-8'))[:16]
+    return {'version': version, 'entries': entries}
+
+
+def precache_manifest_bytes(manifest):
+    """预缓存清单 -> 写入磁盘 / 上传的字节"""
+    return dump_json_bytes(manifest) + b'\n'
+
+
+def refresh_precache_manifest(local_files, dry_run=False):
+    """
+    写入 public/precache-manifest.json（内容不变时不写），并加入 local_files
+    dry_run 时只在内存中生成，不写文件；返回 (内容是否变化, 清单)
+    """
+    manifest = build_precache_manifest(local_files)
+    content = precache_manifest_bytes(manifest)
+    path = LOCAL_PUBLIC_DIR / PRECACHE_MANIFEST
+    if dry_run:
+        written = file_digest(path) != content_digest(content)
+    else:
+        written, _ = write_bytes_atomic(path, content)
+    local_files[PRECACHE_MANIFEST] = {'path': path, 'size': len(content)}
+    status = ('，将更新' if dry_run else '，已更新') if written else ''
+    print(f"🗂️  预缓存清单: {len(manifest['entries'])} 个文件（版本 {manifest['version']}{status}）\n")
+    return written, manifest
+
+
+def _precache_hashes(content):
+    """预缓存清单字节 -> {url: 哈希}，无法解析时返回空字典"""
+    try:
+        return {entry['url']: entry['hash'] for entry in json.loads(content)['entries']}
+    except (TypeError, ValueError, KeyError):
+        return {}
+
+
+def scan_oss_files(backend, prefix):
     """扫描 OSS 上的文件"""
     files = {}
     try:
-        for obj in oss2.ObjectIterator(bucket, prefix=prefix):
-            rel_path = obj.key[len(prefix):].lstrip('/')
-            files[rel_path] = {'size': obj.size}
+        for obj in backend.list(prefix):
+            rel_path = obj['key'][len(prefix):].lstrip('/')
+            files[rel_path] = {'size': obj['size']}
     except:
         pass
     return files
 
 
-def upload_configs(bucket, auto_confirm=False):
-    """功能1: 覆盖上传所有配置文件"""
+def refresh_activity_stats():
+    """生成 / 更新活动统计文件（只处理配置内容有变化的活动；未安装 numpy 时跳过）"""
+    try:
+        from gacha_stats import refresh_stats
+    except ImportError as e:
+        print(f"⚠️  跳过活动统计生成（{e}）\n")
+        return
+
+    print("📊 正在更新活动统计...")
+    report = refresh_stats(
+        progress=lambda activity_id, path, elapsed: print(f"   ✅ {activity_id} ({elapsed * 1000:.0f} ms)")
+    )
+    for activity_id, reason in report['failed']:
+        print(f"   ❌ {activity_id}: {reason}")
+    print(f"   生成 {len(report['generated'])} 个 | 未变化 {len(report['skipped'])} 个\n")
+
+
+def refresh_activity_indexes():
+    """由活动配置的 metadata 重新生成 index.json 和分片索引，失败时返回 False"""
+    print("📇 正在生成活动索引...")
+    try:
+        report = refresh_indexes()
+    except (OSError, ValueError) as e:
+        print(f"   ❌ 活动索引生成失败: {e}\n")
+        return False
+    for path in report['written']:
+        print(f"   ✅ {path.name}")
+    for path in report['removed']:
+        print(f"   🗑️  {path.name}")
+    print(f"   写入 {len(report['written'])} 个 | 删除 {len(report['removed'])} 个 | 未变化 {report['unchanged']} 个\n")
+    return True
+
+
+def validate_configs():
+    """用配置目录（gacha_catalog）校验所有活动配置并打印问题；未安装 numpy 时跳过"""
+    try:
+        from gacha_catalog import load_catalog, validate
+    except ImportError as e:
+        print(f"⚠️  跳过配置校验（{e}）\n")
+        return
+
+    print("🔎 正在校验配置...")
+    problems = validate(load_catalog())
+    for level, label, message in problems:
+        print(f"   {'❌' if level == 'error' else '⚠️ '} {label}: {message}")
+    errors = sum(1 for level, _, _ in problems if level == 'error')
+    print(f"   {errors} 个错误 | {len(problems) - errors} 个警告\n")
+
+
+def _print_plan(to_upload, label=''):
+    """显示前10个待上传文件"""
+    for rel_path, size, reason in to_upload[:10]:
+        print(f"   {label}[{reason}] {rel_path} ({size / 1024:.1f} KB)")
+    if len(to_upload) > 10:
+        print(f"   {label}... 还有 {len(to_upload) - 10} 个")
+
+
+def _confirm(message):
+    print()
+    response = input(f"{message}(y/N): ")
+    if response.lower() != 'y':
+        print("❌ 取消上传")
+        return False
+    return True
+
+
+def scan_config_files():
+    """gacha-configs 目录下的所有 JSON 文件：[('config', 相对路径, 本地文件)]"""
+    return [
+        ('config', json_file.relative_to(LOCAL_CONFIG_DIR).as_posix(), json_file)
+        for json_file in sorted(LOCAL_CONFIG_DIR.rglob('*.json'))
+    ]
+
+
+def publish_configs(targets, config_files):
+    """
+    把整套配置发布为一个新版本（见 config_release.py）：
+      1. 各目标并发读取当前指针，生成发布计划（与上一个发布相同的文件在服务端复制）
+      2. 需要上传的文件通过 publish 扇出到各目标的发布目录
+      3. 所有文件都成功的目标复制未变化的文件、上传增量补丁、写入清单并切换指针
+    返回 publish 的结果
+    """
+    manifest = {rel_path: content_digest(load_document(path).content) for _, rel_path, path in config_files}
+    local_paths = {rel_path: path for _, rel_path, path in config_files}
+    plans = for_each_target(targets, lambda target: plan_release(target.backend, target.config_prefix, manifest))
+
+    multi = len(targets) > 1
+    uploads = {}
+    for target in targets:
+        plan = plans[target.name]
+        label = f"[{target.name}] " if multi else ""
+        if plan.current:
+            print(f"✨ {label}配置已是最新（发布 {plan.release}）")
+            continue
+        print(f"📋 {label}发布 {plan.release}：上传 {len(plan.upload)} 个 | 复用 {len(plan.copies)} 个"
+              + (f"（上一个发布 {plan.previous}）" if plan.previous else "（首次版本化发布）"))
+        uploads[target.name] = [('release', plan.base + rel_path, local_paths[rel_path]) for rel_path in plan.upload]
+
+    if not uploads:
+        return {}
+
+    print()
+    start = time.perf_counter()
+    report = publish(targets, uploads)
+
+    def load_content(rel_path):
+        return load_document(local_paths[rel_path]).content
+
+    def finish(target):
+        if report[target.name]['failed']:
+            return "❌ 有文件上传失败，指针未切换"
+        plan = plans[target.name]
+        try:
+            finish_release(target.backend, plan, load_content=load_content)
+        except Exception as e:
+            return f"❌ 切换指针失败: {e}"
+        patched = sum(1 for entry in plan.patch_index.values() if entry['from'])
+        return f"🔀 已切换到发布 {plan.release}（{patched} 个文件有增量补丁，新增 {len(plan.patches)} 个）"
+
+    results = for_each_target([target for target in targets if target.name in uploads], finish)
+    # 已发布的内容留作以后生成补丁的旧版本
+    for rel_path in {rel_path for name in uploads for rel_path in plans[name].upload}:
+        remember_version(load_content(rel_path))
+    print_publish_summary(report, time.perf_counter() - start)
+    for name, message in results.items():
+        print(f"   {f'[{name}] ' if multi else ''}{message}")
+    return report
+
+
+def upload_configs(targets, auto_confirm=False):
+    """功能1: 发布所有配置文件（新版本）"""
     print("\n" + "=" * 70)
-    print("📝 功能1: 覆盖上传所有配置文件")
+    print("📝 功能1: 发布所有配置文件")
     print("=" * 70 + "\n")
 
+    # 统计文件与配置放在同一目录，随下面的扫描一起发布
+    refresh_activity_stats()
+    if not refresh_activity_indexes():
+        return
+    validate_configs()
+
     # 扫描 gacha-configs 目录下的所有 JSON 文件
     print("🔍 正在扫描配置文件...")
-    config_files = []
-    for json_file in LOCAL_CONFIG_DIR.rglob('*.json'):
-        rel_path = json_file.relative_to(LOCAL_CONFIG_DIR)
-        config_files.append((json_file, rel_path))
-
+    config_files = scan_config_files()
     print(f"   找到 {len(config_files)} 个 JSON 文件\n")
 
     if not config_files:
@@ -201,36 +566,21 @@ def upload_configs(bucket, auto_confirm=False):
         return
 
     # 显示前10个
-    print("📋 待上传文件:")
-    for json_file, rel_path in config_files[:10]:
+    print("📋 配置文件:")
+    for _, rel_path, _ in config_files[:10]:
         print(f"   {rel_path}")
     if len(config_files) > 10:
         print(f"   ... 还有 {len(config_files) - 10} 个")
 
     # 确认上传
-    if not auto_confirm:
-        print()
-        response = input(f"确认上传 {len(config_files)} 个配置文件？(y/N): ")
-        if response.lower() != 'y':
-            print("❌ 取消上传")
-            return
-
-    print("\n⏳ 开始上传...\n")
-    success_count = 0
-    fail_count = 0
-
-    for i, (json_file, rel_path) in enumerate(config_files, 1):
-        oss_path = OSS_PREFIX + str(rel_path).replace('\\', '/')
-        print(f"[{i}/{len(config_files)}] ", end='')
-        if upload_config_file(bucket, json_file, oss_path):
-            success_count += 1
-        else:
-            fail_count += 1
+    if not auto_confirm and not _confirm(f"确认发布 {len(config_files)} 个配置文件到 {len(targets)} 个目标？"):
+        return
 
-    print(f"\n✅ 完成: {success_count} 个 | ❌ 失败: {fail_count} 个")
+    print("\n⏳ 开始发布...\n")
+    publish_configs(targets, config_files)
 
 
-def upload_static_incremental(bucket, dry_run=False, auto_confirm=False):
+def upload_static_incremental(targets, dry_run=False, auto_confirm=False):
     """功能2/3: 增量上传静态资源"""
     mode_text = "预览增量" if dry_run else "增量上传静态资源"
     print("\n" + "=" * 70)
@@ -240,56 +590,63 @@ def upload_static_incremental(bucket, dry_run=False, auto_confirm=False):
     print("🔍 正在扫描本地文件...")
     local_files = scan_local_files(LOCAL_PUBLIC_DIR)
     print(f"   找到 {len(local_files)} 个文件\n")
+    # 预览时清单只在内存中生成，与实际上传使用同样的比较
+    _, manifest = refresh_precache_manifest(local_files, dry_run=dry_run)
+    manifest_bytes = precache_manifest_bytes(manifest)
+    local_hashes = {entry['url']: entry['hash'] for entry in manifest['entries']}
 
+    # 各目标并发列举
     print("🔍 正在扫描 OSS 文件...")
-    oss_prefix = f"{PATH_PREFIX}/" if PATH_PREFIX else ""
-    oss_files = scan_oss_files(bucket, oss_prefix)
-    print(f"   找到 {len(oss_files)} 个文件\n")
-
-    # 对比变更
-    to_upload = []
-    for rel_path, local_info in local_files.items():
-        if rel_path not in oss_files:
-            to_upload.append((rel_path, local_info, '新增'))
-        elif local_info['size'] != oss_files[rel_path]['size']:
-            to_upload.append((rel_path, local_info, '修改'))
+    remote_files = for_each_target(targets, lambda target: scan_oss_files(target.backend, target.static_prefix))
+    for name, oss_files in remote_files.items():
+        print(f"   {name}: 找到 {len(oss_files)} 个文件")
+    print()
 
-    print(f"📋 变更: {len(to_upload)} 个文件需要上传\n")
+    # 按目标对比变更
+    plans = {}
+    for target in targets:
+        oss_files = remote_files[target.name]
+        # 预缓存资源还按远端清单中的哈希比较（大小不变的修改也要上传，否则与新清单不一致）
+        remote_manifest = None
+        if PRECACHE_MANIFEST in oss_files:
+            remote_manifest = target.backend.get(target.key('static', PRECACHE_MANIFEST))
+        remote_hashes = _precache_hashes(remote_manifest)
+        to_upload = []
+        for rel_path, local_info in local_files.items():
+            if rel_path not in oss_files:
+                to_upload.append((rel_path, local_info['size'], '新增'))
+            elif local_info['size'] != oss_files[rel_path]['size']:
+                to_upload.append((rel_path, local_info['size'], '修改'))
+            elif rel_path in remote_hashes and remote_hashes[rel_path] != local_hashes.get(rel_path):
+                to_upload.append((rel_path, local_info['size'], '修改'))
+            elif rel_path == PRECACHE_MANIFEST and remote_manifest != manifest_bytes:
+                to_upload.append((rel_path, local_info['size'], '修改'))
+
+        label = f"[{target.name}] " if len(targets) > 1 else ""
+        print(f"📋 {label}变更: {len(to_upload)} 个文件需要上传")
+        _print_plan(to_upload, label)
+        print()
+        if to_upload:
+            plans[target.name] = [('static', rel_path, local_files[rel_path]['path']) for rel_path, _, _ in to_upload]
 
-    if not to_upload:
+    if not plans:
         print("✨ 所有文件都是最新的！")
         return
 
-    # 显示前10个
-    for rel_path, info, reason in to_upload[:10]:
-        size_kb = info['size'] / 1024
-        print(f"   [{reason}] {rel_path} ({size_kb:.1f} KB)")
-    if len(to_upload) > 10:
-        print(f"   ... 还有 {len(to_upload) - 10} 个")
-
     if dry_run:
         return
 
-    # 确认上传
-    if not auto_confirm:
-        print()
-        response = input(f"确认上传 {len(to_upload)} 个文件？(y/N): ")
-        if response.lower() != 'y':
-            print("❌ 取消上传")
-            return
+    total = sum(len(plan) for plan in plans.values())
+    if not auto_confirm and not _confirm(f"确认上传 {total} 个文件（{len(plans)} 个目标）？"):
+        return
 
     print("\n⏳ 开始上传...\n")
-    success_count = 0
-    for i, (rel_path, local_info, reason) in enumerate(to_upload, 1):
-        oss_key = oss_prefix + rel_path
-        print(f"[{i}/{len(to_upload)}] ", end='')
-        if upload_static_file(bucket, local_info['path'], oss_key):
-            success_count += 1
-
-    print(f"\n✅ 完成: {success_count}/{len(to_upload)} 个文件")
+    start = time.perf_counter()
+    report = publish(targets, plans)
+    print_publish_summary(report, time.perf_counter() - start)
 
 
-def upload_all_static(bucket):
+def upload_all_static(targets):
     """功能4: 覆盖上传所有静态资源"""
     print("\n" + "=" * 70)
     print("⚡ 功能4: 覆盖上传所有静态资源")
@@ -304,70 +661,323 @@ def upload_all_static(bucket):
     print("\n🔍 正在扫描本地文件...")
     local_files = scan_local_files(LOCAL_PUBLIC_DIR)
     print(f"   找到 {len(local_files)} 个文件\n")
+    refresh_precache_manifest(local_files)
 
     print("⏳ 开始上传...\n")
-    oss_prefix = f"{PATH_PREFIX}/" if PATH_PREFIX else ""
-    success_count = 0
+    plan = [('static', rel_path, info['path']) for rel_path, info in local_files.items()]
+    start = time.perf_counter()
+    report = publish(targets, {target.name: plan for target in targets})
+    print_publish_summary(report, time.perf_counter() - start)
+
+
+class _EventSource:
+    """watchdog 文件系统事件 -> 变化文件路径队列"""
+
+    def __init__(self, base_dir):
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+
+        changes = self.changes_queue = queue.Queue()
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                # opened / closed_no_write 等只读事件不代表内容变化（读取文件本身也会触发）
+                if event.is_directory or event.event_type not in WATCH_EVENT_TYPES:
+                    return
+                changes.put(Path(event.src_path))
+                # 原子写入（临时文件 rename 覆盖）以移动事件的目标路径出现
+                dest = getattr(event, 'dest_path', '')
+                if dest:
+                    changes.put(Path(dest))
+
+        self.observer = Observer()
+        self.observer.schedule(Handler(), str(base_dir), recursive=True)
+        self.observer.start()
+
+    def changes(self, timeout):
+        paths = set()
+        try:
+            paths.add(self.changes_queue.get(timeout=timeout))
+            while True:
+                paths.add(self.changes_queue.get_nowait())
+        except queue.Empty:
+            pass
+        return paths
+
+    def stop(self):
+        self.observer.stop()
+        self.observer.join()
+
+
+class _PollingSource:
+    """未安装 watchdog 时的后备：定期比较本地文件的 (mtime, 大小)"""
+
+    def __init__(self, base_dir, interval=WATCH_POLL_INTERVAL):
+        self.base_dir = base_dir
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for path in self.base_dir.rglob('*'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.is_file():
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self, timeout):
+        time.sleep(max(timeout, self.interval))
+        snapshot = self._scan()
+        paths = {path for path, key in snapshot.items() if self.snapshot.get(path) != key}
+        paths.update(path for path in self.snapshot if path not in snapshot)
+        self.snapshot = snapshot
+        return paths
+
+    def stop(self):
+        pass
+
+
+def _open_change_source(base_dir):
+    try:
+        source = _EventSource(base_dir)
+        print("👀 使用文件系统事件监听（watchdog）")
+    except ImportError:
+        source = _PollingSource(base_dir)
+        print(f"👀 未安装 watchdog，每 {source.interval:g}s 轮询一次")
+    return source
+
+
+def _route_change(path):
+    """
+    变化的本地文件 -> (类型, 相对路径)，不需要上传时返回 None
+    类型为 'config'（gacha-configs 下的 JSON，路径相对 gacha-configs）或 'static'（相对 public）
+    """
+    try:
+        rel_path = path.relative_to(LOCAL_PUBLIC_DIR)
+    except ValueError:
+        return None
+    rel = str(rel_path).replace('\\', '/')
+    config_root = LOCAL_CONFIG_DIR.relative_to(LOCAL_PUBLIC_DIR).as_posix() + '/'
+    if rel.startswith(config_root):
+        if path.suffix != '.json' or path.name.endswith('.tmp'):
+            return None
+        return 'config', rel[len(config_root):]
+    if should_exclude(rel_path):
+        return None
+    return 'static', rel
+
+
+def _refresh_changed_stats(config_paths):
+    """
+    为变化的活动配置重新生成统计文件，已删除的配置同时删除其统计文件
+    返回 (新写入的统计文件路径, 删除的统计文件路径)
+    """
+    activity_paths = [
+        path for path in config_paths
+        if path.parent != LOCAL_CONFIG_DIR and not is_stats_file(path)
+    ]
+    if not activity_paths:
+        return [], []
+    try:
+        from gacha_stats import refresh_stats, stats_path
+    except ImportError:
+        return [], []
+
+    removed = []
+    for path in activity_paths:
+        if not path.exists() and stats_path(path).exists():
+            stats_path(path).unlink()
+            removed.append(stats_path(path))
+
+    config_by_id = {path.stem: path for path in activity_paths if path.is_file()}
+    if not config_by_id:
+        return [], removed
+    report = refresh_stats(list(config_by_id))
+    for activity_id, reason in report['failed']:
+        print(f"   ❌ {activity_id} 统计生成失败: {reason}")
+    return [stats_path(config_by_id[activity_id]) for activity_id in report['generated']], removed
+
+
+def _refresh_changed_indexes(config_paths):
+    """有活动配置变化（含删除）时重新生成活动索引，返回 (新写入的索引文件路径, 删除的旧分片路径)"""
+    if not any(path.parent != LOCAL_CONFIG_DIR and not is_stats_file(path) for path in config_paths):
+        return [], []
+    try:
+        report = refresh_indexes()
+    except (OSError, ValueError) as e:
+        print(f"   ❌ 活动索引生成失败: {e}")
+        return [], []
+    return report['written'], report['removed']
+
+
+def _refresh_changed_precache(static_rel_paths):
+    """有预缓存资源变化时重新生成预缓存清单，返回写入的清单路径"""
+    if not any(is_precached(rel_path) for rel_path in static_rel_paths):
+        return []
+    written, _ = refresh_precache_manifest(scan_local_files(LOCAL_PUBLIC_DIR))
+    return [LOCAL_PUBLIC_DIR / PRECACHE_MANIFEST] if written else []
+
+
+def upload_changes(targets, paths, remotes, generated):
+    """
+    上传一批变化的文件；remotes 为内存中的远端状态 {目标名: {对象 key: {'size', 'digest'}}}，上传后原地更新
+    本次会话中上传过且内容未变的文件会跳过；有配置文件变化（含删除）时整套配置发布为新版本
+
+    generated 记录本函数写入 / 删除的生成文件（统计、索引、预缓存清单）{路径: 内容哈希，已删除为 None}，
+    这些写入在下一批中产生的事件与记录一致时忽略，不会再次触发发布
+    返回 [publish 的结果]
+    """
+    routed = {}
+    for path in sorted(paths):
+        if path in generated and file_digest(path) == generated[path]:
+            continue
+        route = _route_change(path)
+        if route:
+            routed[path] = route
+
+    # 已删除的配置也算配置变化（重新发布、重新生成索引）；已删除的静态资源只影响预缓存清单
+    config_paths = [path for path, (kind, _) in routed.items() if kind == 'config']
+    stats_written, stats_removed = _refresh_changed_stats(config_paths)
+    index_written, index_removed = _refresh_changed_indexes(config_paths)
+    static_rel_paths = [rel_path for kind, rel_path in routed.values() if kind == 'static']
+    precache_written = _refresh_changed_precache(static_rel_paths)
+
+    for path in stats_written + index_written + precache_written:
+        generated[path] = file_digest(path)
+        routed.setdefault(path, _route_change(path))
+    for path in stats_removed + index_removed:
+        generated[path] = None
+
+    plan = [
+        (kind, rel_path, path) for path, (kind, rel_path) in routed.items()
+        if kind == 'static' and path.is_file()
+    ]
+
+    def skip(target, key, digest):
+        known = remotes[target.name].get(key)
+        return bool(known) and known.get('digest') == digest
+
+    reports = []
+    if plan:
+        start = time.perf_counter()
+        report = publish(targets, {target.name: plan for target in targets}, skip)
+        for target in targets:
+            for kind, rel_path, size, digest in report[target.name]['uploaded']:
+                remotes[target.name][target.key(kind, rel_path)] = {'size': size, 'digest': digest}
+        print_publish_summary(report, time.perf_counter() - start)
+        reports.append(report)
+    if config_paths:
+        reports.append(publish_configs(targets, scan_config_files()))
+    return reports
+
+
+def watch_changes(targets, debounce=WATCH_DEBOUNCE, max_delay=WATCH_MAX_DELAY):
+    """功能5: 监听 public/ 的变化，防抖后增量上传（Ctrl+C 退出）"""
+    print("\n" + "=" * 70)
+    print("👀 功能5: 监听变化并自动上传")
+    print("=" * 70 + "\n")
 
-    for i, (rel_path, local_info) in enumerate(local_files.items(), 1):
-        oss_key = oss_prefix + rel_path
-        print(f"[{i}/{len(local_files)}] ", end='')
-        if upload_static_file(bucket, local_info['path'], oss_key):
-            success_count += 1
+    print("🔍 正在扫描 OSS 文件（仅启动时一次）...")
+    remotes = for_each_target(targets, lambda target: {
+        target.static_prefix + rel: {'size': info['size'], 'digest': None}
+        for rel, info in scan_oss_files(target.backend, target.static_prefix).items()
+    })
+    for name, remote in remotes.items():
+        print(f"   {name}: 找到 {len(remote)} 个文件")
+    print()
 
-    print(f"\n✅ 完成: {success_count}/{len(local_files)} 个文件")
+    source = _open_change_source(LOCAL_PUBLIC_DIR)
+    print(f"   监听 {LOCAL_PUBLIC_DIR}（防抖 {debounce:g}s，Ctrl+C 退出）\n")
+
+    pending = set()
+    generated = {}
+    first_change = last_change = None
+    totals = [0, 0, 0]
+    try:
+        while True:
+            paths = source.changes(timeout=min(debounce, 0.2))
+            now = time.monotonic()
+            if paths:
+                pending |= paths
+                last_change = now
+                first_change = first_change or now
+            if pending and (now - last_change >= debounce or now - first_change >= max_delay):
+                batch, pending = pending, set()
+                first_change = None
+                print(f"📦 {time.strftime('%H:%M:%S')} 检测到 {len(batch)} 个变化")
+                for report in upload_changes(targets, batch, remotes, generated):
+                    for result in report.values():
+                        totals[0] += len(result['uploaded'])
+                        totals[1] += len(result['failed'])
+                        totals[2] += result['skipped']
+                print()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.stop()
+    print(f"\n👋 停止监听：共上传 {totals[0]} 个 | 失败 {totals[1]} 个 | 跳过 {totals[2]} 个")
 
 
-def show_menu():
+def show_menu(targets):
     """显示交互式菜单"""
     print("\n" + "=" * 70)
     print("🚀 阿里云 OSS 资源管理")
     print("=" * 70)
-    print(f"\n📦 Bucket: {BUCKET_NAME}")
-    print(f"📍 路径前缀: {PATH_PREFIX or '(根目录)'}\n")
+    print()
+    for target in targets:
+        print(f"📦 {target.describe()}")
+    print()
     print("请选择操作:")
-    print("  1. 覆盖上传配置文件 (JSON)")
+    print("  1. 发布配置文件 (JSON，新版本)")
     print("  2. 增量上传静态资源 (图片/音频)")
     print("  3. 预览静态资源增量")
     print("  4. 覆盖上传所有静态资源")
+    print("  5. 监听变化并自动上传")
     print("  0. 退出")
     print()
 
 
 def main():
-    # 命令行参数：python upload-to-oss.py incremental
+    # 命令行参数：python upload-to-oss.py incremental | configs | watch
     cli_action = sys.argv[1] if len(sys.argv) > 1 else None
 
-    # 初始化 OSS
+    # 初始化存储后端（各目标并发验证连接）
     try:
-        auth = oss2.Auth(ACCESS_KEY_ID, ACCESS_KEY_SECRET)
-        bucket = oss2.Bucket(auth, ENDPOINT, BUCKET_NAME)
-        bucket.get_bucket_info()
+        targets = load_targets()
+        for_each_target(targets, lambda target: target.backend.check())
     except Exception as e:
-        print(f"❌ 连接 OSS 失败: {e}")
+        print(f"❌ 连接存储失败: {e}")
         sys.exit(1)
 
     # 非交互模式
     if cli_action == 'incremental':
-        upload_static_incremental(bucket, dry_run=False, auto_confirm=True)
+        upload_static_incremental(targets, dry_run=False, auto_confirm=True)
         return
     if cli_action == 'configs':
-        upload_configs(bucket, auto_confirm=True)
+        upload_configs(targets, auto_confirm=True)
+        return
+    if cli_action == 'watch':
+        watch_changes(targets)
         return
 
     # 交互式菜单
     while True:
-        show_menu()
-        choice = input("请输入选项 (0-4): ").strip()
+        show_menu(targets)
+        choice = input("请输入选项 (0-5): ").strip()
 
         if choice == '1':
-            upload_configs(bucket)
+            upload_configs(targets)
         elif choice == '2':
-            upload_static_incremental(bucket, dry_run=False)
+            upload_static_incremental(targets, dry_run=False)
         elif choice == '3':
-            upload_static_incremental(bucket, dry_run=True)
+            upload_static_incremental(targets, dry_run=True)
         elif choice == '4':
-            upload_all_static(bucket)
+            upload_all_static(targets)
+        elif choice == '5':
+            watch_changes(targets)
         elif choice == '0':
             print("\n👋 再见！")
             break
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+版本历史全文检索（不依赖 Qt）
+对 versionDetails 的 features / theme / commits 建立内存倒排索引
+中文按单字 + 双字切分，英文/数字按单词切分（支持前缀匹配）
+"""
+
+import re
+import json
+import bisect
+
+# 连续的中日韩字符 / 连续的字母数字（允许版本号里的点）
+_TOKEN_RE = re.compile(r'[぀-ヿ㐀-䶿一-鿿가-힯]+|[a-z0-9]+(?:\.[a-z0-9]+)*')
+_CJK_RE = re.compile(r'[぀-ヿ㐀-䶿一-鿿가-힯]')
+
+
+def tokenize(text):
+    """切分文本：中文输出单字和相邻双字，英文输出小写单词"""
+    tokens = []
+    for run in _TOKEN_RE.findall((text or '').lower()):
+        if _CJK_RE.match(run):
+            tokens.extend(run)
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def _query_terms(text):
+    """切分查询：中文连续片段用双字（单字时用单字），英文用单词"""
+    terms = []
+    for run in _TOKEN_RE.findall((text or '').lower()):
+        if _CJK_RE.match(run):
+            if len(run) == 1:
+                terms.append((run, False))
+            else:
+                terms.extend((run[i:i + 2], False) for i in range(len(run) - 1))
+        else:
+            terms.append((run, True))
+    return terms
+
+
+def _version_text(version):
+    """拼接版本中可检索的文本"""
+    parts = [version.get('version', ''), version.get('theme', '')]
+    parts.extend(version.get('features', []))
+    for commit in version.get('commits', []):
+        parts.append(commit.get('hash', ''))
+        parts.append(commit.get('message', ''))
+    return '\n'.join(str(p) for p in parts if p)
+
+
+class VersionSearchIndex:
+    """versionDetails 倒排索引，按版本号增量更新"""
+
+    def __init__(self):
+        self.postings = {}  # token -> {版本号}
+        self.doc_tokens = {}  # 版本号 -> {token}
+        self.doc_fingerprints = {}  # 版本号 -> 内容指纹（判断是否需要重建该版本）
+        self.order = {}  # 版本号 -> 在 versionDetails 中的位置
+        self._sorted_terms = None  # 英文前缀匹配用的有序词表（惰性重建）
+
+    def update(self, version_details):
+        """
+        与最新的 versionDetails 同步，只重建内容发生变化的版本
+        返回 (新增/更新数, 删除数)
+        """
+        seen = set()
+        changed = 0
+        self.order = {}
+        for i, version in enumerate(version_details):
+            number = version.get('version', '')
+            if not number or number in seen:
+                continue
+            seen.add(number)
+            self.order[number] = i
+
+            fingerprint = json.dumps(version, ensure_ascii=False, sort_keys=True)
+            if self.doc_fingerprints.get(number) == fingerprint:
+                continue
+            self._remove(number)
+            self._add(number, version, fingerprint)
+            changed += 1
+
+        removed = [number for number in self.doc_fingerprints if number not in seen]
+        for number in removed:
+            self._remove(number)
+
+        if changed or removed:
+            self._sorted_terms = None
+        return changed, len(removed)
+
+    def _add(self, number, version, fingerprint):
+        tokens = set(tokenize(_version_text(version)))
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(number)
+        self.doc_tokens[number] = tokens
+        self.doc_fingerprints[number] = fingerprint
+
+    def _remove(self, number):
+        for token in self.doc_tokens.pop(number, ()):
+            docs = self.postings.get(token)
+            if docs is not None:
+                docs.discard(number)
+                if not docs:
+                    del self.postings[token]
+        self.doc_fingerprints.pop(number, None)
+
+    def _prefix_docs(self, prefix):
+        """英文前缀匹配：在有序词表上二分查找"""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        docs = set()
+        i = bisect.bisect_left(self._sorted_terms, prefix)
+        while i < len(self._sorted_terms) and self._sorted_terms[i].startswith(prefix):
+            docs |= self.postings[self._sorted_terms[i]]
+            i += 1
+        return docs
+
+    def search(self, query):
+        """返回同时包含所有查询词的版本号（按 versionDetails 顺序）"""
+        terms = _query_terms(query)
+        if not terms:
+            return []
+
+        result = None
+        for term, is_prefix in terms:
+            docs = self._prefix_docs(term) if is_prefix else self.postings.get(term, set())
+            result = set(docs) if result is None else result & docs
+            if not result:
+                return []
+
+        last = len(self.order)
+        return sorted(result, key=lambda number: self.order.get(number, last))
@@ -2,11 +2,11 @@
 
 import { useEffect, useState } from 'react'
 import { useRouter } from 'next/navigation'
-import { loadActivityIndex, getGachaTypePath } from '../services/cdnService'
+import { loadRecentActivityIndex, getGachaTypePath } from '../services/cdnService'
 
 /**
  * 主页重定向组件
- * 从 index.json 读取第一个活动，自动重定向到对应页面
+ * 从首屏索引 index-recent.json 读取最新的活动，自动重定向到对应页面
  */
 export function HomeRedirect() {
   const router = useRouter()
@@ -15,7 +15,7 @@ export function HomeRedirect() {
   useEffect(() => {
     const loadLatestActivity = async () => {
       try {
-        const data = await loadActivityIndex()
+        const data = await loadRecentActivityIndex()
 
         if (data.activities && data.activities.length > 0) {
           const firstActivity = data.activities[0]
@@ -2,7 +2,7 @@
 
 import { motion, AnimatePresence } from 'framer-motion'
 import { CDN_BASE_URL } from '../../utils/constants'
-import { buildCurrencyIconUrl, loadActivityIndex, IMG_WEBP } from '../../services/cdnService'
+import { buildCurrencyIconUrl, loadRecentActivityIndex, IMG_WEBP } from '../../services/cdnService'
 import { useEffect, useState } from 'react'
 import { useSound } from '../../hooks/useSound'
 import { useRouter } from 'next/navigation'
@@ -106,7 +106,7 @@ export function Header({
   useEffect(() => {
     const loadFirstActivity = async () => {
       try {
-        const data = await loadActivityIndex()
+        const data = await loadRecentActivityIndex()
         if (data.activities && data.activities.length > 0) {
           setFirstActivityId(data.activities[0].id)
         }
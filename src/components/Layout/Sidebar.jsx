@@ -10,6 +10,9 @@ import { useSound } from '../../hooks/useSound'
 import { VersionModal } from './VersionModal'
 import './Sidebar.css'
 
+// 距离列表底部多少像素时开始加载更早的活动
+const ACTIVITY_LOAD_MARGIN = 400
+
 export function Sidebar({
   isOpen,
   onClose,
@@ -18,7 +21,7 @@ export function Sidebar({
   versionModalOpen = false,
   onVersionModalChange = () => {}
 }) {
-  const { activities, loading, error } = useActivityList()
+  const { activities, loading, error, hasMore, loadingMore, loadMore } = useActivityList()
   const router = useRouter()
   const pathname = usePathname()
 
@@ -28,15 +31,37 @@ export function Sidebar({
 
   const scrollContainerRef = useRef(null)
   const activeItemRef = useRef(null)
+  const centeredActivityRef = useRef(null)
 
-  // 活动列表加载后，将当前活动卡片滚动到容器中央
+  // 当前活动卡片出现后，将其滚动到容器中央（每个活动只滚动一次，加载更多时不打断用户滚动）
   useEffect(() => {
     if (!activities.length || !activeItemRef.current || !scrollContainerRef.current) return
+    if (centeredActivityRef.current === currentActivityId) return
+    centeredActivityRef.current = currentActivityId
     const container = scrollContainerRef.current
     const item = activeItemRef.current
     const target = item.offsetTop - container.clientHeight / 2 + item.offsetHeight / 2
     container.scrollTop = Math.max(0, target)
-  }, [activities])
+  }, [activities, currentActivityId])
+
+  // 列表只包含最近的活动：当前活动不在其中，或列表不足一屏时，继续加载更早的年份
+  useEffect(() => {
+    if (loading || !hasMore || !scrollContainerRef.current) return
+    const container = scrollContainerRef.current
+    const isGachaPage = pathname?.startsWith('/gacha/')
+    const currentMissing = isGachaPage && !activities.some((activity) => activity.id === currentActivityId)
+    if (currentMissing || container.scrollHeight <= container.clientHeight + ACTIVITY_LOAD_MARGIN) {
+      loadMore()
+    }
+  }, [activities, loading, hasMore, pathname, currentActivityId, loadMore])
+
+  // 滚动到接近底部时加载更早的活动
+  const handleListScroll = (e) => {
+    const container = e.currentTarget
+    if (hasMore && container.scrollTop + container.clientHeight >= container.scrollHeight - ACTIVITY_LOAD_MARGIN) {
+      loadMore()
+    }
+  }
 
   // 音乐播放器状态 - 初始为 false，客户端挂载后从 localStorage 读取
   const [isPlaying, setIsPlaying] = useState(false)
@@ -341,7 +366,11 @@ export function Sidebar({
         </div>
 
         {/* 活动列表 - 可滚动 */}
-        <div ref={scrollContainerRef} className="flex-1 overflow-y-auto py-4 space-y-3 custom-scrollbar">
+        <div
+          ref={scrollContainerRef}
+          onScroll={handleListScroll}
+          className="flex-1 overflow-y-auto py-4 space-y-3 custom-scrollbar"
+        >
           {loading && (
             <div className="text-white text-center text-xs md:text-sm">加载中...</div>
           )}
@@ -402,6 +431,9 @@ export function Sidebar({
               </motion.div>
             )
           })}
+          {loadingMore && (
+            <div className="text-white/60 text-center text-xs md:text-sm">加载中...</div>
+          )}
         </div>
 
         {/* 底部署名 */}
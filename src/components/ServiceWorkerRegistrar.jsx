@@ -1,11 +1,14 @@
 'use client'
 
 import { useEffect } from 'react'
+import { CDN_BASE_URL } from '../utils/constants'
 
 export function ServiceWorkerRegistrar() {
   useEffect(() => {
     if ('serviceWorker' in navigator) {
-      navigator.serviceWorker.register('/sw.js').catch(() => {
+      // 预缓存清单和资源从页面使用的 CDN 地址加载（见 public/sw.js）
+      const swUrl = CDN_BASE_URL ? `/sw.js?cdn=${encodeURIComponent(CDN_BASE_URL)}` : '/sw.js'
+      navigator.serviceWorker.register(swUrl).catch(() => {
         // 注册失败静默处理
       })
     }
@@ -1,24 +1,63 @@
 'use client'
 
-import { useState, useEffect } from 'react'
-import { loadActivityIndex } from '../services/cdnService'
+import { useState, useEffect, useCallback, useRef } from 'react'
+import { loadActivityIndex, loadActivityIndexShard, loadRecentActivityIndex } from '../services/cdnService'
+
+// 无法识别日期的活动所在的年份分片（与 scripts/config_index.py 的 UNKNOWN 一致），排在最后
+const UNKNOWN_YEAR = 'unknown'
+
+/**
+ * 首屏索引摘要中的年份 -> 从新到旧的加载顺序
+ * （数字键在 JS 对象中总是升序排列，需要重新排序）
+ */
+function sortYears(years) {
+  return Object.keys(years || {}).sort((a, b) => {
+    if (a === UNKNOWN_YEAR || b === UNKNOWN_YEAR) return a === UNKNOWN_YEAR ? 1 : -1
+    return Number(b) - Number(a)
+  })
+}
+
+/**
+ * 已加载的年份分片（从新到旧）+ 首屏活动中尚未加载年份的部分
+ * 首屏活动是最新的活动，未加载年份中的都比已加载的旧，接在后面顺序不变
+ */
+function mergeActivities(recent, shards) {
+  const loaded = shards.flatMap(shard => shard.activities || [])
+  const ids = new Set(loaded.map(activity => activity.id))
+  return [...loaded, ...recent.filter(activity => !ids.has(activity.id))]
+}
 
 /**
  * 活动列表 Hook
- * 从 CDN 加载所有活动列表
- * @returns {Object} { activities, loading, error }
+ * 首次只加载首屏索引（最近的活动），更早的活动调用 loadMore 按年份分片逐个加载
+ * 首屏索引没有年份摘要时（旧版发布），loadMore 一次加载完整索引
+ * @returns {Object} { activities, loading, error, hasMore, loadingMore, loadMore }
  */
 export function useActivityList() {
   const [activities, setActivities] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
+  const [hasMore, setHasMore] = useState(false)
+  const [loadingMore, setLoadingMore] = useState(false)
+
+  const recentRef = useRef([])
+  const shardsRef = useRef([])
+  // 尚未加载的年份；null 表示没有年份摘要，改为加载完整索引
+  const pendingYearsRef = useRef([])
+  const loadingMoreRef = useRef(false)
 
   useEffect(() => {
     const fetchActivities = async () => {
       try {
         setLoading(true)
-        const data = await loadActivityIndex()
-        setActivities(data.activities || [])
+        const recent = await loadRecentActivityIndex()
+        const recentActivities = recent.activities || []
+        recentRef.current = recentActivities
+        pendingYearsRef.current = recent.years ? sortYears(recent.years) : null
+        setActivities(recentActivities)
+        setHasMore(recent.years
+          ? pendingYearsRef.current.length > 0
+          : (recent.total ?? 0) > recentActivities.length)
         setError(null)
       } catch (err) {
         console.error('Failed to load activities:', err)
@@ -32,5 +71,34 @@ export function useActivityList() {
     fetchActivities()
   }, [])
 
-  return { activities, loading, error }
+  const loadMore = useCallback(async () => {
+    if (loadingMoreRef.current) return
+    const pendingYears = pendingYearsRef.current
+    if (pendingYears && !pendingYears.length) return
+
+    loadingMoreRef.current = true
+    setLoadingMore(true)
+    try {
+      if (pendingYears) {
+        const shard = await loadActivityIndexShard('year', pendingYears[0])
+        shardsRef.current = [...shardsRef.current, shard]
+        pendingYearsRef.current = pendingYears.slice(1)
+        setActivities(mergeActivities(recentRef.current, shardsRef.current))
+        setHasMore(pendingYearsRef.current.length > 0)
+      } else {
+        const data = await loadActivityIndex()
+        setActivities(data.activities || [])
+        pendingYearsRef.current = []
+        setHasMore(false)
+      }
+    } catch (err) {
+      // 保留已显示的活动，下次滚动时重试
+      console.error('Failed to load more activities:', err)
+    } finally {
+      loadingMoreRef.current = false
+      setLoadingMore(false)
+    }
+  }, [])
+
+  return { activities, loading, error, hasMore, loadingMore, loadMore }
 }
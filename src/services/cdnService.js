@@ -1,10 +1,18 @@
 import { CDN_BASE_URL, OSS_BASE_URL } from '../utils/constants'
+import { applyJsonPatch } from '../utils/jsonPatch'
 
 /**
  * CDN 数据加载服务
  *
  * 资源加载策略：
- * - 配置文件（JSON）：从 OSS_BASE_URL 直连加载（不经过 CDN，实时更新）
+ * - 配置文件（JSON）：先从 OSS_BASE_URL 直连读取发布指针 gacha-configs/current.json（不缓存），
+ *   再从指针指向的不可变发布目录 gacha-configs/releases/<发布ID>/ 加载（可被 CDN / 浏览器长期缓存）
+ *   同一会话内的配置都来自同一个发布，不会读到发布过程中新旧混合的文件；
+ *   尚未版本化发布（指针不存在）时回退到原路径 + 时间戳
+ * - 增量更新：配置内容保存在 localStorage，发布目录下的 patches.json 列出每个文件的当前哈希
+ *   和有补丁可用的旧哈希；本地版本与当前一致时不请求，是旧版本时只下载 JSON Patch 应用，否则下载全量
+ * - 活动索引：首屏只加载 index-recent.json（最近的活动 + 摘要），完整列表 index.json
+ *   和按类型 / 年份的分片按需加载
  * - 静态资源（图片/音频）：从 CDN_BASE_URL 加载（CDN 加速）
  */
 
@@ -14,6 +22,138 @@ export const IMG_WEBP = CDN_BASE_URL ? '?x-oss-process=image/format,webp' : ''
 // 缓存已加载的配置，避免重复请求
 const configCache = new Map()
 
+// 当前配置发布目录（如 releases/abc123/）的加载 Promise，null 表示尚未读取
+let configReleasePromise = null
+
+// 当前发布补丁索引的加载 Promise
+let patchIndexPromise = null
+
+// 已下载配置的持久化存储键前缀（值为 { digest, data }）
+const CONFIG_STORAGE_PREFIX = 'mw_config_cache:'
+
+/**
+ * 读取配置发布指针（upload-to-oss.py 每次发布最后写入）
+ * @returns {Promise<string|null>} 发布目录前缀，未版本化发布或读取失败时为 null
+ */
+function loadConfigRelease() {
+  if (!OSS_BASE_URL) {
+    return Promise.resolve(null)
+  }
+  if (!configReleasePromise) {
+    // 指针很小且每次发布都会变化：向 OSS 重新验证（ETag 未变时返回 304）
+    configReleasePromise = fetch(`${OSS_BASE_URL}/gacha-configs/current.json`, { cache: 'no-cache' })
+      .then(response => (response.ok ? response.json() : null))
+      .then(pointer => pointer?.base || null)
+      .catch(error => {
+        console.warn('Failed to load config release pointer, using unversioned configs:', error)
+        return null
+      })
+  }
+  return configReleasePromise
+}
+
+/**
+ * 构建配置文件请求 URL
+ * @param {string} path - gacha-configs 下的相对路径（如 chip/ag98.json）
+ * @param {boolean} [localNoCache=false] - 本地 public 加载时是否也加时间戳
+ * @returns {Promise<string>} 请求 URL
+ */
+async function resolveConfigUrl(path, localNoCache = false) {
+  if (!OSS_BASE_URL) {
+    return localNoCache ? `/gacha-configs/${path}?t=${Date.now()}` : `/gacha-configs/${path}`
+  }
+  const release = await loadConfigRelease()
+  if (release) {
+    // 发布目录内容不可变，优先走 CDN，且不加时间戳
+    return `${CDN_BASE_URL || OSS_BASE_URL}/gacha-configs/${release}${path}`
+  }
+  return `${OSS_BASE_URL}/gacha-configs/${path}?t=${Date.now()}`
+}
+
+/**
+ * 读取当前发布的补丁索引 { 相对路径: { d: 当前哈希, from: [旧哈希...] } }
+ * 发布中的每个文件都有条目（没有补丁时 from 为空），首次下载后按 d 缓存
+ * @returns {Promise<Object>} 未版本化发布或读取失败时为空对象
+ */
+function loadPatchIndex() {
+  if (!patchIndexPromise) {
+    patchIndexPromise = loadConfigRelease()
+      .then(release => {
+        if (!release) {
+          return {}
+        }
+        return fetch(`${CDN_BASE_URL || OSS_BASE_URL}/gacha-configs/${release}patches.json`)
+          .then(response => (response.ok ? response.json() : {}))
+      })
+      .catch(error => {
+        console.warn('Failed to load config patch index, downloading full configs:', error)
+        return {}
+      })
+  }
+  return patchIndexPromise
+}
+
+function readStoredConfig(path) {
+  try {
+    const raw = typeof localStorage !== 'undefined' && localStorage.getItem(CONFIG_STORAGE_PREFIX + path)
+    return raw ? JSON.parse(raw) : null
+  } catch {
+    return null
+  }
+}
+
+function writeStoredConfig(path, digest, data) {
+  try {
+    if (typeof localStorage !== 'undefined') {
+      localStorage.setItem(CONFIG_STORAGE_PREFIX + path, JSON.stringify({ digest, data }))
+    }
+  } catch (error) {
+    // 存储空间不足等情况下只是失去增量更新，不影响加载
+    console.warn(`Failed to store config ${path}:`, error)
+  }
+}
+
+/**
+ * 加载配置文件：本地已有当前版本时直接使用，有旧版本时下载补丁，否则下载全量
+ * @param {string} path - gacha-configs 下的相对路径
+ * @param {string} url - 全量下载地址（resolveConfigUrl 的结果）
+ * @returns {Promise<Response>} 与 fetch 相同的响应，调用方按原方式检查 ok / status 并读取 json()
+ */
+async function fetchConfig(path, url) {
+  const entry = (await loadPatchIndex())[path]
+  if (!entry) {
+    return fetch(url)
+  }
+
+  const stored = readStoredConfig(path)
+  if (stored?.digest === entry.d) {
+    return new Response(JSON.stringify(stored.data))
+  }
+  if (stored && entry.from.includes(stored.digest)) {
+    try {
+      const response = await fetch(`${CDN_BASE_URL || OSS_BASE_URL}/gacha-configs/patches/${stored.digest}-${entry.d}.json`)
+      if (response.ok) {
+        const data = applyJsonPatch(stored.data, await response.json())
+        writeStoredConfig(path, entry.d, data)
+        return new Response(JSON.stringify(data))
+      }
+    } catch (error) {
+      console.warn(`Failed to apply config patch for ${path}, downloading full config:`, error)
+    }
+  }
+
+  const response = await fetch(url)
+  if (!response.ok) {
+    return response
+  }
+  const data = await response.json()
+  writeStoredConfig(path, entry.d, data)
+  return new Response(JSON.stringify(data))
+}
+
+// 首屏索引尚未发布时，从完整索引截取的活动数（与 scripts/config_index.py 的 RECENT_COUNT 一致）
+const RECENT_INDEX_FALLBACK_COUNT = 12
+
 // 抽卡类型中英文映射
 const GACHA_TYPE_MAP = {
   '筹码类': 'chip',
@@ -41,12 +181,10 @@ export async function loadActivityIndex() {
   }
 
   try {
-    // 配置文件：优先从 OSS 直连加载，fallback 到本地
-    const url = OSS_BASE_URL
-      ? `${OSS_BASE_URL}/gacha-configs/index.json?t=${Date.now()}`
-      : '/gacha-configs/index.json'
+    // 配置文件：优先从 OSS 当前发布加载，fallback 到本地
+    const url = await resolveConfigUrl('index.json')
 
-    const response = await fetch(url)
+    const response = await fetchConfig('index.json', url)
     if (!response.ok) {
       throw new Error(`Failed to load activity index: ${response.status}`)
     }
@@ -59,6 +197,69 @@ export async function loadActivityIndex() {
   }
 }
 
+/**
+ * 加载首屏活动索引：最近的活动 + 摘要（活动总数、各分片的活动数）
+ * 由 scripts/config_index.py 生成，大小不随历史活动增长；尚未发布时由完整索引截取
+ * @returns {Promise<Object>} { activities, total, types, years }
+ */
+export async function loadRecentActivityIndex() {
+  const cacheKey = 'index-recent'
+
+  if (configCache.has(cacheKey)) {
+    return configCache.get(cacheKey)
+  }
+
+  try {
+    const url = await resolveConfigUrl('index-recent.json')
+
+    const response = await fetchConfig('index-recent.json', url)
+    if (response.status === 404) {
+      const { activities = [] } = await loadActivityIndex()
+      const data = { activities: activities.slice(0, RECENT_INDEX_FALLBACK_COUNT), total: activities.length }
+      configCache.set(cacheKey, data)
+      return data
+    }
+    if (!response.ok) {
+      throw new Error(`Failed to load recent activity index: ${response.status}`)
+    }
+    const data = await response.json()
+    configCache.set(cacheKey, data)
+    return data
+  } catch (error) {
+    console.error('Error loading recent activity index:', error)
+    throw error
+  }
+}
+
+/**
+ * 加载活动索引分片
+ * @param {'type'|'year'} kind - 分片方式
+ * @param {string|number} key - 类型（chip/cargo/drone/flagship）或年份（如 2025）
+ * @returns {Promise<Object>} { activities }
+ */
+export async function loadActivityIndexShard(kind, key) {
+  const path = `index-${kind}-${key}.json`
+
+  if (configCache.has(path)) {
+    return configCache.get(path)
+  }
+
+  try {
+    const url = await resolveConfigUrl(path)
+
+    const response = await fetchConfig(path, url)
+    if (!response.ok) {
+      throw new Error(`Failed to load activity index shard ${path}: ${response.status}`)
+    }
+    const data = await response.json()
+    configCache.set(path, data)
+    return data
+  } catch (error) {
+    console.error(`Error loading activity index shard (${path}):`, error)
+    throw error
+  }
+}
+
 /**
  * 加载单个活动配置（始终从本地public加载）
  * @param {string} gachaType - 抽卡类型 (chip/cargo/flagship)
@@ -73,12 +274,11 @@ export async function loadActivityConfig(gachaType, activityId) {
   }
 
   try {
-    // 配置文件：优先从 OSS 直连加载，fallback 到本地
-    const url = OSS_BASE_URL
-      ? `${OSS_BASE_URL}/gacha-configs/${gachaType}/${activityId}.json?t=${Date.now()}`
-      : `/gacha-configs/${gachaType}/${activityId}.json`
+    // 配置文件：优先从 OSS 当前发布加载，fallback 到本地
+    const path = `${gachaType}/${activityId}.json`
+    const url = await resolveConfigUrl(path)
 
-    const response = await fetch(url)
+    const response = await fetchConfig(path, url)
     if (!response.ok) {
       throw new Error(`Failed to load activity config: ${response.status}`)
     }
@@ -103,12 +303,10 @@ export async function loadVersionHistory() {
   }
 
   try {
-    // 配置文件：优先从 OSS 直连加载，fallback 到本地；404 时返回空结构而不抛错
-    const url = OSS_BASE_URL
-      ? `${OSS_BASE_URL}/gacha-configs/version-history.json?t=${Date.now()}`
-      : `/gacha-configs/version-history.json?t=${Date.now()}`
+    // 配置文件：优先从 OSS 当前发布加载，fallback 到本地；404 时返回空结构而不抛错
+    const url = await resolveConfigUrl('version-history.json', true)
 
-    const response = await fetch(url)
+    const response = await fetchConfig('version-history.json', url)
     if (!response.ok) {
       if (response.status === 404) {
         console.warn('version-history.json not found, returning empty history')
@@ -139,12 +337,10 @@ export async function loadSiteInfo() {
   }
 
   try {
-    // 配置文件：优先从 OSS 直连加载，fallback 到本地
-    const url = OSS_BASE_URL
-      ? `${OSS_BASE_URL}/gacha-configs/site-info.json?t=${Date.now()}`
-      : `/gacha-configs/site-info.json?t=${Date.now()}`
+    // 配置文件：优先从 OSS 当前发布加载，fallback 到本地
+    const url = await resolveConfigUrl('site-info.json', true)
 
-    const response = await fetch(url)
+    const response = await fetchConfig('site-info.json', url)
     if (!response.ok) {
       throw new Error(`Failed to load site info: ${response.status}`)
     }
@@ -423,10 +619,12 @@ export function preloadImages(urls) {
 }
 
 /**
- * 清除配置缓存
+ * 清除配置缓存（同时重新读取发布指针，之后的请求会加载最新发布）
  * @param {string} [key] - 可选，指定清除某个缓存键，不传则清除全部
  */
 export function clearConfigCache(key) {
+  configReleasePromise = null
+  patchIndexPromise = null
   if (key) {
     configCache.delete(key)
   } else {
@@ -0,0 +1,128 @@
+/**
+ * RFC 6902 JSON Patch 应用工具
+ * 补丁由 scripts/json_patch.py 在发布配置时生成，客户端在已缓存的旧版本上应用
+ */
+
+/**
+ * JSON Pointer（RFC 6901）拆分为路径片段
+ */
+function parsePointer(pointer) {
+  if (pointer === '') {
+    return []
+  }
+  if (!pointer.startsWith('/')) {
+    throw new Error(`Invalid JSON Pointer: ${pointer}`)
+  }
+  return pointer.slice(1).split('/').map(token => token.replace(/~1/g, '/').replace(/~0/g, '~'))
+}
+
+/**
+ * 找到路径的父容器和最后一级键
+ */
+function resolveParent(document, pointer) {
+  const tokens = parsePointer(pointer)
+  const key = tokens.pop()
+  let parent = document
+  for (const token of tokens) {
+    parent = parent?.[Array.isArray(parent) ? Number(token) : token]
+    if (parent === null || typeof parent !== 'object') {
+      throw new Error(`Path not found: ${pointer}`)
+    }
+  }
+  return { parent, key }
+}
+
+function getValue(document, pointer) {
+  if (pointer === '') {
+    return document
+  }
+  const { parent, key } = resolveParent(document, pointer)
+  const index = Array.isArray(parent) ? Number(key) : key
+  if (!(index in parent)) {
+    throw new Error(`Path not found: ${pointer}`)
+  }
+  return parent[index]
+}
+
+function addValue(document, pointer, value) {
+  if (pointer === '') {
+    return value
+  }
+  const { parent, key } = resolveParent(document, pointer)
+  if (Array.isArray(parent)) {
+    const index = key === '-' ? parent.length : Number(key)
+    if (!Number.isInteger(index) || index < 0 || index > parent.length) {
+      throw new Error(`Array index out of range: ${pointer}`)
+    }
+    parent.splice(index, 0, value)
+  } else {
+    parent[key] = value
+  }
+  return document
+}
+
+function removeValue(document, pointer) {
+  const value = getValue(document, pointer)
+  const { parent, key } = resolveParent(document, pointer)
+  if (Array.isArray(parent)) {
+    parent.splice(Number(key), 1)
+  } else {
+    delete parent[key]
+  }
+  return value
+}
+
+/**
+ * 原位替换（与 json_patch.apply_patch 一致）：对象成员保持原来的键顺序，不能用 remove + add
+ */
+function replaceValue(document, pointer, value) {
+  if (pointer === '') {
+    return value
+  }
+  getValue(document, pointer)
+  const { parent, key } = resolveParent(document, pointer)
+  parent[Array.isArray(parent) ? Number(key) : key] = value
+  return document
+}
+
+function isEqual(a, b) {
+  return JSON.stringify(a) === JSON.stringify(b)
+}
+
+/**
+ * 应用 JSON Patch（不修改传入的文档）
+ * @param {*} document - 原文档
+ * @param {Array<Object>} patch - 操作列表
+ * @returns {*} 新文档，操作无效时抛出错误
+ */
+export function applyJsonPatch(document, patch) {
+  let result = structuredClone(document)
+  for (const operation of patch) {
+    const { op, path } = operation
+    switch (op) {
+      case 'add':
+        result = addValue(result, path, structuredClone(operation.value))
+        break
+      case 'remove':
+        removeValue(result, path)
+        break
+      case 'replace':
+        result = replaceValue(result, path, structuredClone(operation.value))
+        break
+      case 'move':
+        result = addValue(result, path, removeValue(result, operation.from))
+        break
+      case 'copy':
+        result = addValue(result, path, structuredClone(getValue(result, operation.from)))
+        break
+      case 'test':
+        if (!isEqual(getValue(result, path), operation.value)) {
+          throw new Error(`Test failed: ${path}`)
+        }
+        break
+      default:
+        throw new Error(`Unknown operation: ${op}`)
+    }
+  }
+  return result
+}